@@ -7,12 +7,15 @@ from django.urls import reverse, path
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.http import JsonResponse
+from django.db import transaction
 from django.db.models import Count, Q
 import nested_admin
 from adminsortable2.admin import SortableAdminMixin, SortableInlineAdminMixin, SortableAdminBase
-from .models import Book, Unit, Asset
+from .cache import CatalogCache
+from .services import AssetIngestionService, CatalogCloneService, CatalogCounterService
+from .models import Book, Unit, Asset, OfflineBundle
 from apps.quiz.models import Question, Choice
-from apps.common.utils.security import generate_audio_signed_url, extract_audio_metadata
+from apps.common.utils.security import generate_audio_signed_url
 
 
 # ============================================================================
@@ -130,7 +133,7 @@ class UnitInline(SortableInlineAdminMixin, admin.TabularInline):
         if obj.id:
             # Check if unit is ready to publish
             has_audio = obj.assets.filter(type='audio').exists()
-            has_questions = obj.questions.exists()
+            has_questions = obj.has_quiz()
             
             if has_audio and has_questions:
                 return format_html('<span style="color: green;">✓</span>')
@@ -160,7 +163,7 @@ class BookAdmin(SortableAdminBase, admin.ModelAdmin):
     list_filter = ['is_published', 'created_at']
     search_fields = ['title', 'slug', 'description']
     prepopulated_fields = {'slug': ('title',)}
-    readonly_fields = ['created_at', 'updated_at', 'unit_count', 'free_units_count', 'stats_display']
+    readonly_fields = ['created_at', 'updated_at', 'stats_display']
     
     fieldsets = (
         (None, {
@@ -186,22 +189,20 @@ class BookAdmin(SortableAdminBase, admin.ModelAdmin):
         """Optimize queryset with annotations."""
         qs = super().get_queryset(request)
         qs = qs.annotate(
-            _units_count=Count('units', distinct=True),
             _enrollments_count=Count('enrollments', distinct=True)
         )
         return qs
     
     def units_count(self, obj):
         """Display units count."""
-        count = getattr(obj, '_units_count', obj.unit_count)
         return format_html(
             '<a href="{}?book__id__exact={}">{} units</a>',
             reverse('admin:catalog_unit_changelist'),
             obj.id,
-            count
+            obj.unit_count
         )
     units_count.short_description = 'Units'
-    units_count.admin_order_field = '_units_count'
+    units_count.admin_order_field = 'unit_count'
     
     def enrollments_count(self, obj):
         """Display enrollments count."""
@@ -239,20 +240,21 @@ class BookAdmin(SortableAdminBase, admin.ModelAdmin):
         if not obj.id:
             return '-'
         
-        total_units = obj.units.count()
-        free_units = obj.units.filter(is_free=True).count()
-        units_with_audio = obj.units.filter(assets__type='audio').distinct().count()
-        units_with_quiz = obj.units.filter(questions__isnull=False).distinct().count()
+        total_units = obj.unit_count
+        units_with_audio = obj.units_with_audio
+        units_with_quiz = obj.units_with_quiz
         
         return format_html(
             '<ul style="margin: 0; padding-left: 20px;">'
             '<li>Total Units: {}</li>'
             '<li>Free Units: {}</li>'
+            '<li>Total Duration: {} min</li>'
             '<li>Units with Audio: {} ({:.0f}%)</li>'
             '<li>Units with Quiz: {} ({:.0f}%)</li>'
             '</ul>',
             total_units,
-            free_units,
+            obj.free_unit_count,
+            obj.total_duration_sec // 60,
             units_with_audio,
             (units_with_audio / total_units * 100) if total_units > 0 else 0,
             units_with_quiz,
@@ -264,43 +266,28 @@ class BookAdmin(SortableAdminBase, admin.ModelAdmin):
     def publish_books(self, request, queryset):
         """Publish selected books."""
         updated = queryset.update(is_published=True)
+        CatalogCache.bump_version()
         self.message_user(request, f'{updated} books published.', messages.SUCCESS)
     publish_books.short_description = '✓ Publish selected books'
     
     def unpublish_books(self, request, queryset):
         """Unpublish selected books."""
         updated = queryset.update(is_published=False)
+        CatalogCache.bump_version()
         self.message_user(request, f'{updated} books unpublished.', messages.SUCCESS)
     unpublish_books.short_description = '○ Unpublish selected books'
     
     def duplicate_book(self, request, queryset):
-        """Duplicate selected book (template)."""
+        """Duplicate selected book with its units, assets, questions and choices."""
         if queryset.count() != 1:
             self.message_user(request, 'Please select exactly one book to duplicate.', messages.ERROR)
             return
         
-        book = queryset.first()
-        new_book = Book.objects.create(
-            title=f"{book.title} (Copy)",
-            slug=f"{book.slug}-copy",
-            description=book.description,
-            price=book.price,
-            is_published=False
-        )
-        
-        # Copy units
-        for unit in book.units.all():
-            Unit.objects.create(
-                book=new_book,
-                title=unit.title,
-                transcript=unit.transcript,
-                is_free=unit.is_free,
-                order=unit.order
-            )
+        new_book = CatalogCloneService.clone_book(queryset.first().pk)
         
         self.message_user(
             request,
-            f'Book duplicated as "{new_book.title}". Edit it now.',
+            f'Book duplicated as "{new_book.title}" ({new_book.unit_count} units). Edit it now.',
             messages.SUCCESS
         )
         return redirect('admin:catalog_book_change', new_book.id)
@@ -416,32 +403,25 @@ class UnitAdmin(SortableAdminBase, nested_admin.NestedModelAdmin):
     # Actions
     def set_free(self, request, queryset):
         """Set units as free."""
-        updated = queryset.update(is_free=True)
+        updated = CatalogCounterService.set_units_free(queryset.values_list('id', flat=True), True)
+        CatalogCache.bump_version()
         self.message_user(request, f'{updated} units set as free.', messages.SUCCESS)
     set_free.short_description = '🆓 Set as FREE'
     
     def set_paid(self, request, queryset):
         """Set units as paid."""
-        updated = queryset.update(is_free=False)
+        updated = CatalogCounterService.set_units_free(queryset.values_list('id', flat=True), False)
+        CatalogCache.bump_version()
         self.message_user(request, f'{updated} units set as paid.', messages.SUCCESS)
     set_paid.short_description = '💰 Set as PAID'
     
     def recompute_audio_duration(self, request, queryset):
-        """Recompute audio duration from files."""
-        updated = 0
-        for unit in queryset:
-            audio_asset = unit.assets.filter(type='audio').first()
-            if audio_asset and audio_asset.file:
-                try:
-                    metadata = extract_audio_metadata(audio_asset.file.path)
-                    if metadata.get('duration_sec'):
-                        unit.duration_sec = metadata['duration_sec']
-                        unit.save()
-                        updated += 1
-                except Exception as e:
-                    pass
+        """Queue background duration recomputation for selected units."""
+        from .tasks import recompute_audio_durations
         
-        self.message_user(request, f'{updated} units updated with audio duration.', messages.SUCCESS)
+        unit_ids = list(queryset.values_list('id', flat=True))
+        transaction.on_commit(lambda: recompute_audio_durations.delay(unit_ids=unit_ids))
+        self.message_user(request, f'Duration recomputation queued for {len(unit_ids)} units.', messages.SUCCESS)
     recompute_audio_duration.short_description = '⏱ Recompute audio duration'
     
     def publish_units(self, request, queryset):
@@ -492,11 +472,15 @@ class UnitAdmin(SortableAdminBase, nested_admin.NestedModelAdmin):
 class AssetAdmin(admin.ModelAdmin):
     """Enhanced admin for Asset model."""
     
-    list_display = ['unit', 'type', 'size_formatted', 'is_protected_icon', 'checksum_short', 'created_at']
-    list_filter = ['type', 'is_protected', 'created_at']
+    list_display = ['unit', 'type', 'size_formatted', 'is_protected_icon', 'checksum_short', 'ingest_status', 'created_at']
+    list_filter = ['type', 'is_protected', 'ingest_status', 'created_at']
     search_fields = ['unit__title', 'file_path', 'checksum']
     autocomplete_fields = ['unit']
-    readonly_fields = ['created_at', 'updated_at', 'size_formatted', 'checksum', 'file_preview']
+    readonly_fields = [
+        'created_at', 'updated_at', 'size_formatted', 'checksum',
+        'ingest_status', 'ingest_error', 'ingested_at', 'metadata', 'blob', 'file_preview'
+    ]
+    actions = ['reingest_assets']
     
     fieldsets = (
         (None, {
@@ -506,9 +490,12 @@ class AssetAdmin(admin.ModelAdmin):
             'fields': ('is_protected',)
         }),
         ('Metadata', {
-            'fields': ('bytes', 'size_formatted', 'checksum'),
+            'fields': ('bytes', 'size_formatted', 'checksum', 'blob', 'metadata'),
             'classes': ('collapse',)
         }),
+        ('Ingestion', {
+            'fields': ('ingest_status', 'ingest_error', 'ingested_at'),
+        }),
         ('Preview', {
             'fields': ('file_preview',),
             'classes': ('collapse',)
@@ -549,29 +536,36 @@ class AssetAdmin(admin.ModelAdmin):
         return format_html(info)
     file_preview.short_description = 'File Details'
     
-    def save_model(self, request, obj, form, change):
-        """Auto-populate metadata from file."""
-        if obj.file:
-            # Set bytes
-            if not obj.bytes:
-                obj.bytes = obj.file.size
-            
-            # Extract audio metadata
-            if obj.type == 'audio':
-                try:
-                    metadata = extract_audio_metadata(obj.file.path)
-                    # Update unit duration if this is the primary audio
-                    if metadata.get('duration_sec') and not obj.unit.duration_sec:
-                        obj.unit.duration_sec = metadata['duration_sec']
-                        obj.unit.save()
-                except Exception:
-                    pass
-            
-            # Generate checksum
-            if not obj.checksum:
-                import hashlib
-                obj.file.seek(0)
-                obj.checksum = hashlib.sha256(obj.file.read()).hexdigest()
-                obj.file.seek(0)
-        
-        super().save_model(request, obj, form, change)
+    def reingest_assets(self, request, queryset):
+        """Queue checksum/metadata extraction again."""
+        asset_ids = list(queryset.exclude(file='').values_list('id', flat=True))
+        AssetIngestionService.schedule(*asset_ids)
+        self.message_user(request, f'{len(asset_ids)} assets queued for ingestion.', messages.SUCCESS)
+    reingest_assets.short_description = '⟳ Re-run ingestion'
+
+
+@admin.register(OfflineBundle)
+class OfflineBundleAdmin(admin.ModelAdmin):
+    """Read-only admin for offline download bundles."""
+    
+    list_display = ['book', 'unit', 'status', 'size_display', 'content_key_short', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['book__title', 'unit__title', 'content_key']
+    readonly_fields = [
+        'content_key', 'book', 'unit', 'unit_ids', 'status', 'error',
+        'file', 'bytes', 'created_at', 'updated_at'
+    ]
+    
+    def has_add_permission(self, request):
+        """Bundles are only created by the download endpoints."""
+        return False
+    
+    def size_display(self, obj):
+        """Display bundle size in MB."""
+        return f'{obj.bytes / (1024 * 1024):.1f} MB' if obj.bytes else '-'
+    size_display.short_description = 'Size'
+    
+    def content_key_short(self, obj):
+        """Display shortened content key."""
+        return format_html('<code>{}</code>', obj.content_key[:12] + '...')
+    content_key_short.short_description = 'Content key'
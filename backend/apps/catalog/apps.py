@@ -6,3 +6,6 @@ class CatalogConfig(AppConfig):
     name = 'apps.catalog'
     verbose_name = 'Catalog'
 
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.catalog.signals
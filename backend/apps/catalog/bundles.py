@@ -0,0 +1,152 @@
+"""
+Offline bundle manifests and zip writing for catalog app.
+"""
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+
+from apps.common.enums import AssetType
+from .models import Asset, Unit
+
+
+BUNDLE_FORMAT = 1
+COPY_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+# Fixed member timestamps keep identical content byte-identical
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# Audio is already compressed, so it is stored as-is
+STORED_TYPES = {AssetType.AUDIO}
+
+
+def bundle_units(unit_ids, with_transcript=False):
+    """
+    Load units with everything a bundle needs in a fixed number of queries.
+
+    Args:
+        unit_ids: Unit IDs to include
+        with_transcript: Also load transcript markdown (for building)
+
+    Returns:
+        List of units ordered by book order
+    """
+    from apps.quiz.models import Question
+
+    units = Unit.objects.filter(pk__in=unit_ids).select_related('book').prefetch_related(
+        Prefetch('assets', queryset=Asset.objects.exclude(file='').order_by('type', 'id')),
+        Prefetch('questions', queryset=Question.objects.prefetch_related('choices')),
+    ).order_by('order', 'id')
+    if not with_transcript:
+        units = units.defer('transcript')
+    return list(units)
+
+
+def describe_bundle(units):
+    """
+    Build the manifest of a bundle and the key identifying its content.
+
+    Args:
+        units: Units from bundle_units(), all of one book
+
+    Returns:
+        Tuple (content_key, manifest, files) where files maps zip paths to
+        bytes for text members or to storage names for asset members
+    """
+    from apps.quiz.serializers import QuestionSerializer
+
+    book = units[0].book
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'book': {'id': book.pk, 'slug': book.slug, 'title': book.title},
+        'units': [],
+    }
+    files = {}
+    sources = []
+
+    for unit in units:
+        folder = f'unit-{unit.order:03d}-{unit.pk}'
+        questions = json.dumps(
+            QuestionSerializer(unit.questions.all(), many=True).data,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode('utf-8')
+        entry = {
+            'id': unit.pk,
+            'title': unit.title,
+            'order': unit.order,
+            'duration_sec': unit.duration_sec,
+            'transcript': None,
+            'questions': {
+                'path': f'{folder}/questions.json',
+                'count': len(unit.questions.all()),
+                'sha256': hashlib.sha256(questions).hexdigest(),
+            },
+            'assets': [],
+        }
+        files[entry['questions']['path']] = questions
+
+        if unit.transcript_digest:
+            entry['transcript'] = {
+                'path': f'{folder}/transcript.md',
+                'sha256': unit.transcript_digest,
+            }
+            # Deferred while describing; only read when the bundle is built
+            if 'transcript' in unit.__dict__:
+                files[entry['transcript']['path']] = unit.transcript.encode('utf-8')
+
+        for asset in unit.assets.all():
+            extension = os.path.splitext(asset.file.name)[1].lower()
+            path = f'{folder}/{asset.type}-{asset.pk}{extension}'
+            entry['assets'].append({
+                'id': asset.pk,
+                'type': asset.type,
+                'path': path,
+                'bytes': asset.bytes,
+                'checksum': asset.checksum,
+            })
+            files[path] = asset.file.name
+            # Checksums are filled in by ingestion; until then the name identifies the file
+            sources.append(asset.file.name)
+
+        manifest['units'].append(entry)
+
+    encoded = json.dumps([manifest, sources], sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest(), manifest, files
+
+
+def write_bundle(fileobj, manifest, files):
+    """
+    Write a bundle zip, streaming asset files in fixed-size buffers.
+
+    Args:
+        fileobj: Writable binary file
+        manifest: Manifest from describe_bundle()
+        files: Members from describe_bundle()
+    """
+    asset_types = {
+        asset['path']: asset['type']
+        for unit in manifest['units']
+        for asset in unit['assets']
+    }
+
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        info = zipfile.ZipInfo('manifest.json', date_time=ZIP_DATE_TIME)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+
+        for path, content in files.items():
+            info = zipfile.ZipInfo(path, date_time=ZIP_DATE_TIME)
+            if path not in asset_types:
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, content)
+                continue
+
+            info.compress_type = (
+                zipfile.ZIP_STORED if asset_types[path] in STORED_TYPES else zipfile.ZIP_DEFLATED
+            )
+            with default_storage.open(content, 'rb') as source:
+                with archive.open(info, 'w', force_zip64=True) as target:
+                    shutil.copyfileobj(source, target, COPY_BUFFER_SIZE)
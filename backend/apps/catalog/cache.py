@@ -0,0 +1,75 @@
+"""
+Versioned response cache for the public catalog.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class CatalogCache:
+    """
+    Cache anonymous catalog serializations under a global version.
+
+    Every key embeds the current catalog version, so bumping the version
+    invalidates all cached pages at once without scanning keys.
+    """
+
+    VERSION_KEY = 'catalog:version'
+
+    @classmethod
+    def get_version(cls):
+        """
+        Get the current catalog version.
+
+        Returns:
+            Integer version
+        """
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            # Seed from the clock so a lost key never revives stale entries
+            cache.add(cls.VERSION_KEY, time.time_ns(), None)
+            version = cache.get(cls.VERSION_KEY)
+        return version
+
+    @classmethod
+    def bump_version(cls):
+        """Invalidate every cached catalog page."""
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, time.time_ns(), None)
+
+    @classmethod
+    def make_key(cls, kind, *parts):
+        """
+        Build a versioned cache key.
+
+        Args:
+            kind: Page kind (e.g. 'books:list')
+            *parts: Values that identify the page (URL, variant)
+
+        Returns:
+            Cache key string
+        """
+        digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+        return f'catalog:v{cls.get_version()}:{kind}:{digest}'
+
+    @classmethod
+    def get_or_build(cls, key, builder):
+        """
+        Return cached data for key, building and storing it on a miss.
+
+        Args:
+            key: Key from make_key()
+            builder: Callable returning JSON-serializable data
+
+        Returns:
+            Cached or freshly built data
+        """
+        data = cache.get(key)
+        if data is None:
+            data = builder()
+            cache.set(key, data, settings.CATALOG_CACHE_TIMEOUT)
+        return data
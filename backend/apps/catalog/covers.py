@@ -0,0 +1,101 @@
+"""
+Responsive cover image variants for catalog app.
+"""
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+
+COVER_WIDTHS = (160, 320, 640)
+VARIANT_DIR = 'covers/variants'
+
+# (srcset key, Pillow format, file extension, save options)
+COVER_FORMATS = (
+    ('webp', 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def _flatten(image):
+    """Convert to RGB, compositing transparency onto white."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def build_cover_variants(name):
+    """
+    Render and store resized WebP/JPEG copies of a cover.
+
+    Variants are stored under the content hash of the source file, so a
+    name never changes meaning and can be cached forever; files that
+    already exist are not rendered again. Covers are never upscaled.
+
+    Args:
+        name: Storage name of the original cover
+
+    Returns:
+        Dict with ``source`` (the cover name) and one list of
+        [width, storage name] pairs per format key
+    """
+    with default_storage.open(name, 'rb') as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    image = Image.open(BytesIO(data))
+    image = _flatten(ImageOps.exif_transpose(image))
+    widths = [width for width in COVER_WIDTHS if width <= image.width] or [image.width]
+
+    variants = {'source': name}
+    for key, _, _, _ in COVER_FORMATS:
+        variants[key] = []
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for key, image_format, extension, options in COVER_FORMATS:
+            variant_name = f'{VARIANT_DIR}/{digest}/{width}.{extension}'
+            if not default_storage.exists(variant_name):
+                buffer = BytesIO()
+                resized.save(buffer, image_format, **options)
+                default_storage.save(variant_name, ContentFile(buffer.getvalue()))
+            variants[key].append([width, variant_name])
+    return variants
+
+
+def render_cover_variants(name):
+    """
+    Process-pool friendly wrapper around build_cover_variants().
+
+    Returns:
+        Tuple (variants or None, error message or None)
+    """
+    try:
+        return build_cover_variants(name), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+
+def cover_srcset(variants, build_url):
+    """
+    Build srcset strings from stored variants.
+
+    Args:
+        variants: Book.cover_variants
+        build_url: Callable turning a storage name into a URL
+
+    Returns:
+        Dict of format key -> "url 160w, url 320w", or None without variants
+    """
+    if not variants:
+        return None
+    return {
+        key: ', '.join(f'{build_url(variant_name)} {width}w' for width, variant_name in variants[key])
+        for key, _, _, _ in COVER_FORMATS
+        if variants.get(key)
+    }
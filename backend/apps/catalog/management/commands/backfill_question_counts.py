@@ -0,0 +1,26 @@
+"""
+Management command to backfill denormalized unit question counts.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.models import Unit
+from apps.catalog.services import CatalogCounterService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Unit.question_count from existing quiz questions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--book',
+            type=str,
+            help='Only recount units of the book with this slug'
+        )
+
+    def handle(self, *args, **options):
+        unit_ids = None
+        if options['book']:
+            unit_ids = Unit.objects.filter(book__slug=options['book']).values_list('id', flat=True)
+        
+        updated = CatalogCounterService.recount_question_counts(unit_ids)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Recounted questions for {updated} units'))
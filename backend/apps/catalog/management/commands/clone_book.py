@@ -0,0 +1,29 @@
+"""
+Management command to clone a book as a template for a new course.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.catalog.models import Book
+from apps.catalog.services import CatalogCloneService
+
+
+class Command(BaseCommand):
+    help = 'Copy a book with its units, assets, questions and choices (unpublished)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', type=str, help='Slug of the book to clone')
+        parser.add_argument('--title', type=str, help='Title of the copy')
+        parser.add_argument('--new-slug', type=str, help='Slug of the copy')
+
+    def handle(self, *args, **options):
+        book_id = Book.objects.filter(slug=options['slug']).values_list('id', flat=True).first()
+        if book_id is None:
+            raise CommandError(f"Book '{options['slug']}' does not exist")
+        if options['new_slug'] and Book.objects.filter(slug=options['new_slug']).exists():
+            raise CommandError(f"Slug '{options['new_slug']}' is already taken")
+        
+        book = CatalogCloneService.clone_book(book_id, title=options['title'], slug=options['new_slug'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Cloned into "{book.title}" ({book.slug}): {book.unit_count} units, '
+            f'{book.units_with_quiz} with quizzes'
+        ))
@@ -0,0 +1,35 @@
+"""
+Management command to move existing assets into content-addressed storage.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.services import AssetBlobService
+
+
+class Command(BaseCommand):
+    help = 'Share identical asset files through content-addressed blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report duplicates and reclaimable space'
+        )
+
+    def handle(self, *args, **options):
+        result = AssetBlobService.dedupe(dry_run=options['dry_run'])
+        
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(
+                f"  asset {error['asset_id']} ({error['file']}): {error['error']}"
+            ))
+        if result['unchecked']:
+            self.stdout.write(self.style.WARNING(
+                f"{result['unchecked']} assets have no checksum yet; re-run their ingestion first"
+            ))
+        
+        prefix = 'Would share' if options['dry_run'] else '✓ Shared'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {result['assets']} assets: {result['duplicates']} duplicates, "
+            f"{result['reclaimed_bytes'] / (1024 * 1024):.1f} MB reclaimed, "
+            f"{result['recounted']} counters repaired, {len(result['errors'])} errors"
+        ))
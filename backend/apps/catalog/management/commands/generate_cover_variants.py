@@ -0,0 +1,35 @@
+"""
+Management command to generate responsive variants for existing covers.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.services import CoverVariantService
+
+
+class Command(BaseCommand):
+    help = 'Render WebP/JPEG cover variants for books that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of render processes (default: CPU count, 1 = serial)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render covers that already have variants'
+        )
+
+    def handle(self, *args, **options):
+        result = CoverVariantService.backfill(workers=options['workers'], force=options['force'])
+        
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(
+                f"  book {error['book_id']} ({error['file']}): {error['error']}"
+            ))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Processed {result['processed']} covers, updated {result['updated']} books, "
+            f"{len(result['errors'])} errors"
+        ))
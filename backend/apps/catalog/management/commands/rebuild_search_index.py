@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the catalog search index.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.search import CatalogSearch
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search documents for all books and units'
+
+    def handle(self, *args, **options):
+        indexed = CatalogSearch.rebuild()
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {indexed} search documents'))
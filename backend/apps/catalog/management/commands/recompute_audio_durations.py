@@ -0,0 +1,68 @@
+"""
+Management command to recompute unit durations from audio files.
+"""
+import csv
+
+from django.core.management.base import BaseCommand
+from apps.catalog.services import AudioDurationService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Unit.duration_sec from primary audio files (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--book',
+            type=str,
+            help='Only recompute units of the book with this slug'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of probe processes (default: CPU count, 1 = serial)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Assets per batch between checkpoints'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore the checkpoint of an interrupted run'
+        )
+        parser.add_argument(
+            '--report',
+            type=str,
+            help='Write per-asset errors to this CSV file'
+        )
+
+    def handle(self, *args, **options):
+        result = AudioDurationService.recompute(
+            book_slug=options['book'],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            restart=options['restart'],
+        )
+        
+        if result['resumed_from']:
+            self.stdout.write(f"Resumed after asset {result['resumed_from']}")
+        
+        errors = result['errors']
+        if options['report']:
+            with open(options['report'], 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=['asset_id', 'unit_id', 'file', 'error'])
+                writer.writeheader()
+                writer.writerows(errors)
+        else:
+            for error in errors:
+                self.stdout.write(self.style.WARNING(
+                    f"  asset {error['asset_id']} (unit {error['unit_id']}, {error['file']}): {error['error']}"
+                ))
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Processed {result['processed']} assets, updated {result['updated']} units, "
+            f"{len(errors)} errors"
+        ))
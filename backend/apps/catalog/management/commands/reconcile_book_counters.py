@@ -0,0 +1,30 @@
+"""
+Management command to repair drift in denormalized book counters.
+"""
+from django.core.management.base import BaseCommand
+from apps.catalog.cache import CatalogCache
+from apps.catalog.models import Book
+from apps.catalog.services import CatalogCounterService
+
+
+class Command(BaseCommand):
+    help = 'Recompute Book unit/free/duration/audio/quiz counters from units'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--book',
+            type=str,
+            help='Only reconcile the book with this slug'
+        )
+
+    def handle(self, *args, **options):
+        book_ids = None
+        if options['book']:
+            book_ids = Book.objects.filter(slug=options['book']).values_list('id', flat=True)
+        
+        repaired = CatalogCounterService.recount_book_counters(book_ids)
+        if repaired:
+            # bulk_update() skips the catalog signals
+            CatalogCache.bump_version()
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Repaired counters of {repaired} books'))
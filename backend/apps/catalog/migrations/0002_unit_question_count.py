@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of quiz questions (maintained by quiz signals)'),
+        ),
+    ]
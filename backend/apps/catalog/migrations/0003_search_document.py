@@ -0,0 +1,109 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# SQLite: external-content FTS5 table kept in sync by triggers. Note that
+# Django rebuilds SQLite tables on most ALTERs, which drops these triggers;
+# recreate them in any later migration that alters catalog_search_document.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE catalog_search_fts USING fts5(
+        title_folded, body_folded,
+        content='catalog_search_document', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER catalog_search_fts_ai AFTER INSERT ON catalog_search_document BEGIN
+        INSERT INTO catalog_search_fts(rowid, title_folded, body_folded)
+        VALUES (new.id, new.title_folded, new.body_folded);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_search_fts_ad AFTER DELETE ON catalog_search_document BEGIN
+        INSERT INTO catalog_search_fts(catalog_search_fts, rowid, title_folded, body_folded)
+        VALUES ('delete', old.id, old.title_folded, old.body_folded);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_search_fts_au AFTER UPDATE ON catalog_search_document BEGIN
+        INSERT INTO catalog_search_fts(catalog_search_fts, rowid, title_folded, body_folded)
+        VALUES ('delete', old.id, old.title_folded, old.body_folded);
+        INSERT INTO catalog_search_fts(rowid, title_folded, body_folded)
+        VALUES (new.id, new.title_folded, new.body_folded);
+    END
+    """,
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS catalog_search_fts_au',
+    'DROP TRIGGER IF EXISTS catalog_search_fts_ad',
+    'DROP TRIGGER IF EXISTS catalog_search_fts_ai',
+    'DROP TABLE IF EXISTS catalog_search_fts',
+]
+
+# MySQL: InnoDB FULLTEXT indexes. The title-only index lets the title
+# score be weighted separately. Folded text is plain ASCII syllables, so
+# set innodb_ft_min_token_size=1 to index two-letter Vietnamese syllables.
+MYSQL_FORWARD = [
+    'CREATE FULLTEXT INDEX catalog_search_ft_title ON catalog_search_document (title_folded)',
+    'CREATE FULLTEXT INDEX catalog_search_ft_all ON catalog_search_document (title_folded, body_folded)',
+]
+
+MYSQL_REVERSE = [
+    'DROP INDEX catalog_search_ft_all ON catalog_search_document',
+    'DROP INDEX catalog_search_ft_title ON catalog_search_document',
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Create the vendor-specific full-text index."""
+    statements = {
+        'sqlite': SQLITE_FORWARD,
+        'mysql': MYSQL_FORWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    """Drop the vendor-specific full-text index."""
+    statements = {
+        'sqlite': SQLITE_REVERSE,
+        'mysql': MYSQL_REVERSE,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_unit_question_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='"<kind>:<pk>"', max_length=50, unique=True)),
+                ('kind', models.CharField(choices=[('book', 'Book'), ('unit', 'Unit')], max_length=10)),
+                ('title', models.CharField(max_length=200)),
+                ('body', models.TextField(blank=True)),
+                ('title_folded', models.CharField(max_length=200)),
+                ('body_folded', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='catalog.book')),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='catalog.unit')),
+            ],
+            options={
+                'verbose_name': 'Search document',
+                'verbose_name_plural': 'Search documents',
+                'db_table': 'catalog_search_document',
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:52
+
+from django.db import migrations, models
+
+
+def mark_existing_assets_ready(apps, schema_editor):
+    """Assets saved before this migration were processed synchronously."""
+    Asset = apps.get_model('catalog', 'Asset')
+    Asset.objects.update(ingest_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='ingest_error',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='ingest_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', help_text='Checksum/metadata extraction status', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='ingested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict, help_text='Extracted media metadata'),
+        ),
+        migrations.RunPython(mark_existing_assets_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:56
+
+from django.db import migrations, models
+
+
+def backfill_transcript_stats(apps, schema_editor):
+    """Compute transcript stats for existing units."""
+    from apps.catalog.transcripts import transcript_stats
+    
+    Unit = apps.get_model('catalog', 'Unit')
+    units = list(Unit.objects.exclude(transcript='').only('id', 'transcript'))
+    for unit in units:
+        unit.transcript_digest, unit.transcript_sections, unit.transcript_bytes = (
+            transcript_stats(unit.transcript)
+        )
+    Unit.objects.bulk_update(
+        units, ['transcript_digest', 'transcript_sections', 'transcript_bytes'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_asset_ingest_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='transcript_bytes',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='transcript_digest',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='unit',
+            name='transcript_sections',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_transcript_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 02:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_unit_transcript_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CueIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('starts', models.JSONField(default=list, help_text='Cue start times (ms), ascending')),
+                ('ends', models.JSONField(default=list, help_text='Cue end times (ms)')),
+                ('texts', models.JSONField(default=list, help_text='Cue text without markup')),
+                ('max_duration_ms', models.PositiveIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, help_text='Checksum of the source file', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cue_index', to='catalog.asset')),
+                ('unit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cue_index', to='catalog.unit')),
+            ],
+            options={
+                'verbose_name': 'Cue index',
+                'verbose_name_plural': 'Cue indexes',
+                'db_table': 'catalog_cue_index',
+            },
+        ),
+    ]
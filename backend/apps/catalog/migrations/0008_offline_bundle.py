@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_book_cover_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfflineBundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_key', models.CharField(max_length=64, unique=True)),
+                ('unit_ids', models.JSONField(default=list, help_text='Units included, in manifest order')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('error', models.CharField(blank=True, max_length=500)),
+                ('file', models.FileField(blank=True, upload_to='bundles/')),
+                ('bytes', models.BigIntegerField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offline_bundles', to='catalog.book')),
+                ('unit', models.ForeignKey(blank=True, help_text='Set for single-unit bundles', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='offline_bundles', to='catalog.unit')),
+            ],
+            options={
+                'verbose_name': 'Offline bundle',
+                'verbose_name_plural': 'Offline bundles',
+                'db_table': 'catalog_offline_bundle',
+            },
+        ),
+    ]
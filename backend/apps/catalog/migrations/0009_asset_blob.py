@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_offline_bundle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='blobs/')),
+                ('bytes', models.BigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Asset blob',
+                'verbose_name_plural': 'Asset blobs',
+                'db_table': 'catalog_asset_blob',
+            },
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='blob',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Shared content-addressed file (set by ingestion)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='assets', to='catalog.assetblob'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:08
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_book_counters(apps, schema_editor):
+    """Compute counters for existing books in one UPDATE."""
+    Book = apps.get_model('catalog', 'Book')
+    Unit = apps.get_model('catalog', 'Unit')
+
+    def unit_subquery(aggregate, **filters):
+        units = Unit.objects.filter(book=OuterRef('pk'), **filters).order_by().values('book')
+        return Coalesce(
+            Subquery(units.annotate(total=aggregate).values('total'), output_field=IntegerField()), 0
+        )
+
+    Book.objects.update(
+        unit_count=unit_subquery(Count('id')),
+        free_unit_count=unit_subquery(Count('id'), is_free=True),
+        total_duration_sec=unit_subquery(Sum('duration_sec')),
+        units_with_audio=unit_subquery(Count('id', distinct=True), assets__type='audio'),
+        units_with_quiz=unit_subquery(Count('id'), question_count__gt=0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_asset_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='free_unit_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='total_duration_sec',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='unit_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='units_with_audio',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='units_with_quiz',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_book_counters, migrations.RunPython.noop),
+    ]
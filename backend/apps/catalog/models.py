@@ -1,10 +1,33 @@
 """
 Models for catalog (books, units, assets).
 """
+import bisect
+
 from django.db import models
+from django.db.models import Exists, OuterRef, Value
 from django.utils.text import slugify
-from apps.common.enums import AssetType
+from apps.common.enums import AssetType, IngestStatus
 from apps.common.mixins import TimestampMixin, OrderingMixin
+from .transcripts import transcript_stats
+
+
+class BookQuerySet(models.QuerySet):
+    """QuerySet helpers for catalog listings."""
+
+    def with_ownership(self, user):
+        """Annotate is_owned_by_user for the given user."""
+        if user is None or not user.is_authenticated:
+            return self.annotate(is_owned_by_user=Value(False))
+
+        from apps.users.models import Enrollment
+        from apps.users.services import EntitlementService
+
+        enrollments = Enrollment.objects.filter(
+            EntitlementService.active_enrollment_filter(),
+            user=user,
+            book=OuterRef('pk'),
+        )
+        return self.annotate(is_owned_by_user=Exists(enrollments))
 
 
 class Book(TimestampMixin):
@@ -14,9 +37,25 @@ class Book(TimestampMixin):
     slug = models.SlugField(max_length=200, unique=True, db_index=True)
     description = models.TextField(blank=True)
     cover = models.ImageField(upload_to='covers/', null=True, blank=True)
+    cover_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Resized WebP/JPEG copies of the cover (generated after upload)'
+    )
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     is_published = models.BooleanField(default=False, db_index=True)
     
+    # Denormalized counters (maintained by catalog/quiz signals, repaired by
+    # the reconcile_book_counters command)
+    unit_count = models.PositiveIntegerField(default=0, editable=False)
+    free_unit_count = models.PositiveIntegerField(default=0, editable=False)
+    total_duration_sec = models.PositiveIntegerField(default=0, editable=False)
+    units_with_audio = models.PositiveIntegerField(default=0, editable=False)
+    units_with_quiz = models.PositiveIntegerField(default=0, editable=False)
+    
+    objects = BookQuerySet.as_manager()
+    
     class Meta:
         db_table = 'catalog_book'
         verbose_name = 'Book'
@@ -32,16 +71,6 @@ class Book(TimestampMixin):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
-    @property
-    def unit_count(self):
-        """Return number of units in this book."""
-        return self.units.count()
-
-    @property
-    def free_units_count(self):
-        """Return number of free units."""
-        return self.units.filter(is_free=True).count()
-
 
 class Unit(TimestampMixin, OrderingMixin):
     """Unit/Lesson model within a book."""
@@ -51,6 +80,14 @@ class Unit(TimestampMixin, OrderingMixin):
     transcript = models.TextField(blank=True, help_text='Transcript in markdown format')
     is_free = models.BooleanField(default=False, db_index=True)
     duration_sec = models.PositiveIntegerField(default=0, help_text='Duration in seconds')
+    question_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of quiz questions (maintained by quiz signals)'
+    )
+    transcript_digest = models.CharField(max_length=64, blank=True, editable=False)
+    transcript_sections = models.PositiveIntegerField(default=0, editable=False)
+    transcript_bytes = models.PositiveIntegerField(default=0, editable=False)
     
     class Meta:
         db_table = 'catalog_unit'
@@ -66,6 +103,24 @@ class Unit(TimestampMixin, OrderingMixin):
     def __str__(self):
         return f"{self.book.title} - {self.title}"
 
+    def save(self, *args, **kwargs):
+        """Keep transcript digest, section count and size in sync."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            # A deferred transcript is not saved, so it is not loaded just to hash it
+            saves_transcript = 'transcript' not in self.get_deferred_fields()
+        else:
+            saves_transcript = 'transcript' in update_fields
+        if saves_transcript:
+            self.transcript_digest, self.transcript_sections, self.transcript_bytes = (
+                transcript_stats(self.transcript)
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'transcript_digest', 'transcript_sections', 'transcript_bytes'
+                }
+        super().save(*args, **kwargs)
+
     @property
     def duration_formatted(self):
         """Return duration in MM:SS format."""
@@ -75,7 +130,35 @@ class Unit(TimestampMixin, OrderingMixin):
 
     def has_quiz(self):
         """Check if unit has quiz questions."""
-        return self.questions.exists()
+        return self.question_count > 0
+
+
+class AssetBlob(models.Model):
+    """
+    Content-addressed file shared by every asset with the same SHA-256.
+    
+    ``ref_count`` is the number of Asset rows pointing at the blob; the
+    blob and its file are removed when it drops to zero.
+    """
+    
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='blobs/', max_length=255)
+    bytes = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'catalog_asset_blob'
+        verbose_name = 'Asset blob'
+        verbose_name_plural = 'Asset blobs'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+    @staticmethod
+    def build_name(sha256, extension=''):
+        """Storage name for content, fanned out by hash prefix."""
+        return f'blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
 
 
 class Asset(TimestampMixin):
@@ -88,6 +171,25 @@ class Asset(TimestampMixin):
     bytes = models.PositiveIntegerField(default=0)
     checksum = models.CharField(max_length=64, blank=True)
     is_protected = models.BooleanField(default=True, help_text='Require signed URL')
+    ingest_status = models.CharField(
+        max_length=20,
+        choices=IngestStatus.choices,
+        default=IngestStatus.PENDING,
+        db_index=True,
+        help_text='Checksum/metadata extraction status'
+    )
+    ingest_error = models.CharField(max_length=500, blank=True)
+    ingested_at = models.DateTimeField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True, help_text='Extracted media metadata')
+    blob = models.ForeignKey(
+        AssetBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='assets',
+        help_text='Shared content-addressed file (set by ingestion)'
+    )
     
     class Meta:
         db_table = 'catalog_asset'
@@ -110,3 +212,157 @@ class Asset(TimestampMixin):
         else:
             return f"{self.bytes / (1024 * 1024):.2f} MB"
 
+
+class CueIndex(models.Model):
+    """
+    Sorted subtitle cue table for a unit, built from its subtitle asset.
+    
+    Cues are stored as parallel arrays ordered by start time (ms), so a
+    time window is found by binary search over ``starts``. ``max_duration_ms``
+    bounds how far before the window an overlapping cue can start.
+    """
+    
+    unit = models.OneToOneField(Unit, on_delete=models.CASCADE, related_name='cue_index')
+    asset = models.OneToOneField(Asset, on_delete=models.CASCADE, related_name='cue_index')
+    starts = models.JSONField(default=list, help_text='Cue start times (ms), ascending')
+    ends = models.JSONField(default=list, help_text='Cue end times (ms)')
+    texts = models.JSONField(default=list, help_text='Cue text without markup')
+    max_duration_ms = models.PositiveIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, help_text='Checksum of the source file')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'catalog_cue_index'
+        verbose_name = 'Cue index'
+        verbose_name_plural = 'Cue indexes'
+
+    def __str__(self):
+        return f"{self.unit} - {len(self.starts)} cues"
+
+    def cue(self, position):
+        """Return the cue at a position as a dict with times in seconds."""
+        return {
+            'index': position,
+            'start': self.starts[position] / 1000,
+            'end': self.ends[position] / 1000,
+            'text': self.texts[position],
+        }
+
+    def window(self, start_ms=None, end_ms=None):
+        """
+        Return cues overlapping [start_ms, end_ms).
+        
+        Only cues starting within max_duration_ms before the window can
+        still be playing, so two bisections bound the scan.
+        """
+        if start_ms is None:
+            lo = 0
+        else:
+            lo = bisect.bisect_left(self.starts, start_ms - self.max_duration_ms)
+        hi = len(self.starts) if end_ms is None else bisect.bisect_left(self.starts, end_ms)
+        return [
+            self.cue(position)
+            for position in range(lo, hi)
+            if start_ms is None or self.ends[position] > start_ms
+        ]
+
+    def find(self, phrase, limit=20):
+        """
+        Find cues containing a phrase, ignoring case and diacritics.
+        
+        Returns:
+            List of matching cues in playback order
+        """
+        from .search import fold_text, normalize_text
+        
+        needle = ' '.join(fold_text(normalize_text(phrase)).split())
+        if not needle:
+            return []
+        matches = []
+        for position, text in enumerate(self.texts):
+            if needle in fold_text(normalize_text(text)):
+                matches.append(self.cue(position))
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+class OfflineBundle(TimestampMixin):
+    """
+    Downloadable zip of units with their assets, transcripts and questions.
+    
+    Bundles are keyed by a digest of their content, so every learner with
+    the same accessible units shares one stored file, and any content
+    change produces a new bundle instead of invalidating the old one.
+    """
+    
+    content_key = models.CharField(max_length=64, unique=True)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='offline_bundles')
+    unit = models.ForeignKey(
+        Unit,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='offline_bundles',
+        help_text='Set for single-unit bundles'
+    )
+    unit_ids = models.JSONField(default=list, help_text='Units included, in manifest order')
+    status = models.CharField(
+        max_length=20,
+        choices=IngestStatus.choices,
+        default=IngestStatus.PENDING,
+        db_index=True
+    )
+    error = models.CharField(max_length=500, blank=True)
+    file = models.FileField(upload_to='bundles/', blank=True)
+    bytes = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'catalog_offline_bundle'
+        verbose_name = 'Offline bundle'
+        verbose_name_plural = 'Offline bundles'
+
+    def __str__(self):
+        scope = self.unit or self.book
+        return f"{scope} ({self.status})"
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized full-text search row for a book or a unit.
+    
+    The *_folded columns hold lowercased, diacritic-free copies of the
+    original text with identical character offsets; they are the columns
+    covered by the FTS5 table (SQLite) or FULLTEXT indexes (MySQL).
+    """
+    
+    KIND_BOOK = 'book'
+    KIND_UNIT = 'unit'
+    KIND_CHOICES = [
+        (KIND_BOOK, 'Book'),
+        (KIND_UNIT, 'Unit'),
+    ]
+    
+    key = models.CharField(max_length=50, unique=True, help_text='"<kind>:<pk>"')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='search_documents')
+    unit = models.ForeignKey(
+        Unit,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='search_documents'
+    )
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    title_folded = models.CharField(max_length=200)
+    body_folded = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'catalog_search_document'
+        verbose_name = 'Search document'
+        verbose_name_plural = 'Search documents'
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,329 @@
+"""
+Full-text search for the public catalog.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import escape
+
+from .models import Book, Unit, SearchDocument
+
+
+WORD_RE = re.compile(r'\w+')
+PHRASE_RE = re.compile(r'"([^"]*)"')
+# Links/images, then heading/quote/list markers, then emphasis and code
+MARKDOWN_RULES = [
+    (re.compile(r'!?\[([^\]]*)\]\([^)]*\)'), r'\1'),
+    (re.compile(r'^\s{0,3}(?:#{1,6}|>|[-*+]|\d+\.)\s+', re.M), ''),
+    (re.compile(r'[*_`~]+'), ''),
+]
+
+
+@lru_cache(maxsize=4096)
+def _fold_char(char):
+    """Fold one character; the result is always one character long."""
+    lowered = char.lower()
+    if len(lowered) != 1:
+        return char
+    if lowered == 'đ':
+        return 'd'
+    return unicodedata.normalize('NFD', lowered)[0]
+
+
+def normalize_text(text):
+    """Compose text to NFC so each Vietnamese letter is one code point."""
+    return unicodedata.normalize('NFC', text or '')
+
+
+def fold_text(text):
+    """
+    Lowercase and strip Vietnamese diacritics (ế -> e, đ -> d).
+
+    Folding is done per character, so offsets in the folded string map
+    one-to-one onto the (NFC-normalized) original for highlighting.
+    """
+    return ''.join(_fold_char(char) for char in text)
+
+
+def tokenize(text):
+    """Split text into folded syllable tokens."""
+    return WORD_RE.findall(fold_text(normalize_text(text)))
+
+
+def strip_markdown(text):
+    """Reduce markdown to plain text for indexing and snippets."""
+    for pattern, replacement in MARKDOWN_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class CatalogSearch:
+    """
+    Index and query SearchDocument rows.
+
+    Vietnamese words are written as space-separated syllables, so text is
+    tokenized per syllable and quoted queries ("nghe hiểu") become phrase
+    matches. Ranking runs on SQLite FTS5 or MySQL FULLTEXT; other
+    databases fall back to substring matching on the folded columns.
+    """
+
+    FTS_TABLE = 'catalog_search_fts'
+    MAX_TERMS = 10
+    TITLE_WEIGHT = 5.0
+    SNIPPET_LENGTH = 160
+
+    @classmethod
+    def index_book(cls, book):
+        """Create or refresh the search document for a book."""
+        cls._upsert(
+            key=f'{SearchDocument.KIND_BOOK}:{book.pk}',
+            kind=SearchDocument.KIND_BOOK,
+            book_id=book.pk,
+            unit_id=None,
+            title=book.title,
+            body=book.description,
+        )
+
+    @classmethod
+    def index_unit(cls, unit):
+        """Create or refresh the search document for a unit."""
+        cls._upsert(
+            key=f'{SearchDocument.KIND_UNIT}:{unit.pk}',
+            kind=SearchDocument.KIND_UNIT,
+            book_id=unit.book_id,
+            unit_id=unit.pk,
+            title=unit.title,
+            body=strip_markdown(unit.transcript),
+        )
+
+    @classmethod
+    def index_units(cls, units):
+        """
+        Index many units with one bulk insert (for rows created without signals).
+
+        Args:
+            units: Saved Unit instances
+        """
+        documents = [
+            cls._build(
+                f'{SearchDocument.KIND_UNIT}:{unit.pk}', SearchDocument.KIND_UNIT,
+                unit.book_id, unit.pk, unit.title, strip_markdown(unit.transcript),
+            )
+            for unit in units
+        ]
+        SearchDocument.objects.filter(key__in=[document.key for document in documents]).delete()
+        SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+    @classmethod
+    @transaction.atomic
+    def rebuild(cls):
+        """
+        Rebuild every search document from books and units.
+
+        Returns:
+            Number of indexed documents
+        """
+        SearchDocument.objects.all().delete()
+        documents = [
+            cls._build(
+                f'{SearchDocument.KIND_BOOK}:{book.pk}', SearchDocument.KIND_BOOK,
+                book.pk, None, book.title, book.description,
+            )
+            for book in Book.objects.only('id', 'title', 'description').iterator()
+        ]
+        documents += [
+            cls._build(
+                f'{SearchDocument.KIND_UNIT}:{unit.pk}', SearchDocument.KIND_UNIT,
+                unit.book_id, unit.pk, unit.title, strip_markdown(unit.transcript),
+            )
+            for unit in Unit.objects.only('id', 'book_id', 'title', 'transcript').iterator()
+        ]
+        SearchDocument.objects.bulk_create(documents, batch_size=500)
+        return len(documents)
+
+    @classmethod
+    def search(cls, query, limit=20):
+        """
+        Search published books and units.
+
+        Args:
+            query: User query; "quoted text" is matched as a phrase
+            limit: Maximum number of results
+
+        Returns:
+            Ranked list of SearchDocument with ``score`` and ``match_terms`` set
+        """
+        phrases, terms = cls.parse_query(query)
+        if not phrases and not terms:
+            return []
+
+        vendor = connection.vendor
+        if vendor == 'sqlite':
+            ranked = cls._search_sqlite(phrases, terms, limit)
+        elif vendor == 'mysql':
+            ranked = cls._search_mysql(phrases, terms, limit)
+        else:
+            ranked = cls._search_fallback(phrases, terms, limit)
+
+        documents = SearchDocument.objects.select_related('book', 'unit').in_bulk(
+            [doc_id for doc_id, _ in ranked]
+        )
+        match_terms = tuple(terms) + tuple(token for phrase in phrases for token in phrase)
+        results = []
+        for doc_id, score in ranked:
+            document = documents.get(doc_id)
+            if document is None:
+                continue
+            document.score = score
+            document.match_terms = match_terms
+            results.append(document)
+        return results
+
+    @classmethod
+    def parse_query(cls, query):
+        """
+        Split a query into quoted phrases and bare terms.
+
+        Returns:
+            Tuple (list of token lists, list of tokens), both folded
+        """
+        query = normalize_text(query)
+        phrases = [tokens for tokens in map(tokenize, PHRASE_RE.findall(query)) if tokens]
+        terms = tokenize(PHRASE_RE.sub(' ', query))
+        return phrases[:cls.MAX_TERMS], terms[:cls.MAX_TERMS]
+
+    @classmethod
+    def highlight(cls, text, folded, terms, length=None):
+        """
+        Escape text and wrap words starting with a query term in <mark>.
+
+        Args:
+            text: Original text
+            folded: fold_text(text), same length as text
+            terms: Tuple of folded query tokens
+            length: Trim to a window of this many characters around the
+                first match (optional)
+
+        Returns:
+            HTML-safe string
+        """
+        spans = [match.span() for match in WORD_RE.finditer(folded) if match.group().startswith(terms)]
+
+        start, end = 0, len(text)
+        if length is not None and len(text) > length:
+            center = spans[0][0] if spans else 0
+            start = max(0, min(center - length // 3, len(text) - length))
+            end = start + length
+            # Avoid cutting words at either edge of the window
+            if start > 0:
+                space = text.find(' ', start, center + 1)
+                if space != -1:
+                    start = space + 1
+            if end < len(text):
+                space = text.rfind(' ', start, end)
+                if space > start:
+                    end = space
+
+        parts = ['…'] if start > 0 else []
+        cursor = start
+        for span_start, span_end in spans:
+            if span_start < start or span_end > end:
+                continue
+            parts.append(escape(text[cursor:span_start]))
+            parts.append(f'<mark>{escape(text[span_start:span_end])}</mark>')
+            cursor = span_end
+        parts.append(escape(text[cursor:end]))
+        if end < len(text):
+            parts.append('…')
+        return ''.join(parts)
+
+    @classmethod
+    def _build(cls, key, kind, book_id, unit_id, title, body):
+        """Build an unsaved SearchDocument with folded columns."""
+        title = normalize_text(title)
+        body = normalize_text(body)
+        return SearchDocument(
+            key=key,
+            kind=kind,
+            book_id=book_id,
+            unit_id=unit_id,
+            title=title,
+            body=body,
+            title_folded=fold_text(title),
+            body_folded=fold_text(body),
+        )
+
+    @classmethod
+    def _upsert(cls, key, **fields):
+        """Insert or update the document stored under key."""
+        document = cls._build(key, **fields)
+        SearchDocument.objects.update_or_create(
+            key=key,
+            defaults={
+                field: getattr(document, field)
+                for field in ('kind', 'book_id', 'unit_id', 'title', 'body', 'title_folded', 'body_folded')
+            },
+        )
+
+    @classmethod
+    def _search_sqlite(cls, phrases, terms, limit):
+        """Rank with FTS5 bm25(); titles weigh TITLE_WEIGHT times more."""
+        parts = ['"{}"'.format(' '.join(phrase)) for phrase in phrases]
+        parts += [f'"{term}"' for term in terms[:-1]]
+        if terms:
+            parts.append(f'"{terms[-1]}"*')
+
+        sql = f"""
+            SELECT d.id, bm25({cls.FTS_TABLE}, %s, 1.0) AS rank
+            FROM {cls.FTS_TABLE}
+            JOIN {SearchDocument._meta.db_table} d ON d.id = {cls.FTS_TABLE}.rowid
+            JOIN {Book._meta.db_table} b ON b.id = d.book_id
+            WHERE {cls.FTS_TABLE} MATCH %s AND b.is_published = 1
+            ORDER BY rank
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [cls.TITLE_WEIGHT, ' '.join(parts), limit])
+            # bm25() is lower-is-better; flip it so larger scores rank higher
+            return [(doc_id, -rank) for doc_id, rank in cursor.fetchall()]
+
+    @classmethod
+    def _search_mysql(cls, phrases, terms, limit):
+        """Rank with InnoDB FULLTEXT relevance in boolean mode."""
+        parts = ['+"{}"'.format(' '.join(phrase)) for phrase in phrases]
+        parts += [f'+{term}' for term in terms[:-1]]
+        if terms:
+            parts.append(f'+{terms[-1]}*')
+        expression = ' '.join(parts)
+
+        sql = f"""
+            SELECT d.id,
+                %s * MATCH(d.title_folded) AGAINST (%s IN BOOLEAN MODE)
+                + MATCH(d.title_folded, d.body_folded) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM {SearchDocument._meta.db_table} d
+            JOIN {Book._meta.db_table} b ON b.id = d.book_id
+            WHERE MATCH(d.title_folded, d.body_folded) AGAINST (%s IN BOOLEAN MODE)
+                AND b.is_published = 1
+            ORDER BY score DESC
+            LIMIT %s
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [cls.TITLE_WEIGHT, expression, expression, expression, limit])
+            return [(doc_id, float(score)) for doc_id, score in cursor.fetchall()]
+
+    @classmethod
+    def _search_fallback(cls, phrases, terms, limit):
+        """Substring match on folded columns; title hits rank first."""
+        needles = [' '.join(phrase) for phrase in phrases] + list(terms)
+        queryset = SearchDocument.objects.filter(book__is_published=True)
+        for needle in needles:
+            queryset = queryset.filter(Q(title_folded__contains=needle) | Q(body_folded__contains=needle))
+
+        ranked = []
+        for doc_id, title_folded in queryset.values_list('id', 'title_folded')[:limit * 5]:
+            ranked.append((doc_id, float(sum(needle in title_folded for needle in needles))))
+        ranked.sort(key=lambda item: -item[1])
+        return ranked[:limit]
@@ -1,8 +1,31 @@
 """
 Serializers for catalog app.
 """
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from apps.common.enums import AssetType
+from apps.users.services import EntitlementService
+from .covers import cover_srcset
 from .models import Book, Unit, Asset
+from .search import CatalogSearch
+
+
+class CoverSrcsetField(serializers.Field):
+    """Read-only srcset strings per format built from Book.cover_variants."""
+    
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', 'cover_variants')
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get('request')
+        
+        def build_url(name):
+            url = default_storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+        
+        return cover_srcset(value, build_url)
 
 
 class AssetSerializer(serializers.ModelSerializer):
@@ -56,7 +79,8 @@ class UnitDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Unit
         fields = [
-            'id', 'title', 'order', 'transcript', 'is_free',
+            'id', 'title', 'order', 'is_free',
+            'transcript_digest', 'transcript_sections', 'transcript_bytes',
             'duration_sec', 'duration_formatted', 'has_quiz',
             'assets', 'created_at'
         ]
@@ -65,72 +89,153 @@ class UnitDetailSerializer(serializers.ModelSerializer):
 class BookListSerializer(serializers.ModelSerializer):
     """Serializer for book list."""
     
-    unit_count = serializers.ReadOnlyField()
-    free_units_count = serializers.ReadOnlyField()
+    cover_srcset = CoverSrcsetField()
+    free_units_count = serializers.IntegerField(source='free_unit_count', read_only=True)
     is_owned = serializers.SerializerMethodField()
     
     class Meta:
         model = Book
         fields = [
-            'id', 'title', 'slug', 'description', 'cover',
+            'id', 'title', 'slug', 'description', 'cover', 'cover_srcset',
             'price', 'is_published', 'unit_count', 'free_units_count',
             'is_owned', 'created_at'
         ]
 
     def get_is_owned(self, obj):
         """Check if current user owns this book."""
+        # Prefer the Exists() annotation from BookQuerySet.with_ownership
+        if hasattr(obj, 'is_owned_by_user'):
+            return obj.is_owned_by_user
+        
         request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
+        if not request:
             return False
         
-        from apps.users.models import Enrollment
-        return Enrollment.objects.filter(
-            user=request.user,
-            book=obj,
-            is_active=True
-        ).exists()
+        return EntitlementService.has_book_access(request.user, obj)
 
 
 class BookDetailSerializer(serializers.ModelSerializer):
     """Serializer for book detail with units."""
     
-    unit_count = serializers.ReadOnlyField()
-    free_units_count = serializers.ReadOnlyField()
+    cover_srcset = CoverSrcsetField()
+    free_units_count = serializers.IntegerField(source='free_unit_count', read_only=True)
     is_owned = serializers.SerializerMethodField()
     units = serializers.SerializerMethodField()
     
     class Meta:
         model = Book
         fields = [
-            'id', 'title', 'slug', 'description', 'cover',
+            'id', 'title', 'slug', 'description', 'cover', 'cover_srcset',
             'price', 'is_published', 'unit_count', 'free_units_count',
             'is_owned', 'units', 'created_at'
         ]
 
     def get_is_owned(self, obj):
         """Check if current user owns this book."""
+        # Prefer the Exists() annotation from BookQuerySet.with_ownership
+        if hasattr(obj, 'is_owned_by_user'):
+            return obj.is_owned_by_user
+        
         request = self.context.get('request')
-        if not request or not request.user.is_authenticated:
+        if not request:
             return False
         
-        from apps.users.models import Enrollment
-        return Enrollment.objects.filter(
-            user=request.user,
-            book=obj,
-            is_active=True
-        ).exists()
+        return EntitlementService.has_book_access(request.user, obj)
 
     def get_units(self, obj):
         """Return units (preview only if not owned)."""
         request = self.context.get('request')
         is_owned = self.get_is_owned(obj)
         
-        # If owned, return all units; otherwise only free units
-        if is_owned:
-            units = obj.units.all()
-        else:
-            # Return first 3 units or all free units
-            units = obj.units.filter(is_free=True)[:3]
+        # If owned, return all units; otherwise only free units.
+        # Filter in Python so the prefetched units are reused.
+        units = obj.units.all()
+        if not is_owned:
+            # Return first 3 free units
+            units = [unit for unit in units if unit.is_free][:3]
         
         return UnitListSerializer(units, many=True, context=self.context).data
 
+
+class SearchResultSerializer(serializers.Serializer):
+    """Serializer for ranked search documents from CatalogSearch.search()."""
+    
+    kind = serializers.CharField()
+    score = serializers.FloatField()
+    book = serializers.SerializerMethodField()
+    unit = serializers.SerializerMethodField()
+    title = serializers.SerializerMethodField()
+    snippet = serializers.SerializerMethodField()
+
+    def get_book(self, obj):
+        """Return minimal book info."""
+        return {'id': obj.book_id, 'title': obj.book.title, 'slug': obj.book.slug}
+
+    def get_unit(self, obj):
+        """Return minimal unit info for unit results."""
+        if obj.unit_id is None:
+            return None
+        return {'id': obj.unit_id, 'title': obj.unit.title, 'is_free': obj.unit.is_free}
+
+    def get_title(self, obj):
+        """Return the highlighted title."""
+        return CatalogSearch.highlight(obj.title, obj.title_folded, obj.match_terms)
+
+    def get_snippet(self, obj):
+        """Highlighted excerpt; transcripts of locked units are not excerpted."""
+        if obj.unit_id is not None:
+            request = self.context.get('request')
+            user = request.user if request else None
+            if user is None or not EntitlementService.can_access_unit(user, obj.unit):
+                return ''
+        return CatalogSearch.highlight(
+            obj.body, obj.body_folded, obj.match_terms, length=CatalogSearch.SNIPPET_LENGTH
+        )
+
+
+class PlaylistRequestSerializer(serializers.Serializer):
+    """Serializer for selecting assets to sign in a book playlist."""
+    
+    asset_type = serializers.ChoiceField(choices=AssetType.choices, required=False)
+    from_order = serializers.IntegerField(min_value=0, required=False)
+    to_order = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        """Check the unit order range is not reversed."""
+        if attrs.get('from_order', 0) > attrs.get('to_order', attrs.get('from_order', 0)):
+            raise serializers.ValidationError('from_order must not be greater than to_order.')
+        return attrs
+
+
+class TranscriptQuerySerializer(serializers.Serializer):
+    """Serializer for transcript endpoint query parameters."""
+    
+    output = serializers.ChoiceField(choices=['sections', 'html'], default='sections')
+    section = serializers.IntegerField(min_value=0, required=False)
+    start = serializers.FloatField(min_value=0, required=False)
+    end = serializers.FloatField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        """Check the time range is not reversed."""
+        if 'start' in attrs and 'end' in attrs and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('start must not be greater than end.')
+        return attrs
+
+
+class CueQuerySerializer(serializers.Serializer):
+    """
+    Serializer for cue endpoint query parameters.
+
+    The public names are ``from``/``to``; the view maps them to start/end.
+    """
+    
+    start = serializers.FloatField(min_value=0, required=False)
+    end = serializers.FloatField(min_value=0, required=False)
+    q = serializers.CharField(max_length=200, required=False, trim_whitespace=True)
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=50)
+
+    def validate(self, attrs):
+        """Check the time range is not reversed."""
+        if 'start' in attrs and 'end' in attrs and attrs['start'] > attrs['end']:
+            raise serializers.ValidationError('from must not be greater than to.')
+        return attrs
@@ -0,0 +1,1062 @@
+"""
+Business logic services for catalog app.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from apps.common.enums import AssetType, IngestStatus
+from apps.common.utils.helpers import stream_file_digest
+from apps.common.utils.security import extract_audio_metadata, probe_audio_duration
+from .bundles import bundle_units, describe_bundle, write_bundle
+from .cache import CatalogCache
+from .covers import build_cover_variants, render_cover_variants
+from .models import Asset, AssetBlob, Book, CueIndex, OfflineBundle, Unit
+from .subtitles import MAX_SUBTITLE_BYTES, parse_subtitles
+
+logger = logging.getLogger(__name__)
+
+BOOK_COUNTER_FIELDS = [
+    'unit_count', 'free_unit_count', 'total_duration_sec', 'units_with_audio', 'units_with_quiz'
+]
+
+
+def make_process_pool(workers):
+    """
+    Return a process pool, or None to work serially.
+    
+    Args:
+        workers: Pool size (default: CPU count; 1 runs serially)
+    """
+    workers = workers or multiprocessing.cpu_count()
+    # Daemonic processes (e.g. Celery prefork workers) cannot have children
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return None
+    return ProcessPoolExecutor(max_workers=workers)
+
+
+class CatalogCounterService:
+    """Service for denormalized catalog counters."""
+    
+    @staticmethod
+    def recount_question_counts(unit_ids=None):
+        """
+        Recompute Unit.question_count from the question table.
+        
+        Args:
+            unit_ids: Optional iterable of unit IDs (all units if omitted)
+        
+        Returns:
+            Number of units updated
+        """
+        from apps.quiz.models import Question
+        
+        counts = Question.objects.filter(
+            unit=OuterRef('pk')
+        ).order_by().values('unit').annotate(total=Count('id')).values('total')
+        
+        units = Unit.objects.all()
+        if unit_ids is not None:
+            units = units.filter(pk__in=list(unit_ids))
+        
+        updated = units.update(
+            question_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+        )
+        # units_with_quiz is derived from question_count
+        CatalogCounterService.recount_book_counters(
+            None if unit_ids is None else set(units.values_list('book_id', flat=True))
+        )
+        return updated
+    
+    @staticmethod
+    def adjust_book(book_id, **deltas):
+        """
+        Apply counter deltas to a book with one atomic F() update.
+        
+        Args:
+            book_id: Book ID
+            **deltas: Counter field -> signed change (zeros are skipped)
+        """
+        changes = {
+            field: Greatest(F(field) + delta, Value(0))
+            for field, delta in deltas.items()
+            if delta
+        }
+        if book_id and changes:
+            Book.objects.filter(pk=book_id).update(**changes)
+    
+    @staticmethod
+    def recount_units_with_audio(unit_ids):
+        """
+        Recompute Book.units_with_audio in a single UPDATE.
+        
+        Several audio assets of one unit are deleted in one batch before
+        their signals run, so this is recomputed rather than decremented.
+        
+        Args:
+            unit_ids: IDs of units whose audio assets changed
+        """
+        units = Unit.objects.filter(
+            book=OuterRef('pk'), assets__type=AssetType.AUDIO
+        ).order_by().values('book').annotate(total=Count('id', distinct=True)).values('total')
+        Book.objects.filter(
+            pk__in=Unit.objects.filter(pk__in=list(unit_ids)).values('book_id')
+        ).update(
+            units_with_audio=Coalesce(Subquery(units, output_field=IntegerField()), 0)
+        )
+    
+    @classmethod
+    def set_units_free(cls, unit_ids, is_free):
+        """
+        Set is_free on units in bulk and adjust book counters.
+        
+        Args:
+            unit_ids: Unit IDs
+            is_free: New value
+        
+        Returns:
+            Number of units changed
+        """
+        units = Unit.objects.filter(pk__in=list(unit_ids)).exclude(is_free=is_free)
+        with transaction.atomic():
+            per_book = list(
+                units.select_for_update().order_by().values('book_id').annotate(total=Count('id'))
+                .values_list('book_id', 'total')
+            )
+            updated = units.update(is_free=is_free)
+            for book_id, total in per_book:
+                cls.adjust_book(book_id, free_unit_count=total if is_free else -total)
+        return updated
+    
+    @staticmethod
+    def recount_book_counters(book_ids=None):
+        """
+        Recompute every denormalized Book counter from units.
+        
+        Args:
+            book_ids: Optional iterable of book IDs (all books if omitted)
+        
+        Returns:
+            Number of books whose counters had drifted
+        """
+        def unit_subquery(aggregate, **filters):
+            units = Unit.objects.filter(book=OuterRef('pk'), **filters).order_by().values('book')
+            return Coalesce(
+                Subquery(units.annotate(total=aggregate).values('total'), output_field=IntegerField()), 0
+            )
+        
+        books = Book.objects.all()
+        if book_ids is not None:
+            books = books.filter(pk__in=list(book_ids))
+        books = books.annotate(
+            expected_unit_count=unit_subquery(Count('id')),
+            expected_free_unit_count=unit_subquery(Count('id'), is_free=True),
+            expected_total_duration_sec=unit_subquery(Sum('duration_sec')),
+            expected_units_with_audio=unit_subquery(Count('id', distinct=True), assets__type=AssetType.AUDIO),
+            expected_units_with_quiz=unit_subquery(Count('id'), question_count__gt=0),
+        ).only('id', *BOOK_COUNTER_FIELDS)
+        
+        changed = []
+        for book in books:
+            drifted = False
+            for field in BOOK_COUNTER_FIELDS:
+                expected = getattr(book, f'expected_{field}')
+                if getattr(book, field) != expected:
+                    setattr(book, field, expected)
+                    drifted = True
+            if drifted:
+                changed.append(book)
+        Book.objects.bulk_update(changed, BOOK_COUNTER_FIELDS, batch_size=500)
+        return len(changed)
+
+
+class AssetIngestionService:
+    """
+    Service for post-upload asset processing.
+    
+    Uploads only store the file; checksum, size and audio metadata are
+    computed later by the ingest_asset Celery task, streaming the file
+    in fixed-size buffers.
+    """
+    
+    @staticmethod
+    def schedule(*asset_ids):
+        """
+        Mark assets pending and queue ingestion after the transaction commits.
+        
+        Args:
+            *asset_ids: IDs of assets whose file changed
+        """
+        from .tasks import ingest_asset
+        
+        asset_ids = [asset_id for asset_id in asset_ids if asset_id is not None]
+        if not asset_ids:
+            return
+        
+        Asset.objects.filter(pk__in=asset_ids).update(
+            ingest_status=IngestStatus.PENDING,
+            ingest_error=''
+        )
+        for asset_id in asset_ids:
+            transaction.on_commit(lambda asset_id=asset_id: ingest_asset.delay(asset_id))
+    
+    @staticmethod
+    def ingest(asset_id):
+        """
+        Compute checksum, size and metadata for an asset.
+        
+        Args:
+            asset_id: Asset ID
+        
+        Returns:
+            Final IngestStatus value, or None if the asset is gone or its
+            file was replaced meanwhile (the replacement's task records it)
+        """
+        asset = Asset.objects.only('id', 'unit_id', 'type', 'file').filter(pk=asset_id).first()
+        if asset is None:
+            return None
+        # Every write is conditional on the file read here, so a stale task never
+        # overwrites a replacement; re-running is harmless otherwise
+        current = Asset.objects.filter(pk=asset_id, file=asset.file.name)
+        if not current.update(ingest_status=IngestStatus.PROCESSING):
+            return None
+        
+        if not asset.file:
+            current.update(ingest_status=IngestStatus.READY)
+            return IngestStatus.READY
+        
+        try:
+            with asset.file.open('rb') as fh:
+                checksum, size = stream_file_digest(fh)
+                metadata = {}
+                if asset.type == AssetType.AUDIO:
+                    # mutagen only reads headers/frames it needs, not the whole file
+                    fh.seek(0)
+                    metadata = extract_audio_metadata(fh)
+                cues = None
+                if asset.type == AssetType.SUBTITLE and size <= MAX_SUBTITLE_BYTES:
+                    fh.seek(0)
+                    cues = parse_subtitles(fh.read().decode('utf-8-sig', errors='replace'))
+        except Exception as e:
+            logger.exception('Ingestion failed for asset %s', asset_id)
+            if not current.update(ingest_status=IngestStatus.FAILED, ingest_error=str(e)[:500]):
+                return None
+            return IngestStatus.FAILED
+        
+        with transaction.atomic():
+            updated = current.update(
+                bytes=size,
+                checksum=checksum,
+                metadata=metadata,
+                ingest_status=IngestStatus.READY,
+                ingest_error='',
+                ingested_at=timezone.now()
+            )
+            if not updated:
+                return None
+            if metadata.get('duration_sec'):
+                unit = Unit.objects.select_for_update().only('id', 'book_id', 'duration_sec').get(pk=asset.unit_id)
+                Unit.objects.filter(pk=unit.pk).update(duration_sec=metadata['duration_sec'])
+                CatalogCounterService.adjust_book(
+                    unit.book_id, total_duration_sec=metadata['duration_sec'] - unit.duration_sec
+                )
+            if cues is not None:
+                SubtitleIndexService.store(asset, cues, checksum)
+        
+        try:
+            AssetBlobService.adopt(asset_id, checksum, size, asset.file.name)
+        except Exception:
+            # The asset stays usable under its upload name; dedupe_assets retries
+            logger.exception('Moving asset %s to blob storage failed', asset_id)
+        
+        # Queryset updates skip the catalog signals
+        CatalogCache.bump_version()
+        return IngestStatus.READY
+
+
+class AssetBlobService:
+    """
+    Service for content-addressed asset storage.
+    
+    Ingested files are stored once per SHA-256 under blobs/ and every
+    Asset with that content points its file at the shared blob, so
+    identical uploads share one signed-URL target and one CDN cache entry.
+    """
+    
+    @classmethod
+    def adopt(cls, asset_id, checksum, size, name):
+        """
+        Point an ingested asset at the blob for its content.
+        
+        The blob is created from the asset's file if it does not exist
+        yet; the original upload is deleted once nothing refers to it.
+        Nothing happens if the asset's file is no longer the one that was
+        hashed: the replacement's own ingestion adopts it.
+        
+        Args:
+            asset_id: Asset ID
+            checksum: SHA-256 of the file named name
+            size: File size in bytes
+            name: Storage name of the file that was hashed
+        
+        Returns:
+            AssetBlob instance, or None if the asset is gone or its file changed
+        """
+        asset = Asset.objects.only('id', 'file', 'blob_id').filter(pk=asset_id, file=name).first()
+        if asset is None or not asset.file:
+            return None
+        
+        blob = None
+        # A blob released between lookup and increment is gone; retry once
+        for _ in range(2):
+            blob = cls._get_or_store(checksum, asset.file, size)
+            with transaction.atomic():
+                if blob.pk == asset.blob_id:
+                    previous_blob_id = None
+                elif AssetBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1):
+                    previous_blob_id = asset.blob_id
+                else:
+                    continue
+                if not Asset.objects.filter(pk=asset_id, file=name).update(blob=blob, file=blob.file.name):
+                    # Replaced after the lookup; undo the reference taken above
+                    transaction.set_rollback(True)
+                    return None
+                if previous_blob_id:
+                    cls.release(previous_blob_id)
+            break
+        else:
+            raise RuntimeError(f'Blob {checksum} disappeared while adopting asset {asset_id}.')
+        
+        if name != blob.file.name:
+            transaction.on_commit(lambda: cls._delete_unreferenced(name))
+        return blob
+    
+    @classmethod
+    def release(cls, blob_id):
+        """
+        Drop one reference to a blob, deleting it when none are left.
+        
+        Args:
+            blob_id: AssetBlob ID
+        """
+        with transaction.atomic():
+            blob = AssetBlob.objects.select_for_update().filter(pk=blob_id).first()
+            if blob is None:
+                return
+            if blob.ref_count > 1:
+                AssetBlob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+                return
+            if Asset.objects.filter(blob_id=blob_id).exists():
+                # Counter drifted; recount() repairs it, never delete shared content
+                return
+            name = blob.file.name
+            blob.delete()
+        transaction.on_commit(lambda: default_storage.delete(name))
+    
+    @classmethod
+    def dedupe(cls, dry_run=False):
+        """
+        Move already-ingested assets into blob storage.
+        
+        Args:
+            dry_run: Only report what would be shared
+        
+        Returns:
+            Dictionary with assets, duplicates, reclaimed_bytes, unchecked
+            (assets without a checksum yet), recounted and errors
+            (list of {asset_id, file, error})
+        """
+        pending = Asset.objects.filter(blob__isnull=True).exclude(file='')
+        rows = list(pending.exclude(checksum='').order_by('id').values_list('id', 'checksum', 'bytes', 'file'))
+        stored = set(
+            AssetBlob.objects.filter(sha256__in={checksum for _, checksum, _, _ in rows})
+            .values_list('sha256', flat=True)
+        )
+        
+        result = {
+            'assets': len(rows),
+            'duplicates': 0,
+            'reclaimed_bytes': 0,
+            'unchecked': pending.filter(checksum='').count(),
+            'recounted': 0,
+            'errors': [],
+        }
+        for asset_id, checksum, size, name in rows:
+            if checksum in stored:
+                result['duplicates'] += 1
+                result['reclaimed_bytes'] += size
+            stored.add(checksum)
+            if dry_run:
+                continue
+            try:
+                cls.adopt(asset_id, checksum, size, name)
+            except Exception as e:
+                result['errors'].append({'asset_id': asset_id, 'file': name, 'error': str(e)})
+        
+        if not dry_run:
+            result['recounted'] = cls.recount()
+            if rows:
+                # Asset file names changed through queryset updates
+                CatalogCache.bump_version()
+        return result
+    
+    @staticmethod
+    def recount():
+        """
+        Recompute ref_count from Asset rows.
+        
+        Returns:
+            Number of blobs whose counter was corrected
+        """
+        counts = dict(
+            Asset.objects.filter(blob__isnull=False).values('blob_id')
+            .annotate(total=Count('id')).values_list('blob_id', 'total')
+        )
+        changed = []
+        for blob in AssetBlob.objects.only('id', 'ref_count'):
+            if blob.ref_count != counts.get(blob.pk, 0):
+                blob.ref_count = counts.get(blob.pk, 0)
+                changed.append(blob)
+        AssetBlob.objects.bulk_update(changed, ['ref_count'])
+        return len(changed)
+    
+    @staticmethod
+    def _get_or_store(checksum, source, size):
+        """Return the blob for checksum, copying source into storage if new."""
+        blob = AssetBlob.objects.filter(sha256=checksum).first()
+        if blob is not None:
+            return blob
+        
+        extension = os.path.splitext(source.name)[1].lower()
+        with source.open('rb') as fh:
+            name = default_storage.save(AssetBlob.build_name(checksum, extension), fh)
+        blob, created = AssetBlob.objects.get_or_create(
+            sha256=checksum,
+            defaults={'file': name, 'bytes': size}
+        )
+        if not created:
+            # Another worker stored the same content first
+            default_storage.delete(name)
+        return blob
+    
+    @staticmethod
+    def _delete_unreferenced(name):
+        """Delete a superseded upload unless another asset still uses it."""
+        if not Asset.objects.filter(file=name).exists() and not AssetBlob.objects.filter(file=name).exists():
+            default_storage.delete(name)
+
+
+class SubtitleIndexService:
+    """Service for per-unit subtitle cue indexes."""
+    
+    @staticmethod
+    def store(asset, cues, checksum=''):
+        """
+        Replace the cue index of the asset's unit.
+        
+        Args:
+            asset: Subtitle asset the cues were parsed from
+            cues: Sorted (start_ms, end_ms, text) tuples from parse_subtitles()
+            checksum: Checksum of the subtitle file
+        
+        Returns:
+            CueIndex instance
+        """
+        # A unit keeps one index; a newer subtitle upload replaces the old one
+        CueIndex.objects.filter(unit_id=asset.unit_id).exclude(asset_id=asset.pk).delete()
+        index, _ = CueIndex.objects.update_or_create(
+            asset_id=asset.pk,
+            defaults={
+                'unit_id': asset.unit_id,
+                'starts': [start for start, _, _ in cues],
+                'ends': [end for _, end, _ in cues],
+                'texts': [text for _, _, text in cues],
+                'max_duration_ms': max((end - start for start, end, _ in cues), default=0),
+                'checksum': checksum,
+            }
+        )
+        return index
+
+
+class CoverVariantService:
+    """
+    Service for responsive cover images.
+    
+    Covers are resized once after upload into WebP/JPEG variants with
+    content-hashed names; API payloads only reference the variants.
+    """
+    
+    @staticmethod
+    def schedule(book_id):
+        """
+        Queue variant generation after the transaction commits.
+        
+        Args:
+            book_id: ID of the book whose cover changed
+        """
+        from .tasks import generate_cover_variants
+        
+        transaction.on_commit(lambda: generate_cover_variants.delay(book_id))
+    
+    @classmethod
+    def generate(cls, book_id):
+        """
+        Render variants for a book's current cover.
+        
+        Args:
+            book_id: Book ID
+        
+        Returns:
+            Variants dict, or None if the book has no cover
+        """
+        name = Book.objects.filter(pk=book_id).values_list('cover', flat=True).first()
+        if not name:
+            return None
+        
+        variants = build_cover_variants(name)
+        cls._store(book_id, variants)
+        return variants
+    
+    @classmethod
+    def backfill(cls, workers=None, force=False, chunk_size=100):
+        """
+        Render variants for existing covers in a process pool.
+        
+        Args:
+            workers: Process pool size (default: CPU count; 1 runs serially)
+            force: Also re-render books whose variants are up to date
+            chunk_size: Covers per batch
+        
+        Returns:
+            Dictionary with processed, updated and errors
+            (list of {book_id, file, error})
+        """
+        rows = [
+            (book_id, name)
+            for book_id, name, variants in Book.objects.exclude(cover='').exclude(cover__isnull=True)
+            .order_by('id').values_list('id', 'cover', 'cover_variants')
+            if force or (variants or {}).get('source') != name
+        ]
+        
+        result = {'processed': 0, 'updated': 0, 'errors': []}
+        pool = make_process_pool(workers)
+        mapper = pool.map if pool is not None else map
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                rendered = mapper(render_cover_variants, [name for _, name in chunk])
+                for (book_id, name), (variants, error) in zip(chunk, rendered):
+                    result['processed'] += 1
+                    if error:
+                        result['errors'].append({'book_id': book_id, 'file': name, 'error': error})
+                    elif cls._store(book_id, variants, bump=False):
+                        result['updated'] += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        if result['updated']:
+            CatalogCache.bump_version()
+        return result
+    
+    @staticmethod
+    def _store(book_id, variants, bump=True):
+        """Save variants unless the cover was replaced while rendering."""
+        updated = Book.objects.filter(pk=book_id, cover=variants['source']).update(
+            cover_variants=variants
+        )
+        if updated and bump:
+            # Queryset updates skip the catalog signals
+            CatalogCache.bump_version()
+        return updated
+
+
+class OfflineBundleService:
+    """
+    Service for offline download bundles.
+    
+    A bundle is built once per content key by a Celery task, stored, and
+    then served through the signed media gateway, which supports Range
+    requests so interrupted downloads resume.
+    """
+    
+    # Builds not finished within this time are assumed lost and re-queued
+    STALE_AFTER = timedelta(minutes=30)
+    
+    @staticmethod
+    def describe(unit_ids):
+        """
+        Get the content key and manifest for a set of units.
+        
+        Cached per catalog version, so repeated requests do not reload
+        assets and questions.
+        
+        Args:
+            unit_ids: Unit IDs of one book
+        
+        Returns:
+            Tuple (content_key, manifest)
+        """
+        unit_ids = sorted(unit_ids)
+        key = CatalogCache.make_key('bundle:describe', *unit_ids)
+        content_key, manifest = CatalogCache.get_or_build(
+            key, lambda: describe_bundle(bundle_units(unit_ids))[:2]
+        )
+        return content_key, manifest
+    
+    @classmethod
+    def get_or_schedule(cls, book, unit_ids, unit=None):
+        """
+        Return the bundle for units, queuing a build if it does not exist yet.
+        
+        Args:
+            book: Book the units belong to
+            unit_ids: Accessible unit IDs to include
+            unit: The unit, for single-unit bundles (optional)
+        
+        Returns:
+            Tuple (OfflineBundle, manifest)
+        """
+        content_key, manifest = cls.describe(unit_ids)
+        bundle, created = OfflineBundle.objects.get_or_create(
+            content_key=content_key,
+            defaults={
+                'book': book,
+                'unit': unit,
+                'unit_ids': [entry['id'] for entry in manifest['units']],
+            }
+        )
+        
+        stale = (
+            bundle.status in (IngestStatus.PENDING, IngestStatus.PROCESSING)
+            and bundle.updated_at < timezone.now() - cls.STALE_AFTER
+        )
+        if created or stale or bundle.status == IngestStatus.FAILED:
+            cls.schedule(bundle)
+        return bundle, manifest
+    
+    @staticmethod
+    def schedule(bundle):
+        """
+        Mark a bundle pending and queue its build after the transaction commits.
+        
+        Args:
+            bundle: OfflineBundle instance
+        """
+        from .tasks import build_offline_bundle
+        
+        bundle.status = IngestStatus.PENDING
+        bundle.error = ''
+        bundle.save(update_fields=['status', 'error', 'updated_at'])
+        transaction.on_commit(lambda: build_offline_bundle.delay(bundle.pk))
+    
+    @staticmethod
+    def build(bundle_id):
+        """
+        Write and store the zip for a bundle.
+        
+        Args:
+            bundle_id: OfflineBundle ID
+        
+        Returns:
+            Final IngestStatus value, or None if the bundle is gone or
+            already being built
+        """
+        claimed = OfflineBundle.objects.filter(
+            pk=bundle_id, status=IngestStatus.PENDING
+        ).update(status=IngestStatus.PROCESSING, updated_at=timezone.now())
+        if not claimed:
+            return None
+        
+        bundle = OfflineBundle.objects.get(pk=bundle_id)
+        try:
+            units = bundle_units(bundle.unit_ids, with_transcript=True)
+            if not units:
+                raise ValueError('Bundle has no units.')
+            content_key, manifest, files = describe_bundle(units)
+            if content_key != bundle.content_key:
+                # A newer request gets a bundle for the new content key
+                raise ValueError('Content changed before the bundle was built.')
+            
+            with tempfile.TemporaryFile() as fh:
+                write_bundle(fh, manifest, files)
+                size = fh.tell()
+                fh.seek(0)
+                name = default_storage.save(f'bundles/{content_key}.zip', File(fh))
+        except Exception as e:
+            logger.exception('Building offline bundle %s failed', bundle_id)
+            OfflineBundle.objects.filter(pk=bundle_id).update(
+                status=IngestStatus.FAILED,
+                error=str(e)[:500],
+                updated_at=timezone.now()
+            )
+            return IngestStatus.FAILED
+        
+        OfflineBundle.objects.filter(pk=bundle_id).update(
+            status=IngestStatus.READY,
+            file=name,
+            bytes=size,
+            updated_at=timezone.now()
+        )
+        return IngestStatus.READY
+
+
+class AudioDurationService:
+    """
+    Bulk recomputation of Unit.duration_sec from audio files.
+    
+    Files are probed in a process pool, durations are written back with
+    bulk_update() per chunk, and progress is checkpointed in the cache so
+    an interrupted run resumes after the last finished chunk.
+    """
+    
+    CHECKPOINT_KEY = 'catalog:durations:checkpoint:{scope}'
+    CHECKPOINT_TIMEOUT = 60 * 60 * 24 * 7  # 7 days
+    
+    @classmethod
+    def recompute(cls, book_slug=None, unit_ids=None, workers=None, chunk_size=200, restart=False):
+        """
+        Recompute durations for a book, a set of units or the whole library.
+        
+        Args:
+            book_slug: Limit to units of this book (optional)
+            unit_ids: Limit to these units (optional)
+            workers: Process pool size (default: CPU count; 1 runs serially)
+            chunk_size: Assets per probe/write batch
+            restart: Ignore a saved checkpoint
+        
+        Returns:
+            Dictionary with processed, updated, resumed_from and errors
+            (list of {asset_id, unit_id, file, error})
+        """
+        key = cls.CHECKPOINT_KEY.format(scope=cls._scope(book_slug, unit_ids))
+        if restart:
+            cache.delete(key)
+        state = cache.get(key) or {'last_id': 0, 'processed': 0, 'updated': 0, 'errors': []}
+        resumed_from = state['last_id']
+        
+        # The first audio upload of each unit is its primary audio
+        assets = Asset.objects.filter(type=AssetType.AUDIO).exclude(file='')
+        if book_slug:
+            assets = assets.filter(unit__book__slug=book_slug)
+        if unit_ids is not None:
+            assets = assets.filter(unit_id__in=list(unit_ids))
+        primary_ids = assets.values('unit_id').annotate(first_id=Min('id')).values('first_id')
+        rows = list(
+            Asset.objects.filter(id__in=Subquery(primary_ids), id__gt=state['last_id'])
+            .order_by('id')
+            .values_list('id', 'unit_id', 'file')
+        )
+        
+        pool = make_process_pool(workers)
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                cls._process_chunk(chunk, pool, state)
+                state['last_id'] = chunk[-1][0]
+                cache.set(key, state, cls.CHECKPOINT_TIMEOUT)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        cache.delete(key)
+        if state['updated']:
+            # bulk_update() skips the catalog signals
+            CatalogCache.bump_version()
+        
+        return {
+            'processed': state['processed'],
+            'updated': state['updated'],
+            'resumed_from': resumed_from,
+            'errors': state['errors'],
+        }
+    
+    @classmethod
+    def _process_chunk(cls, chunk, pool, state):
+        """Probe one chunk of (asset_id, unit_id, file) rows and save changes."""
+        paths = []
+        for asset_id, unit_id, name in chunk:
+            try:
+                paths.append(default_storage.path(name))
+            except Exception as e:
+                paths.append(None)
+                state['errors'].append(
+                    {'asset_id': asset_id, 'unit_id': unit_id, 'file': name, 'error': str(e)}
+                )
+        
+        probe_paths = [path for path in paths if path is not None]
+        mapper = pool.map if pool is not None else map
+        probed = iter(mapper(probe_audio_duration, probe_paths))
+        
+        current = {
+            unit_id: (book_id, duration_sec)
+            for unit_id, book_id, duration_sec in Unit.objects.filter(
+                pk__in=[unit_id for _, unit_id, _ in chunk]
+            ).values_list('id', 'book_id', 'duration_sec')
+        }
+        changed = []
+        book_deltas = {}
+        for (asset_id, unit_id, name), path in zip(chunk, paths):
+            if path is None:
+                continue
+            duration, error = next(probed)
+            if error:
+                state['errors'].append(
+                    {'asset_id': asset_id, 'unit_id': unit_id, 'file': name, 'error': error}
+                )
+            elif duration and unit_id in current and current[unit_id][1] != duration:
+                book_id, previous = current[unit_id]
+                changed.append(Unit(pk=unit_id, duration_sec=duration))
+                book_deltas[book_id] = book_deltas.get(book_id, 0) + duration - previous
+        
+        with transaction.atomic():
+            Unit.objects.bulk_update(changed, ['duration_sec'])
+            for book_id, delta in book_deltas.items():
+                CatalogCounterService.adjust_book(book_id, total_duration_sec=delta)
+        state['processed'] += len(chunk)
+        state['updated'] += len(changed)
+    
+    @staticmethod
+    def _scope(book_slug, unit_ids):
+        """Stable checkpoint scope for a selection of units."""
+        if unit_ids is not None:
+            ids = ','.join(str(unit_id) for unit_id in sorted(unit_ids))
+            return 'units:' + hashlib.sha256(ids.encode('utf-8')).hexdigest()[:16]
+        return f'book:{book_slug}' if book_slug else 'all'
+
+
+class CatalogCloneService:
+    """
+    Service for copying catalog content.
+    
+    Each level of the tree is inserted with one bulk_create() and old IDs
+    are remapped to new ones, so cloning costs a fixed number of queries
+    regardless of book size. bulk_create() skips signals, so counters,
+    blob references and search documents are updated explicitly.
+    """
+    
+    @classmethod
+    @transaction.atomic
+    def clone_book(cls, book_id, title=None, slug=None):
+        """
+        Copy a book with its units, assets, questions and choices.
+        
+        Asset files are shared by reference, never copied. The clone is
+        created unpublished.
+        
+        Args:
+            book_id: Source book ID
+            title: Title of the copy (default: "<title> (Copy)")
+            slug: Slug of the copy (default: unique "<slug>-copy")
+        
+        Returns:
+            New Book instance
+        """
+        from apps.quiz.models import Question
+        from .search import CatalogSearch
+        
+        source = Book.objects.get(pk=book_id)
+        book = Book.objects.create(
+            title=title or f'{source.title} (Copy)',
+            slug=slug or cls._unique_slug(f'{source.slug}-copy'),
+            description=source.description,
+            cover=source.cover.name or None,
+            # Variants are keyed by the cover file, so the copy reuses them as-is
+            cover_variants=source.cover_variants,
+            price=source.price,
+            is_published=False,
+        )
+        
+        # Units
+        source_units = list(Unit.objects.filter(book=source).order_by('id'))
+        units = cls._bulk_create(Unit, [
+            Unit(
+                book=book,
+                title=unit.title,
+                order=unit.order,
+                transcript=unit.transcript,
+                transcript_digest=unit.transcript_digest,
+                transcript_sections=unit.transcript_sections,
+                transcript_bytes=unit.transcript_bytes,
+                is_free=unit.is_free,
+                duration_sec=unit.duration_sec,
+                question_count=unit.question_count,
+            )
+            for unit in source_units
+        ], Unit.objects.filter(book=book))
+        unit_map = {old.pk: new.pk for old, new in zip(source_units, units)}
+        
+        # Assets share the source files (and blobs)
+        source_assets = list(Asset.objects.filter(unit__book=source).order_by('id'))
+        assets = cls._bulk_create(Asset, [
+            Asset(
+                unit_id=unit_map[asset.unit_id],
+                type=asset.type,
+                file=asset.file.name,
+                file_path=asset.file_path,
+                bytes=asset.bytes,
+                checksum=asset.checksum,
+                is_protected=asset.is_protected,
+                ingest_status=asset.ingest_status,
+                ingest_error=asset.ingest_error,
+                ingested_at=asset.ingested_at,
+                metadata=asset.metadata,
+                blob_id=asset.blob_id,
+            )
+            for asset in source_assets
+        ], Asset.objects.filter(unit__book=book))
+        asset_map = {old.pk: new.pk for old, new in zip(source_assets, assets)}
+        cls._add_blob_references([asset.blob_id for asset in source_assets if asset.blob_id])
+        # Ingestion is scheduled by the post_save signal that bulk_create() skips
+        AssetIngestionService.schedule(*[
+            new.pk for old, new in zip(source_assets, assets) if old.ingest_status != IngestStatus.READY
+        ])
+        
+        CueIndex.objects.bulk_create([
+            CueIndex(
+                unit_id=unit_map[index.unit_id],
+                asset_id=asset_map[index.asset_id],
+                starts=index.starts,
+                ends=index.ends,
+                texts=index.texts,
+                max_duration_ms=index.max_duration_ms,
+                checksum=index.checksum,
+            )
+            for index in CueIndex.objects.filter(unit__book=source)
+            if index.asset_id in asset_map
+        ])
+        
+        # Questions and choices
+        source_questions = list(
+            Question.objects.filter(unit__book=source).prefetch_related('choices').order_by('id')
+        )
+        cls._copy_questions([
+            (question, unit_map[question.unit_id], question.order, question.text)
+            for question in source_questions
+        ], Question.objects.filter(unit__book=book))
+        
+        CatalogCounterService.recount_book_counters([book.pk])
+        CatalogSearch.index_units(units)
+        # bulk_create() skips the catalog signals
+        CatalogCache.bump_version()
+        book.refresh_from_db()
+        return book
+    
+    @classmethod
+    @transaction.atomic
+    def duplicate_questions(cls, question_ids):
+        """
+        Copy questions (with choices) to the end of their own units.
+        
+        Args:
+            question_ids: Source question IDs
+        
+        Returns:
+            Number of questions created
+        """
+        from apps.quiz.cache import AnswerKeyCache
+        from apps.quiz.models import Question
+        
+        questions = list(
+            Question.objects.filter(pk__in=list(question_ids)).prefetch_related('choices').order_by('unit_id', 'order')
+        )
+        existing = Question.objects.filter(unit_id__in={question.unit_id for question in questions})
+        next_order = dict(
+            existing.values('unit_id').annotate(max_order=Max('order')).values_list('unit_id', 'max_order')
+        )
+        last_id = existing.aggregate(last_id=Max('id'))['last_id'] or 0
+        
+        copies = []
+        for question in questions:
+            next_order[question.unit_id] += 1
+            copies.append((question, question.unit_id, next_order[question.unit_id], f'{question.text} (Copy)'))
+        cls._copy_questions(copies, existing.filter(pk__gt=last_id))
+        
+        CatalogCounterService.recount_question_counts(next_order.keys())
+        AnswerKeyCache.bump(*next_order.keys())
+        CatalogCache.bump_version()
+        return len(copies)
+    
+    @classmethod
+    def _copy_questions(cls, copies, scope):
+        """
+        Bulk-insert question copies and their choices.
+        
+        Args:
+            copies: (source question with prefetched choices, unit ID, order, text) tuples
+            scope: Queryset matching only the new questions (see _bulk_create)
+        """
+        from apps.quiz.models import Question, Choice
+        
+        questions = cls._bulk_create(Question, [
+            Question(
+                unit_id=unit_id,
+                type=source.type,
+                text=text,
+                explanation=source.explanation,
+                order=order,
+            )
+            for source, unit_id, order, text in copies
+        ], scope)
+        Choice.objects.bulk_create([
+            Choice(
+                question_id=question.pk,
+                text=choice.text,
+                is_correct=choice.is_correct,
+                order=choice.order,
+            )
+            for (source, _, _, _), question in zip(copies, questions)
+            for choice in source.choices.all()
+        ], batch_size=1000)
+    
+    @staticmethod
+    def _bulk_create(model, objects, scope):
+        """
+        bulk_create() that always returns objects with primary keys.
+        
+        Backends that do not return IDs from bulk inserts (MySQL) get them
+        re-read from ``scope``, a queryset matching only the new rows;
+        bulk inserts assign ascending IDs in object order.
+        """
+        objects = model.objects.bulk_create(objects, batch_size=1000)
+        if objects and objects[-1].pk is None:
+            ids = scope.order_by('id').values_list('id', flat=True)
+            for obj, pk in zip(objects, ids):
+                obj.pk = pk
+        return objects
+    
+    @staticmethod
+    def _add_blob_references(blob_ids):
+        """Increment ref_count for each blob reference (one UPDATE per distinct count)."""
+        per_blob = {}
+        for blob_id in blob_ids:
+            per_blob[blob_id] = per_blob.get(blob_id, 0) + 1
+        by_count = {}
+        for blob_id, count in per_blob.items():
+            by_count.setdefault(count, []).append(blob_id)
+        for count, ids in by_count.items():
+            AssetBlob.objects.filter(pk__in=ids).update(ref_count=F('ref_count') + count)
+    
+    @staticmethod
+    def _unique_slug(base):
+        """Return base, or base-2, base-3... if already taken."""
+        taken = set(
+            Book.objects.filter(slug__startswith=base).values_list('slug', flat=True)
+        )
+        slug, suffix = base, 1
+        while slug in taken:
+            suffix += 1
+            slug = f'{base}-{suffix}'
+        return slug
@@ -0,0 +1,171 @@
+"""
+Signals for catalog app.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.common.enums import AssetType
+from apps.quiz.models import Question, Choice
+from .cache import CatalogCache
+from .models import Book, Unit, Asset
+from .search import CatalogSearch
+from .services import AssetBlobService, AssetIngestionService, CatalogCounterService, CoverVariantService
+from .transcripts import TranscriptCache
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_catalog_cache(sender, **kwargs):
+    """Bump the catalog version when catalog content changes."""
+    CatalogCache.bump_version()
+
+
+@receiver(pre_save, sender=Book)
+def reset_cover_variants(sender, instance, **kwargs):
+    """Drop variants of a replaced or removed cover before saving."""
+    previous = None
+    if instance.pk:
+        previous = Book.objects.filter(pk=instance.pk).values_list('cover', flat=True).first()
+    instance._cover_changed = (previous or '') != (instance.cover.name or '')
+    # Variants rendered from this very file (e.g. copied with it) stay valid
+    if instance.cover and (instance.cover_variants or {}).get('source') == instance.cover.name:
+        instance._cover_changed = False
+    if instance._cover_changed:
+        instance.cover_variants = {}
+
+
+@receiver(post_save, sender=Book)
+def schedule_cover_variants(sender, instance, **kwargs):
+    """Queue variant generation for a new cover."""
+    if instance.cover and getattr(instance, '_cover_changed', False):
+        CoverVariantService.schedule(instance.pk)
+
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    """Refresh the search document of a saved book."""
+    CatalogSearch.index_book(instance)
+
+
+@receiver(post_save, sender=Unit)
+def index_unit(sender, instance, **kwargs):
+    """Refresh the search document of a saved unit."""
+    CatalogSearch.index_unit(instance)
+
+
+@receiver(post_save, sender=Unit)
+def prerender_transcript(sender, instance, update_fields=None, **kwargs):
+    """Render the transcript now so unit requests only read the cache."""
+    if update_fields is not None and 'transcript' not in update_fields:
+        return
+    TranscriptCache.warm(instance.transcript_digest, instance.transcript)
+
+
+@receiver(pre_save, sender=Unit)
+def remember_unit_counters(sender, instance, **kwargs):
+    """Remember counted fields so book counters can be adjusted by delta."""
+    if instance.pk:
+        instance._previous_counters = (
+            Unit.objects.filter(pk=instance.pk)
+            .values_list('book_id', 'is_free', 'duration_sec', 'question_count')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Unit)
+def update_book_counters(sender, instance, created, **kwargs):
+    """Keep Book counters current when units are added or edited."""
+    previous = getattr(instance, '_previous_counters', None)
+    if created or previous is None:
+        CatalogCounterService.adjust_book(
+            instance.book_id,
+            unit_count=1,
+            free_unit_count=int(instance.is_free),
+            total_duration_sec=instance.duration_sec,
+            units_with_quiz=int(instance.question_count > 0),
+        )
+        return
+    
+    book_id, was_free, duration_sec, question_count = previous
+    if book_id != instance.book_id:
+        CatalogCounterService.recount_book_counters([book_id, instance.book_id])
+        return
+    CatalogCounterService.adjust_book(
+        book_id,
+        free_unit_count=int(instance.is_free) - int(was_free),
+        total_duration_sec=instance.duration_sec - duration_sec,
+    )
+
+
+@receiver(post_delete, sender=Unit)
+def decrement_book_counters(sender, instance, **kwargs):
+    """
+    Keep Book counters current when units are removed.
+    
+    Audio and quiz counters were already adjusted by the signals of the
+    unit's assets and questions, which are deleted first.
+    """
+    CatalogCounterService.adjust_book(
+        instance.book_id,
+        unit_count=-1,
+        free_unit_count=-int(instance.is_free),
+        total_duration_sec=-instance.duration_sec,
+    )
+
+
+@receiver(pre_save, sender=Asset)
+def remember_asset_file(sender, instance, **kwargs):
+    """Remember the stored file, type and unit so changes can be detected."""
+    if instance.pk:
+        previous = (
+            Asset.objects.filter(pk=instance.pk).values_list('file', 'type', 'unit_id').first()
+        )
+        instance._previous_file_name, instance._previous_type, instance._previous_unit_id = (
+            previous or (None, None, None)
+        )
+
+
+@receiver(post_save, sender=Asset)
+def schedule_asset_ingestion(sender, instance, created, **kwargs):
+    """Queue background ingestion for new or replaced asset files."""
+    if not instance.file:
+        return
+    if created or getattr(instance, '_previous_file_name', None) != instance.file.name:
+        AssetIngestionService.schedule(instance.pk)
+
+
+@receiver(post_save, sender=Asset)
+def update_audio_counter(sender, instance, created, **kwargs):
+    """Recount Book.units_with_audio when audio is added, moved or retyped."""
+    previous_type = getattr(instance, '_previous_type', None)
+    previous_unit_id = getattr(instance, '_previous_unit_id', None)
+    if created:
+        changed = instance.type == AssetType.AUDIO
+    else:
+        changed = AssetType.AUDIO in (instance.type, previous_type) and (
+            instance.type != previous_type or instance.unit_id != previous_unit_id
+        )
+    if changed:
+        CatalogCounterService.recount_units_with_audio({instance.unit_id, previous_unit_id or instance.unit_id})
+
+
+@receiver(post_delete, sender=Asset)
+def update_audio_counter_on_delete(sender, instance, **kwargs):
+    """Recount Book.units_with_audio when an audio asset is removed."""
+    if instance.type == AssetType.AUDIO:
+        CatalogCounterService.recount_units_with_audio([instance.unit_id])
+
+
+@receiver(post_delete, sender=Asset)
+def release_asset_blob(sender, instance, **kwargs):
+    """Drop the deleted asset's reference to its shared file."""
+    if instance.blob_id:
+        AssetBlobService.release(instance.blob_id)
@@ -0,0 +1,56 @@
+"""
+Subtitle (SRT/WebVTT) parsing for catalog app.
+"""
+import re
+
+
+# "00:01:02,500 --> 00:01:04,000" (SRT) or "01:02.500 --> 01:04.000 align:start" (VTT)
+TIMING_RE = re.compile(
+    r'^\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})'
+)
+TAG_RE = re.compile(r'<[^>]*>|\{\\[^}]*\}')
+
+# Subtitle files larger than this are not indexed
+MAX_SUBTITLE_BYTES = 5 * 1024 * 1024
+
+
+def parse_cue_time(value):
+    """Convert 'hh:mm:ss,mmm' or 'mm:ss.mmm' to milliseconds."""
+    clock, _, fraction = value.replace(',', '.').partition('.')
+    seconds = 0
+    for part in clock.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds * 1000 + int(fraction.ljust(3, '0')[:3])
+
+
+def parse_subtitles(text):
+    """
+    Parse SRT or WebVTT text into cues sorted by start time.
+
+    Cue numbers, VTT headers, NOTE/STYLE blocks and cue settings are
+    ignored; inline tags (<i>, <v Speaker>, {\\an8}) are stripped.
+
+    Returns:
+        List of (start_ms, end_ms, text) tuples
+    """
+    cues = []
+    blocks = re.split(r'\n\s*\n', (text or '').replace('\r\n', '\n').replace('\r', '\n'))
+    for block in blocks:
+        lines = block.strip('\n').split('\n')
+        for position, line in enumerate(lines):
+            timing = TIMING_RE.match(line)
+            if timing:
+                break
+        else:
+            continue
+
+        start_ms = parse_cue_time(timing.group(1))
+        end_ms = parse_cue_time(timing.group(2))
+        body = ' '.join(
+            cleaned for cleaned in (TAG_RE.sub('', line).strip() for line in lines[position + 1:]) if cleaned
+        )
+        if body and end_ms > start_ms:
+            cues.append((start_ms, end_ms, body))
+
+    cues.sort()
+    return cues
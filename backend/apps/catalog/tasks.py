@@ -0,0 +1,73 @@
+"""
+Celery tasks for catalog app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def ingest_asset(asset_id):
+    """
+    Compute checksum, size and audio metadata for an uploaded asset.
+    
+    Args:
+        asset_id: Asset ID
+    """
+    from .services import AssetIngestionService
+    
+    status = AssetIngestionService.ingest(asset_id)
+    if status is None:
+        return f'Asset {asset_id} not found'
+    return f'Asset {asset_id} ingestion {status}'
+
+
+@shared_task
+def recompute_audio_durations(book_slug=None, unit_ids=None):
+    """
+    Recompute unit durations from their primary audio files.
+    
+    Runs serially inside the (daemonic) worker process and resumes from
+    the saved checkpoint if a previous run was interrupted.
+    
+    Args:
+        book_slug: Limit to one book (optional)
+        unit_ids: Limit to these units (optional)
+    """
+    from .services import AudioDurationService
+    
+    result = AudioDurationService.recompute(book_slug=book_slug, unit_ids=unit_ids)
+    return (
+        f"Processed {result['processed']} assets, updated {result['updated']} units, "
+        f"{len(result['errors'])} errors"
+    )
+
+
+@shared_task
+def generate_cover_variants(book_id):
+    """
+    Render responsive WebP/JPEG variants of a book cover.
+    
+    Args:
+        book_id: Book ID
+    """
+    from .services import CoverVariantService
+    
+    variants = CoverVariantService.generate(book_id)
+    if variants is None:
+        return f'Book {book_id} has no cover'
+    return f"Book {book_id} cover variants: {', '.join(str(width) for width, _ in variants['webp'])}"
+
+
+@shared_task
+def build_offline_bundle(bundle_id):
+    """
+    Build and store the zip of an offline bundle.
+    
+    Args:
+        bundle_id: OfflineBundle ID
+    """
+    from .services import OfflineBundleService
+    
+    status = OfflineBundleService.build(bundle_id)
+    if status is None:
+        return f'Bundle {bundle_id} not pending'
+    return f'Bundle {bundle_id} build {status}'
@@ -0,0 +1,112 @@
+"""
+Test cases for offline download bundles
+"""
+import io
+import json
+import zipfile
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from rest_framework.test import APIClient
+
+from apps.catalog import tasks
+from apps.catalog.models import Book, Unit, Asset, OfflineBundle
+from apps.catalog.services import OfflineBundleService
+from apps.quiz.models import Question, Choice
+from apps.users.models import User
+
+
+AUDIO = bytes(range(256)) * 16
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ''
+    cache.clear()
+    yield tmp_path
+    cache.clear()
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', price=100000, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', order=1, is_free=True, transcript='# Lesson\n\nHello.')
+    Asset.objects.create(unit=unit, type='audio', file=SimpleUploadedFile('lesson.mp3', AUDIO))
+    question = Question.objects.create(unit=unit, text='Where is the station?', order=1)
+    Choice.objects.create(question=question, text='Ahead', is_correct=True, order=1)
+    Unit.objects.create(book=book, title='Unit 2', order=2)
+    return unit
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(email='student@example.com', password='testpass123'))
+    return client
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    queued = []
+    monkeypatch.setattr(tasks.build_offline_bundle, 'delay', queued.append)
+    return queued
+
+
+@pytest.mark.django_db
+class TestOfflineBundles:
+    """Test bundle scheduling, building and resumable download"""
+
+    def test_first_request_queues_one_build(self, client, unit, queued, django_capture_on_commit_callbacks):
+        """Test the bundle is built once however often it is requested"""
+        with django_capture_on_commit_callbacks(execute=True):
+            first = client.get(f'/api/catalog/units/{unit.pk}/bundle/')
+            second = client.get(f'/api/catalog/units/{unit.pk}/bundle/')
+
+        assert first.status_code == second.status_code == 202
+        assert first.data['content_key'] == second.data['content_key']
+        assert len(queued) == 1
+
+    def test_book_bundle_only_includes_accessible_units(self, client, unit, queued):
+        """Test learners without enrollment only get free units"""
+        response = client.get(f'/api/catalog/books/{unit.book.slug}/bundle/')
+
+        assert response.status_code == 202
+        assert [entry['id'] for entry in response.data['manifest']['units']] == [unit.pk]
+
+    def test_built_bundle_downloads_with_range(self, client, unit, queued):
+        """Test a ready bundle is a zip served through the Range-capable gateway"""
+        response = client.get(f'/api/catalog/units/{unit.pk}/bundle/')
+        bundle = OfflineBundle.objects.get(content_key=response.data['content_key'])
+        OfflineBundleService.build(bundle.pk)
+
+        response = client.get(f'/api/catalog/units/{unit.pk}/bundle/')
+        assert response.status_code == 200
+        url = urlsplit(response.data['url'])
+        download = Client().get(f'{url.path}?{url.query}')
+        content = b''.join(download.streaming_content)
+        assert len(content) == response.data['bytes']
+
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        manifest = json.loads(archive.read('manifest.json'))
+        entry = manifest['units'][0]
+        assert archive.read(entry['assets'][0]['path']) == AUDIO
+        assert archive.read(entry['transcript']['path']) == b'# Lesson\n\nHello.'
+        assert 'is_correct' not in archive.read(entry['questions']['path']).decode()
+
+        partial = Client().get(f'{url.path}?{url.query}', HTTP_RANGE='bytes=10-19')
+        assert partial.status_code == 206
+        assert b''.join(partial.streaming_content) == content[10:20]
+
+    def test_content_change_creates_new_bundle(self, client, unit, queued):
+        """Test editing included content yields a new content key"""
+        before = client.get(f'/api/catalog/units/{unit.pk}/bundle/').data['content_key']
+
+        unit.transcript = '# Lesson\n\nHello again.'
+        unit.save()
+
+        after = client.get(f'/api/catalog/units/{unit.pk}/bundle/').data['content_key']
+        assert after != before
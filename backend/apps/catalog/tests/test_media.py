@@ -0,0 +1,135 @@
+"""
+Test cases for the signed media gateway
+"""
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit, Asset
+from apps.common.utils.helpers import parse_range_header
+from apps.common.utils.security import sign_media_path
+from apps.users.models import User
+
+
+AUDIO = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_ACCEL_REDIRECT_PREFIX = ''
+    return tmp_path
+
+
+@pytest.fixture
+def asset(media_root):
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', is_free=True)
+    return Asset.objects.create(
+        unit=unit,
+        type='audio',
+        file=SimpleUploadedFile('lesson.mp3', AUDIO, content_type='audio/mpeg'),
+    )
+
+
+def signed_path(asset):
+    """Mint a gateway URL (path + query) through the API."""
+    user = User.objects.create_user(email='student@example.com', password='testpass123')
+    client = APIClient()
+    client.force_authenticate(user)
+    response = client.post(f'/api/catalog/units/{asset.unit_id}/asset_url/', {'asset_type': 'audio'})
+    assert response.status_code == 200
+    url = urlsplit(response.data['url'])
+    return f'{url.path}?{url.query}'
+
+
+class TestParseRangeHeader:
+    """Test Range header parsing"""
+
+    def test_ranges(self):
+        assert parse_range_header('', 100) is None
+        assert parse_range_header('bytes=0-9', 100) == (0, 9)
+        assert parse_range_header('bytes=90-', 100) == (90, 99)
+        assert parse_range_header('bytes=-10', 100) == (90, 99)
+        assert parse_range_header('bytes=50-500', 100) == (50, 99)
+        assert parse_range_header('bytes=0-1,5-6', 100) is None
+        with pytest.raises(ValueError):
+            parse_range_header('bytes=100-', 100)
+
+
+@pytest.mark.django_db
+class TestMediaGateway:
+    """Test signature checks, byte ranges and nginx offload"""
+
+    def test_full_download(self, asset, django_assert_num_queries):
+        """Test a signed URL streams the whole file without DB queries"""
+        path = signed_path(asset)
+
+        with django_assert_num_queries(0):
+            response = Client().get(path)
+
+        assert response.status_code == 200
+        assert response['Accept-Ranges'] == 'bytes'
+        assert response['Content-Type'] == 'audio/mpeg'
+        assert b''.join(response.streaming_content) == AUDIO
+
+    def test_range_request(self, asset):
+        """Test a byte range returns 206 with only the requested bytes"""
+        response = Client().get(signed_path(asset), HTTP_RANGE='bytes=100-199')
+
+        assert response.status_code == 206
+        assert response['Content-Range'] == f'bytes 100-199/{len(AUDIO)}'
+        assert response['Content-Length'] == '100'
+        assert b''.join(response.streaming_content) == AUDIO[100:200]
+
+    def test_unsatisfiable_range(self, asset):
+        """Test a range past the end returns 416"""
+        response = Client().get(signed_path(asset), HTTP_RANGE=f'bytes={len(AUDIO)}-')
+
+        assert response.status_code == 416
+        assert response['Content-Range'] == f'bytes */{len(AUDIO)}'
+
+    def test_tampered_or_expired_signature(self, asset):
+        """Test changed users and expired tokens are rejected"""
+        path = signed_path(asset)
+        params = sign_media_path(asset.file.name, 1, expires_in=-10)
+
+        assert Client().get(path.replace('user=', 'user=9')).status_code == 403
+        assert Client().get(
+            f'/api/catalog/media/{asset.file.name}', params
+        ).status_code == 403
+
+    def test_accel_redirect(self, asset, settings):
+        """Test nginx offload returns only the internal redirect header"""
+        settings.MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+        response = Client().get(signed_path(asset))
+
+        assert response.status_code == 200
+        assert response['X-Accel-Redirect'] == f'/protected-media/{asset.file.name}'
+        assert response.content == b''
+
+
+@pytest.mark.django_db
+class TestPlaylist:
+    """Test batch signing of a book's assets"""
+
+    def test_playlist_signs_accessible_assets(self, asset, django_assert_max_num_queries):
+        """Test free units are signed for non-owners and locked ones skipped"""
+        locked = Unit.objects.create(book=asset.unit.book, title='Unit 2', order=1)
+        Asset.objects.create(unit=locked, type='audio', file=SimpleUploadedFile('locked.mp3', AUDIO))
+        user = User.objects.create_user(email='student@example.com', password='testpass123')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        with django_assert_max_num_queries(3):
+            response = client.post(f'/api/catalog/books/{asset.unit.book.slug}/playlist/')
+
+        assert response.status_code == 200
+        assert [unit['id'] for unit in response.data['units']] == [asset.unit_id]
+        signed = urlsplit(response.data['units'][0]['assets'][0]['url'])
+        media = Client().get(f'{signed.path}?{signed.query}')
+        assert b''.join(media.streaming_content) == AUDIO
@@ -0,0 +1,87 @@
+"""
+Test cases for catalog full-text search
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit, SearchDocument
+from apps.catalog.search import CatalogSearch, fold_text
+
+
+User = get_user_model()
+
+
+@pytest.fixture
+def book():
+    return Book.objects.create(
+        title='Tiếng Anh giao tiếp',
+        description='Luyện nghe hiểu hội thoại hằng ngày.',
+        price=100000,
+        is_published=True,
+    )
+
+
+def search(query, user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    response = client.get('/api/catalog/search/', {'q': query})
+    assert response.status_code == 200
+    return response.data['results']
+
+
+@pytest.mark.django_db
+class TestCatalogSearch:
+    """Test indexing, ranking and highlighting"""
+
+    def test_fold_text_keeps_offsets(self):
+        """Test folding strips Vietnamese diacritics one character at a time"""
+        text = 'Đường đến trường'
+
+        assert fold_text(text) == 'duong den truong'
+        assert len(fold_text(text)) == len(text)
+
+    def test_search_ignores_diacritics(self, book):
+        """Test unaccented queries match accented titles and highlight them"""
+        results = search('tieng anh')
+
+        assert [r['kind'] for r in results] == ['book']
+        assert results[0]['title'] == '<mark>Tiếng</mark> <mark>Anh</mark> giao tiếp'
+
+    def test_units_are_indexed_on_save(self, book):
+        """Test transcript edits are searchable immediately"""
+        unit = Unit.objects.create(book=book, title='Bài 1', is_free=True)
+        assert search('sân bay') == []
+
+        unit.transcript = '## Hội thoại\n\nChúng tôi gặp nhau ở **sân bay** lúc 7 giờ.'
+        unit.save()
+
+        results = search('"san bay"')
+        assert results[0]['unit']['id'] == unit.id
+        assert '<mark>sân</mark> <mark>bay</mark>' in results[0]['snippet']
+        assert '**' not in results[0]['snippet']
+
+    def test_locked_transcripts_have_no_snippet(self, book):
+        """Test paid unit matches do not leak transcript text"""
+        Unit.objects.create(book=book, title='Bài 2', transcript='Mật khẩu là chuối.')
+        user = User.objects.create_user(email='student@example.com', password='testpass123')
+
+        results = search('chuoi', user=user)
+
+        assert len(results) == 1
+        assert results[0]['snippet'] == ''
+
+    def test_unpublished_books_are_hidden(self, book):
+        """Test search only returns published content"""
+        Book.objects.filter(pk=book.pk).update(is_published=False)
+
+        assert search('tieng anh') == []
+
+    def test_rebuild(self, book):
+        """Test rebuilding recreates documents for books and units"""
+        Unit.objects.create(book=book, title='Bài 1')
+        SearchDocument.objects.all().delete()
+
+        assert CatalogSearch.rebuild() == 2
+        assert len(search('bai')) == 1
@@ -0,0 +1,449 @@
+"""
+Test cases for catalog services
+"""
+import hashlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.catalog.models import Book, Unit, Asset, AssetBlob, CueIndex
+from apps.catalog.services import (
+    CatalogCounterService, AssetIngestionService, AudioDurationService, CoverVariantService,
+    AssetBlobService, CatalogCloneService
+)
+from apps.common.enums import AssetType, IngestStatus
+from apps.quiz.models import Question, Choice
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', slug='listening-basics')
+    return Unit.objects.create(book=book, title='Unit 1', order=1)
+
+
+@pytest.mark.django_db
+class TestQuestionCount:
+    """Test denormalized Unit.question_count"""
+
+    def test_signals_track_create_and_delete(self, unit):
+        """Test question signals keep the counter current"""
+        first = Question.objects.create(unit=unit, text='Q1', order=1)
+        Question.objects.create(unit=unit, text='Q2', order=2)
+        unit.refresh_from_db()
+        assert unit.question_count == 2
+        assert unit.has_quiz()
+
+        first.delete()
+        unit.refresh_from_db()
+        assert unit.question_count == 1
+
+    def test_recount_repairs_drift(self, unit):
+        """Test recount restores the real number of questions"""
+        Question.objects.create(unit=unit, text='Q1', order=1)
+        Unit.objects.filter(pk=unit.pk).update(question_count=7)
+
+        CatalogCounterService.recount_question_counts([unit.pk])
+
+        unit.refresh_from_db()
+        assert unit.question_count == 1
+
+
+@pytest.mark.django_db
+class TestAssetIngestion:
+    """Test background checksum and metadata extraction"""
+
+    @pytest.fixture
+    def asset(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        book = Book.objects.create(title='Listening Basics', price=0)
+        unit = Unit.objects.create(book=book, title='Unit 1')
+        return Asset.objects.create(
+            unit=unit,
+            type=AssetType.AUDIO,
+            file=SimpleUploadedFile('lesson.mp3', b'not really audio' * 1000),
+        )
+
+    def test_upload_is_queued_after_commit(self, asset, monkeypatch, django_capture_on_commit_callbacks):
+        """Test saving a new file marks the asset pending and queues the task"""
+        from apps.catalog import tasks
+
+        queued = []
+        monkeypatch.setattr(tasks.ingest_asset, 'delay', queued.append)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            asset.file = SimpleUploadedFile('other.mp3', b'replacement')
+            asset.save()
+
+        asset.refresh_from_db()
+        assert asset.ingest_status == IngestStatus.PENDING
+        assert queued == [asset.pk]
+
+    def test_ingest_streams_checksum_and_size(self, asset):
+        """Test ingestion records checksum, bytes and status"""
+        content = b'not really audio' * 1000
+
+        assert AssetIngestionService.ingest(asset.pk) == IngestStatus.READY
+
+        asset.refresh_from_db()
+        assert asset.checksum == hashlib.sha256(content).hexdigest()
+        assert asset.bytes == len(content)
+        assert asset.ingested_at is not None
+
+    def test_stale_task_keeps_replacement(self, asset, monkeypatch):
+        """Test a task that read a replaced file writes nothing"""
+        from apps.catalog import services
+
+        def replace_file(fh):
+            Asset.objects.filter(pk=asset.pk).update(file='assets/replacement.mp3', ingest_status=IngestStatus.READY)
+            return {'duration_sec': 42}
+
+        monkeypatch.setattr(services, 'extract_audio_metadata', replace_file)
+
+        assert AssetIngestionService.ingest(asset.pk) is None
+
+        asset.refresh_from_db()
+        assert (asset.checksum, asset.ingest_status) == ('', IngestStatus.READY)
+        assert asset.unit.duration_sec == 0
+
+    def test_missing_file_marks_failed(self, asset):
+        """Test ingestion errors are recorded instead of raised"""
+        asset.file.storage.delete(asset.file.name)
+
+        assert AssetIngestionService.ingest(asset.pk) == IngestStatus.FAILED
+
+        asset.refresh_from_db()
+        assert asset.ingest_error
+
+
+@pytest.mark.django_db
+class TestAudioDurations:
+    """Test bulk duration recomputation"""
+
+    @pytest.fixture
+    def units(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        book = Book.objects.create(title='Listening Basics', slug='listening-basics')
+        units = []
+        for i in range(3):
+            unit = Unit.objects.create(book=book, title=f'Unit {i}', order=i)
+            Asset.objects.create(
+                unit=unit,
+                type=AssetType.AUDIO,
+                file=SimpleUploadedFile(f'lesson{i}.mp3', b'audio'),
+            )
+            units.append(unit)
+        return units
+
+    def test_durations_are_bulk_updated_with_error_report(self, units, monkeypatch):
+        """Test probed durations are saved and failures reported per asset"""
+        from apps.catalog import services
+
+        def fake_probe(path):
+            if path.endswith('lesson1.mp3'):
+                return 0, 'Unrecognized audio format'
+            return 90, None
+
+        monkeypatch.setattr(services, 'probe_audio_duration', fake_probe)
+
+        result = AudioDurationService.recompute(book_slug='listening-basics', workers=1, chunk_size=2)
+
+        assert result['processed'] == 3
+        assert result['updated'] == 2
+        assert [error['unit_id'] for error in result['errors']] == [units[1].id]
+        assert list(Unit.objects.order_by('order').values_list('duration_sec', flat=True)) == [90, 0, 90]
+
+    def test_interrupted_run_resumes_from_checkpoint(self, units, monkeypatch):
+        """Test a restarted run skips chunks finished before the failure"""
+        from apps.catalog import services
+
+        probed = []
+
+        def flaky_probe(path):
+            probed.append(path)
+            if len(probed) == 2:
+                raise RuntimeError('worker killed')
+            return 60, None
+
+        monkeypatch.setattr(services, 'probe_audio_duration', flaky_probe)
+
+        with pytest.raises(RuntimeError):
+            AudioDurationService.recompute(workers=1, chunk_size=1)
+        result = AudioDurationService.recompute(workers=1, chunk_size=1)
+
+        assert result['resumed_from'] == units[0].assets.get().id
+        assert result['processed'] == 3
+        assert len(probed) == 4
+
+
+def make_cover(width=800, height=1200):
+    """Return an uploaded PNG cover of the given size."""
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(buffer, 'PNG')
+    return SimpleUploadedFile('cover.png', buffer.getvalue(), content_type='image/png')
+
+
+@pytest.mark.django_db
+class TestCoverVariants:
+    """Test responsive cover generation"""
+
+    @pytest.fixture(autouse=True)
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+
+    def test_new_cover_is_queued_after_commit(self, monkeypatch, django_capture_on_commit_callbacks):
+        """Test uploading a cover queues generation and clears old variants"""
+        from apps.catalog import tasks
+
+        queued = []
+        monkeypatch.setattr(tasks.generate_cover_variants, 'delay', queued.append)
+        book = Book.objects.create(title='Listening Basics', cover_variants={'source': 'covers/old.png'})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            book.cover = make_cover()
+            book.save()
+
+        book.refresh_from_db()
+        assert book.cover_variants == {}
+        assert queued == [book.pk]
+
+    def test_generate_stores_hashed_variants_without_upscaling(self):
+        """Test variants are resized, content-addressed and listed per format"""
+        book = Book.objects.create(title='Listening Basics', cover=make_cover(width=400, height=600))
+
+        variants = CoverVariantService.generate(book.pk)
+
+        book.refresh_from_db()
+        assert book.cover_variants == variants
+        assert [width for width, _ in variants['webp']] == [160, 320]
+        name = variants['jpeg'][1][1]
+        assert name.startswith('covers/variants/') and name.endswith('/320.jpg')
+        with Image.open(default_storage.open(name)) as image:
+            assert image.size == (320, 480)
+
+    def test_backfill_skips_up_to_date_books(self):
+        """Test the backfill renders each cover once"""
+        Book.objects.create(title='Listening Basics', cover=make_cover())
+
+        first = CoverVariantService.backfill(workers=1)
+        second = CoverVariantService.backfill(workers=1)
+
+        assert (first['processed'], first['updated']) == (1, 1)
+        assert second['processed'] == 0
+
+
+@pytest.mark.django_db
+class TestAssetBlobs:
+    """Test content-addressed storage and reference counting"""
+
+    @pytest.fixture
+    def assets(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        book = Book.objects.create(title='Listening Basics', price=0)
+        return [
+            Asset.objects.create(
+                unit=Unit.objects.create(book=book, title=f'Unit {i}', order=i),
+                type=AssetType.PDF,
+                file=SimpleUploadedFile(f'handout{i}.pdf', b'shared handout'),
+            )
+            for i in range(2)
+        ]
+
+    def test_identical_uploads_share_one_blob(self, assets, django_capture_on_commit_callbacks):
+        """Test ingestion points duplicates at one stored file"""
+        uploads = [asset.file.name for asset in assets]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for asset in assets:
+                AssetIngestionService.ingest(asset.pk)
+
+        first, second = (Asset.objects.get(pk=asset.pk) for asset in assets)
+        blob = AssetBlob.objects.get()
+        assert first.blob == second.blob == blob
+        assert first.file.name == second.file.name == blob.file.name
+        assert blob.ref_count == 2
+        assert not any(default_storage.exists(name) for name in uploads)
+        assert first.file.read() == b'shared handout'
+
+    def test_replaced_file_is_not_adopted(self, assets, monkeypatch):
+        """Test a file replaced during adoption keeps its own content and name"""
+        asset = assets[0]
+        hashed = asset.file.name
+        checksum = hashlib.sha256(b'shared handout').hexdigest()
+        store = AssetBlobService._get_or_store
+
+        def replace_then_store(*args):
+            Asset.objects.filter(pk=asset.pk).update(file='assets/replacement.pdf')
+            return store(*args)
+
+        monkeypatch.setattr(AssetBlobService, '_get_or_store', staticmethod(replace_then_store))
+        assert AssetBlobService.adopt(asset.pk, checksum, 14, hashed) is None
+        assert AssetBlobService.adopt(asset.pk, checksum, 14, hashed) is None
+
+        asset.refresh_from_db()
+        assert (asset.file.name, asset.blob_id) == ('assets/replacement.pdf', None)
+        assert AssetBlob.objects.filter(ref_count__gt=0).count() == 0
+        assert default_storage.exists(hashed)
+
+    def test_last_reference_deletes_blob(self, assets, django_capture_on_commit_callbacks):
+        """Test the blob and its file go away with the last asset"""
+        for asset in assets:
+            AssetIngestionService.ingest(asset.pk)
+        name = AssetBlob.objects.get().file.name
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Asset.objects.get(pk=assets[0].pk).delete()
+        assert AssetBlob.objects.get().ref_count == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Asset.objects.get(pk=assets[1].pk).delete()
+        assert not AssetBlob.objects.exists()
+        assert not default_storage.exists(name)
+
+    def test_dedupe_shares_existing_library(self, assets):
+        """Test the backfill moves checksummed assets into blobs"""
+        checksum = hashlib.sha256(b'shared handout').hexdigest()
+        Asset.objects.update(checksum=checksum, bytes=14)
+
+        report = AssetBlobService.dedupe(dry_run=True)
+        assert (report['assets'], report['duplicates'], report['reclaimed_bytes']) == (2, 1, 14)
+        assert not AssetBlob.objects.exists()
+
+        AssetBlobService.dedupe()
+        assert AssetBlob.objects.get().ref_count == 2
+        assert Asset.objects.filter(blob__isnull=True).count() == 0
+
+
+@pytest.mark.django_db
+class TestBookCounters:
+    """Test denormalized Book counters"""
+
+    @pytest.fixture
+    def book(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        return Book.objects.create(title='Listening Basics', slug='listening-basics')
+
+    def test_signals_track_units_audio_and_quiz(self, book):
+        """Test counters follow unit, asset and question changes"""
+        free = Unit.objects.create(book=book, title='Unit 1', order=1, is_free=True, duration_sec=60)
+        paid = Unit.objects.create(book=book, title='Unit 2', order=2, duration_sec=30)
+        Asset.objects.create(unit=free, type=AssetType.AUDIO, file=SimpleUploadedFile('a.mp3', b'a'))
+        Asset.objects.create(unit=free, type=AssetType.AUDIO, file=SimpleUploadedFile('b.mp3', b'b'))
+        Question.objects.create(unit=paid, text='Q1', order=1)
+        Question.objects.create(unit=paid, text='Q2', order=2)
+
+        book.refresh_from_db()
+        assert (book.unit_count, book.free_unit_count, book.total_duration_sec) == (2, 1, 90)
+        assert (book.units_with_audio, book.units_with_quiz) == (1, 1)
+
+        paid.is_free = True
+        paid.save()
+        free.delete()
+
+        book.refresh_from_db()
+        assert (book.unit_count, book.free_unit_count, book.total_duration_sec) == (1, 1, 30)
+        assert (book.units_with_audio, book.units_with_quiz) == (0, 1)
+
+    def test_bulk_free_toggle_adjusts_counter(self, book):
+        """Test the admin bulk path keeps free_unit_count current"""
+        units = [Unit.objects.create(book=book, title=f'Unit {i}', order=i) for i in range(3)]
+
+        assert CatalogCounterService.set_units_free([unit.pk for unit in units], True) == 3
+        assert CatalogCounterService.set_units_free([units[0].pk], False) == 1
+
+        book.refresh_from_db()
+        assert book.free_unit_count == 2
+
+    def test_reconcile_repairs_drift(self, book):
+        """Test recounting fixes counters changed behind the signals' back"""
+        Unit.objects.create(book=book, title='Unit 1', order=1, duration_sec=45)
+        Book.objects.filter(pk=book.pk).update(unit_count=9, total_duration_sec=0)
+
+        assert CatalogCounterService.recount_book_counters() == 1
+        assert CatalogCounterService.recount_book_counters() == 0
+
+        book.refresh_from_db()
+        assert (book.unit_count, book.total_duration_sec) == (1, 45)
+
+
+@pytest.mark.django_db
+class TestCatalogClone:
+    """Test bulk deep copies of books and questions"""
+
+    @pytest.fixture
+    def book(self, settings, tmp_path, django_capture_on_commit_callbacks):
+        settings.MEDIA_ROOT = tmp_path
+        book = Book.objects.create(title='Listening Basics', slug='listening-basics', is_published=True)
+        for i in range(1, 4):
+            unit = Unit.objects.create(book=book, title=f'Unit {i}', order=i, is_free=i == 1, duration_sec=60)
+            asset = Asset.objects.create(
+                unit=unit,
+                type=AssetType.SUBTITLE,
+                file=SimpleUploadedFile(f'unit{i}.srt', b'1\n00:00:01,000 --> 00:00:02,000\nHello.\n'),
+            )
+            with django_capture_on_commit_callbacks(execute=True):
+                AssetIngestionService.ingest(asset.pk)
+            for order in (1, 2):
+                question = Question.objects.create(unit=unit, text=f'Q{order}', order=order)
+                Choice.objects.create(question=question, text='Yes', is_correct=True, order=1)
+                Choice.objects.create(question=question, text='No', order=2)
+        return book
+
+    def test_clone_copies_whole_tree(self, book, django_assert_max_num_queries):
+        """Test units, assets, cues, questions and choices are copied with few queries"""
+        with django_assert_max_num_queries(30):
+            clone = CatalogCloneService.clone_book(book.pk)
+
+        assert (clone.slug, clone.is_published) == ('listening-basics-copy', False)
+        assert (clone.unit_count, clone.free_unit_count, clone.units_with_quiz) == (3, 1, 3)
+        assert Question.objects.filter(unit__book=clone).count() == 6
+        assert Choice.objects.filter(question__unit__book=clone, is_correct=True).count() == 6
+        assert CueIndex.objects.filter(unit__book=clone).count() == 3
+
+        source_files = set(Asset.objects.filter(unit__book=book).values_list('file', flat=True))
+        cloned = Asset.objects.filter(unit__book=clone)
+        assert set(cloned.values_list('file', flat=True)) == source_files
+        assert AssetBlob.objects.get().ref_count == 6
+
+    def test_clone_keeps_cover_variants_and_resumes_ingestion(
+        self, book, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """Test variants are copied without a render job and pending assets are queued"""
+        from apps.catalog import tasks
+
+        queued = []
+        monkeypatch.setattr(tasks.ingest_asset, 'delay', queued.append)
+        monkeypatch.setattr(tasks.generate_cover_variants, 'delay', queued.append)
+        variants = {'source': 'covers/front.png', 'webp': [[160, 'covers/variants/abc/160.webp']]}
+        Book.objects.filter(pk=book.pk).update(cover='covers/front.png', cover_variants=variants)
+        pending = Asset.objects.filter(unit__book=book, unit__order=2)
+        pending.update(ingest_status=IngestStatus.PENDING)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            clone = CatalogCloneService.clone_book(book.pk)
+
+        assert clone.cover_variants == variants
+        copy = Asset.objects.get(unit__book=clone, unit__order=2)
+        assert queued == [copy.pk]
+        assert copy.ingest_status == IngestStatus.PENDING
+
+    def test_second_clone_gets_unique_slug(self, book):
+        """Test repeated clones do not collide on slug"""
+        CatalogCloneService.clone_book(book.pk)
+
+        assert CatalogCloneService.clone_book(book.pk).slug == 'listening-basics-copy-2'
+
+    def test_duplicate_questions_appends_to_unit(self, book):
+        """Test duplicated questions are ordered after the existing ones"""
+        unit = book.units.get(order=1)
+        source = list(unit.questions.order_by('order'))
+
+        assert CatalogCloneService.duplicate_questions([q.pk for q in source]) == 2
+
+        copies = unit.questions.filter(order__gt=2).order_by('order')
+        assert [q.text for q in copies] == ['Q1 (Copy)', 'Q2 (Copy)']
+        assert [q.choices.count() for q in copies] == [2, 2]
+        unit.refresh_from_db()
+        assert unit.question_count == 4
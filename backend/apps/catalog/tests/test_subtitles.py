@@ -0,0 +1,98 @@
+"""
+Test cases for subtitle cue indexing
+"""
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit, Asset
+from apps.catalog.services import AssetIngestionService
+from apps.catalog.subtitles import parse_subtitles
+from apps.common.enums import AssetType
+from apps.users.models import User
+
+
+SRT = """1
+00:02:05,000 --> 00:02:10,000
+<i>Where is the</i> station?
+
+3
+00:00:01,000 --> 00:00:04,500
+Xin chào các bạn.
+
+2
+00:01:55,000 --> 00:02:02,000
+Go straight ahead.
+"""
+
+VTT = """WEBVTT
+
+NOTE produced by hand
+
+00:01.000 --> 00:04.500 align:start
+<v Lan>Hello there.
+"""
+
+
+@pytest.fixture
+def unit(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', is_free=True)
+    asset = Asset.objects.create(
+        unit=unit,
+        type=AssetType.SUBTITLE,
+        file=SimpleUploadedFile('unit1.srt', SRT.encode('utf-8')),
+    )
+    AssetIngestionService.ingest(asset.pk)
+    return unit
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(email='student@example.com', password='testpass123'))
+    return client
+
+
+class TestParseSubtitles:
+    """Test SRT/WebVTT parsing"""
+
+    def test_srt_cues_are_sorted_and_cleaned(self):
+        """Test cue numbers and tags are dropped and cues sorted by start"""
+        cues = parse_subtitles(SRT)
+
+        assert [start for start, _, _ in cues] == [1000, 115000, 125000]
+        assert cues[2] == (125000, 130000, 'Where is the station?')
+
+    def test_vtt_header_and_settings_are_ignored(self):
+        """Test WebVTT headers, notes and cue settings are skipped"""
+        assert parse_subtitles(VTT) == [(1000, 4500, 'Hello there.')]
+
+
+@pytest.mark.django_db
+class TestCueEndpoint:
+    """Test cue lookups by time range and phrase"""
+
+    def test_time_range_includes_overlapping_cues(self, client, unit):
+        """Test a cue that started before the window is still returned"""
+        response = client.get(f'/api/catalog/units/{unit.pk}/cues/?from=120&to=180')
+
+        assert response.status_code == 200
+        assert response.data['count'] == 3
+        assert [cue['start'] for cue in response.data['cues']] == [115.0, 125.0]
+
+    def test_phrase_search_ignores_diacritics(self, client, unit):
+        """Test jump-to-phrase matches without accents or case"""
+        response = client.get(f'/api/catalog/units/{unit.pk}/cues/?q=xin chao')
+
+        assert response.status_code == 200
+        assert [cue['start'] for cue in response.data['cues']] == [1.0]
+
+    def test_unit_without_subtitles_returns_404(self, client, unit):
+        """Test units without a cue index report not found"""
+        other = Unit.objects.create(book=unit.book, title='Unit 2', order=2, is_free=True)
+
+        response = client.get(f'/api/catalog/units/{other.pk}/cues/')
+
+        assert response.status_code == 404
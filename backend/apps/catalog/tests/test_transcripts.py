@@ -0,0 +1,114 @@
+"""
+Test cases for sectioned transcript delivery
+"""
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit
+from apps.catalog.transcripts import parse_sections
+from apps.users.models import User
+
+
+TRANSCRIPT = """# Lesson 1
+
+## [00:00] Introduction
+Welcome to **this** lesson. <script>alert(1)</script>
+
+## [01:30] Dialogue
+- Where is the *station*?
+- Go straight ahead.
+
+## [03:00] Summary
+That's all.
+"""
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    return Unit.objects.create(book=book, title='Unit 1', is_free=True, transcript=TRANSCRIPT)
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(email='student@example.com', password='testpass123'))
+    return client
+
+
+@pytest.mark.django_db
+class TestTranscriptStats:
+    """Test transcript stats are kept in sync on save"""
+
+    def test_stats_follow_transcript_saves_only(self, unit, monkeypatch):
+        """Test saves that leave the transcript out do not reparse it"""
+        from apps.catalog import models
+
+        parsed = []
+        monkeypatch.setattr(models, 'transcript_stats', lambda markdown: parsed.append(markdown) or ('x', 1, 1))
+
+        partial = Unit.objects.only('id', 'book_id', 'title').get(pk=unit.pk)
+        partial.title = 'Renamed'
+        partial.save()
+        unit.title = 'Renamed again'
+        unit.save(update_fields=['title'])
+        assert parsed == []
+
+        unit.transcript = '# Short'
+        unit.save(update_fields=['transcript'])
+        unit.refresh_from_db()
+        assert parsed == ['# Short'] and unit.transcript_digest == 'x'
+
+
+class TestParseSections:
+    """Test markdown sectioning and rendering"""
+
+    def test_sections_are_split_timed_and_escaped(self):
+        """Test headings split sections, timestamps parse and HTML is escaped"""
+        sections = parse_sections(TRANSCRIPT)
+
+        assert [s['title'] for s in sections] == ['Lesson 1', 'Introduction', 'Dialogue', 'Summary']
+        assert [s['start_sec'] for s in sections] == [None, 0, 90, 180]
+        assert '<strong>this</strong>' in sections[1]['html']
+        assert '&lt;script&gt;' in sections[1]['html']
+        assert '<ul><li>Where is the <em>station</em>?</li>' in sections[2]['html']
+
+
+@pytest.mark.django_db
+class TestTranscriptEndpoint:
+    """Test unit detail summary and the transcript endpoint"""
+
+    def test_unit_detail_ships_only_summary(self, unit, client):
+        """Test unit detail carries digest, section count and size only"""
+        response = client.get(f'/api/catalog/units/{unit.id}/')
+
+        assert 'transcript' not in response.data
+        assert response.data['transcript_sections'] == 4
+        assert response.data['transcript_bytes'] == len(TRANSCRIPT.encode('utf-8'))
+        assert len(response.data['transcript_digest']) == 64
+
+    def test_time_range_selects_overlapping_sections(self, unit, client):
+        """Test start/end return sections overlapping the audio range"""
+        response = client.get(f'/api/catalog/units/{unit.id}/transcript/', {'start': 100, 'end': 120})
+
+        assert response.status_code == 200
+        assert [s['title'] for s in response.data['sections']] == ['Dialogue']
+
+    def test_cache_miss_rerenders_and_etag_revalidates(self, unit, client):
+        """Test an evicted render is rebuilt and the digest ETag yields 304"""
+        cache.clear()
+        url = f'/api/catalog/units/{unit.id}/transcript/?output=html'
+
+        response = client.get(url)
+        assert response.data['html'].startswith('<h1>Lesson 1</h1>')
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    def test_locked_unit_is_forbidden(self, unit, client):
+        """Test paid units need an enrollment"""
+        Unit.objects.filter(pk=unit.pk).update(is_free=False)
+
+        response = client.get(f'/api/catalog/units/{unit.id}/transcript/')
+
+        assert response.status_code == 403
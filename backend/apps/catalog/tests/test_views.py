@@ -0,0 +1,200 @@
+"""
+Test cases for catalog API views
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit
+from apps.users.models import User, Enrollment
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='student@example.com', password='testpass123')
+
+
+def create_books(count, units_per_book=3, start=0):
+    """Create published books, each with one free unit."""
+    books = []
+    for index in range(start, start + count):
+        book = Book.objects.create(
+            title=f'Book {index}',
+            slug=f'book-{index}',
+            price=100000,
+            is_published=True,
+        )
+        for order in range(1, units_per_book + 1):
+            Unit.objects.create(book=book, title=f'Unit {order}', order=order, is_free=order == 1)
+        books.append(book)
+    return books
+
+
+def count_list_queries(client, user=None):
+    """Return number of queries for one full book list page."""
+    if user is not None:
+        # Fresh instance per request, as authentication would load it
+        client.force_authenticate(User.objects.get(pk=user.pk))
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/api/catalog/books/', {'page_size': 100})
+    assert response.status_code == 200
+    return len(context.captured_queries), response.data
+
+
+@pytest.mark.django_db
+class TestBookList:
+    """Test book list serialization"""
+
+    def test_list_returns_annotated_counts(self, api_client, user):
+        """Test unit counts and ownership come from annotations"""
+        owned, other = create_books(2)
+        Enrollment.objects.create(user=user, book=owned)
+
+        _, data = count_list_queries(api_client, user)
+        rows = {row['slug']: row for row in data['results']}
+
+        assert rows[owned.slug]['unit_count'] == 3
+        assert rows[owned.slug]['free_units_count'] == 1
+        assert rows[owned.slug]['is_owned'] is True
+        assert rows[other.slug]['is_owned'] is False
+
+    def test_list_query_count_is_constant(self, api_client, user):
+        """Test a 100-book page runs a fixed number of queries"""
+        create_books(10)
+        small_page_queries, _ = count_list_queries(api_client, user)
+
+        create_books(90, start=10)
+        cache.clear()
+        full_page_queries, data = count_list_queries(api_client, user)
+
+        # COUNT + SELECT for the cached anonymous page, one entitlement lookup
+        assert len(data['results']) == 100
+        assert full_page_queries == small_page_queries == 3
+
+
+@pytest.mark.django_db
+class TestBookUnits:
+    """Test book unit listing"""
+
+    def test_has_quiz_reads_denormalized_count(self, api_client, user):
+        """Test has_quiz adds no per-unit queries"""
+        from apps.quiz.models import Question
+
+        book = create_books(1, units_per_book=20)[0]
+        Enrollment.objects.create(user=user, book=book)
+        quiz_unit = book.units.get(order=2)
+        Question.objects.create(unit=quiz_unit, text='What did you hear?', order=1)
+        api_client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(f'/api/catalog/books/{book.slug}/units/')
+
+        assert response.status_code == 200
+        assert [row['has_quiz'] for row in response.data] == [row['id'] == quiz_unit.id for row in response.data]
+        # ETag aggregate, book lookup, entitlements and one unit query
+        assert len(context.captured_queries) <= 4
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+    """Test versioned catalog response cache"""
+
+    def test_cached_list_overlays_ownership(self, api_client, user):
+        """Test cached pages are shared but is_owned is per user"""
+        owned, _ = create_books(2)
+        count_list_queries(api_client)
+        Enrollment.objects.create(user=user, book=owned)
+
+        queries, data = count_list_queries(api_client, user)
+        owned_flags = {row['slug']: row['is_owned'] for row in data['results']}
+
+        assert queries == 1  # entitlement lookup only
+        assert owned_flags == {'book-0': True, 'book-1': False}
+
+    def test_content_change_invalidates_cache(self, api_client):
+        """Test saving a book bumps the catalog version"""
+        book = create_books(1)[0]
+        count_list_queries(api_client)
+
+        book.title = 'Renamed'
+        book.save()
+        _, data = count_list_queries(api_client)
+
+        assert data['results'][0]['title'] == 'Renamed'
+
+    def test_detail_variant_follows_enrollment(self, api_client, user):
+        """Test enrolled users get the full unit list"""
+        book = create_books(1)[0]
+        api_client.force_authenticate(user)
+        preview = api_client.get(f'/api/catalog/books/{book.slug}/').data
+
+        Enrollment.objects.create(user=user, book=book)
+        api_client.force_authenticate(User.objects.get(pk=user.pk))
+        full = api_client.get(f'/api/catalog/books/{book.slug}/').data
+
+        assert (preview['is_owned'], len(preview['units'])) == (False, 1)
+        assert (full['is_owned'], len(full['units'])) == (True, 3)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """Test ETag revalidation on catalog endpoints"""
+
+    def test_book_detail_not_modified(self, api_client):
+        """Test matching If-None-Match skips serialization"""
+        book = create_books(1)[0]
+        etag = api_client.get(f'/api/catalog/books/{book.slug}/')['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(f'/api/catalog/books/{book.slug}/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert len(context.captured_queries) == 0
+
+        book.description = 'Updated'
+        book.save()
+        response = api_client.get(f'/api/catalog/books/{book.slug}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_book_units_validators(self, api_client, user):
+        """Test units endpoint revalidates with ETag only, so purchases are never masked"""
+        book = create_books(1)[0]
+        api_client.force_authenticate(user)
+        first = api_client.get(f'/api/catalog/books/{book.slug}/units/')
+
+        response = api_client.get(
+            f'/api/catalog/books/{book.slug}/units/',
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        assert response.status_code == 304
+
+        Enrollment.objects.create(user=user, book=book)
+        api_client.force_authenticate(User.objects.get(pk=user.pk))
+        response = api_client.get(
+            f'/api/catalog/books/{book.slug}/units/',
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        assert response.status_code == 200
+        assert len(response.data) == 3
+        assert 'Last-Modified' not in response
+
+        response = api_client.get(
+            f'/api/catalog/books/{book.slug}/units/',
+            HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2099 00:00:00 GMT',
+        )
+        assert response.status_code == 200
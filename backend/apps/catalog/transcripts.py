@@ -0,0 +1,249 @@
+"""
+Transcript parsing, rendering and caching for catalog app.
+"""
+import hashlib
+import json
+import re
+import zlib
+
+from django.core.cache import cache
+from django.utils.html import escape
+
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+TIMESTAMP_RE = re.compile(r'^[\[(]((?:\d+:)?\d{1,2}:\d{2})[\])]\s*')
+LIST_ITEM_RE = re.compile(r'^\s*([-*+]|\d+\.)\s+(.*)$')
+QUOTE_RE = re.compile(r'^\s*>\s?(.*)$')
+
+# Applied to already-escaped text, so captured groups are HTML-safe
+INLINE_RULES = [
+    (re.compile(r'`([^`]+)`'), r'<code>\1</code>'),
+    (re.compile(r'\*\*(.+?)\*\*|__(.+?)__'), lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>'),
+    (re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?!\w)|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)'),
+     lambda m: f'<em>{m.group(1) or m.group(2)}</em>'),
+    (re.compile(r'\[([^\]]+)\]\((https?://[^)\s]+)\)'), r'<a href="\2" rel="nofollow noopener">\1</a>'),
+]
+
+# Sections start at headings of this level or higher (# and ##)
+SECTION_LEVEL = 2
+
+
+def parse_timestamp(value):
+    """Convert 'mm:ss' or 'h:mm:ss' to seconds."""
+    seconds = 0
+    for part in value.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def render_inline(text):
+    """Escape text and render inline markdown (code, emphasis, links)."""
+    html = escape(text)
+    for pattern, replacement in INLINE_RULES:
+        html = pattern.sub(replacement, html)
+    return html
+
+
+def render_blocks(lines):
+    """
+    Render block markdown (paragraphs, lists, quotes, sub-headings).
+
+    Only a small, escaped subset of markdown is supported; raw HTML in
+    transcripts is always shown as text.
+    """
+    html = []
+    paragraph = []
+    list_tag = None
+
+    def flush_paragraph():
+        if paragraph:
+            html.append('<p>' + ' '.join(render_inline(line.strip()) for line in paragraph) + '</p>')
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            html.append(f'</{list_tag}>')
+            list_tag = None
+
+    for line in lines:
+        heading = HEADING_RE.match(line)
+        item = LIST_ITEM_RE.match(line)
+        quote = QUOTE_RE.match(line)
+
+        if not line.strip():
+            flush_paragraph()
+            close_list()
+        elif heading:
+            flush_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            html.append(f'<h{level}>{render_inline(heading.group(2))}</h{level}>')
+        elif item:
+            flush_paragraph()
+            tag = 'ol' if item.group(1)[0].isdigit() else 'ul'
+            if list_tag != tag:
+                close_list()
+                html.append(f'<{tag}>')
+                list_tag = tag
+            html.append(f'<li>{render_inline(item.group(2))}</li>')
+        elif quote:
+            flush_paragraph()
+            close_list()
+            html.append(f'<blockquote>{render_inline(quote.group(1))}</blockquote>')
+        else:
+            close_list()
+            paragraph.append(line)
+
+    flush_paragraph()
+    close_list()
+    return ''.join(html)
+
+
+def parse_sections(markdown):
+    """
+    Split a markdown transcript into rendered sections.
+
+    A section starts at every # or ## heading. A heading may begin with a
+    timestamp ("## [01:30] Dialogue") marking where the section starts
+    in the audio.
+
+    Returns:
+        List of dicts: index, title, level, start_sec (or None), html
+    """
+    sections = []
+    current = {'title': '', 'level': 0, 'start_sec': None, 'lines': []}
+
+    def close_section():
+        if current['title'] or any(line.strip() for line in current['lines']):
+            title_html = ''
+            if current['title']:
+                level = current['level']
+                title_html = f'<h{level}>{render_inline(current["title"])}</h{level}>'
+            sections.append({
+                'index': len(sections),
+                'title': current['title'],
+                'level': current['level'],
+                'start_sec': current['start_sec'],
+                'html': title_html + render_blocks(current['lines']),
+            })
+
+    for line in (markdown or '').replace('\r\n', '\n').split('\n'):
+        heading = HEADING_RE.match(line)
+        if heading and len(heading.group(1)) <= SECTION_LEVEL:
+            close_section()
+            title = heading.group(2)
+            start_sec = None
+            timestamp = TIMESTAMP_RE.match(title)
+            if timestamp:
+                start_sec = parse_timestamp(timestamp.group(1))
+                title = title[timestamp.end():]
+            current = {'title': title, 'level': len(heading.group(1)), 'start_sec': start_sec, 'lines': []}
+        else:
+            current['lines'].append(line)
+    close_section()
+
+    return sections
+
+
+def select_sections(sections, section=None, start=None, end=None):
+    """
+    Filter sections by index and/or audio time range.
+
+    Sections without a timestamp inherit the start of the previous one;
+    a section lasts until the next later start.
+
+    Args:
+        sections: Sections from parse_sections()
+        section: Only this section index (optional)
+        start: Range start in seconds (optional)
+        end: Range end in seconds (optional)
+
+    Returns:
+        List of matching sections
+    """
+    if section is not None:
+        sections = [item for item in sections if item['index'] == section]
+    if start is None and end is None:
+        return sections
+
+    starts = []
+    previous = 0
+    for item in sections:
+        previous = item['start_sec'] if item['start_sec'] is not None else previous
+        starts.append(previous)
+
+    selected = []
+    for position, item in enumerate(sections):
+        section_start = starts[position]
+        later = [value for value in starts[position + 1:] if value > section_start]
+        section_end = later[0] if later else float('inf')
+        if (end is None or section_start <= end) and (start is None or section_end > start):
+            selected.append(item)
+    return selected
+
+
+def transcript_stats(markdown):
+    """
+    Summarize a transcript for unit payloads.
+
+    Returns:
+        Tuple (sha256 digest or '', section count, size in UTF-8 bytes)
+    """
+    if not markdown:
+        return '', 0, 0
+    encoded = markdown.encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest(), len(parse_sections(markdown)), len(encoded)
+
+
+class TranscriptCache:
+    """
+    Rendered transcript sections cached by content digest.
+
+    Entries are keyed by the transcript hash, so edits never serve stale
+    renders and nothing needs invalidating. Values are zlib-compressed JSON.
+    """
+
+    KEY = 'transcript:v{version}:{digest}'
+    RENDER_VERSION = 1
+    TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+
+    @classmethod
+    def make_key(cls, digest):
+        return cls.KEY.format(version=cls.RENDER_VERSION, digest=digest)
+
+    @classmethod
+    def get_sections(cls, digest, load_markdown):
+        """
+        Get rendered sections, rendering and caching them on a miss.
+
+        Args:
+            digest: Transcript digest (Unit.transcript_digest)
+            load_markdown: Callable returning the markdown source
+
+        Returns:
+            List of section dicts from parse_sections()
+        """
+        if not digest:
+            return []
+
+        key = cls.make_key(digest)
+        payload = cache.get(key)
+        if payload is not None:
+            return json.loads(zlib.decompress(payload))
+
+        sections = parse_sections(load_markdown())
+        cls.store(digest, sections)
+        return sections
+
+    @classmethod
+    def store(cls, digest, sections):
+        """Compress and cache rendered sections."""
+        payload = zlib.compress(json.dumps(sections, separators=(',', ':')).encode('utf-8'))
+        cache.set(cls.make_key(digest), payload, cls.TIMEOUT)
+
+    @classmethod
+    def warm(cls, digest, markdown):
+        """Pre-render a transcript unless it is already cached."""
+        if digest and cache.get(cls.make_key(digest)) is None:
+            cls.store(digest, parse_sections(markdown))
@@ -3,15 +3,17 @@ URL configuration for catalog app.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookViewSet, UnitViewSet
+from .views import BookViewSet, UnitViewSet, SearchViewSet, media_gateway
 
 app_name = 'catalog'
 
 router = DefaultRouter()
 router.register('books', BookViewSet, basename='book')
 router.register('units', UnitViewSet, basename='unit')
+router.register('search', SearchViewSet, basename='search')
 
 urlpatterns = [
+    path('media/<path:name>', media_gateway, name='media'),
     path('', include(router.urls)),
 ]
 
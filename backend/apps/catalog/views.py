@@ -7,18 +7,36 @@ from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+from django.db.models import Count, Max, Value
 from django.utils import timezone
+from urllib.parse import quote, urlencode
+import mimetypes
+import os
 import time
 
-from .models import Book, Unit, Asset
+from .cache import CatalogCache
+from .models import Book, Unit, Asset, CueIndex
+from .services import OfflineBundleService
 from .serializers import (
     BookListSerializer, BookDetailSerializer,
-    UnitListSerializer, UnitDetailSerializer
+    UnitListSerializer, UnitDetailSerializer,
+    SearchResultSerializer, PlaylistRequestSerializer, TranscriptQuerySerializer,
+    CueQuerySerializer
 )
+from .search import CatalogSearch
+from .transcripts import TranscriptCache, select_sections
+from apps.common.enums import IngestStatus
+from apps.common.mixins import ConditionalGetMixin
 from apps.common.permissions import HasBookAccess
 from apps.common.exceptions import NoAccessException
-from apps.common.utils.helpers import generate_secure_token
-from apps.users.models import Enrollment
+from apps.common.utils.helpers import parse_range_header, BoundedFileReader
+from apps.common.utils.security import sign_media_path, verify_media_signature
+from apps.users.services import EntitlementService
 
 
 class AssetURLThrottle(UserRateThrottle):
@@ -26,12 +44,61 @@ class AssetURLThrottle(UserRateThrottle):
     rate = '50/hour'
 
 
-class BookViewSet(viewsets.ReadOnlyModelViewSet):
+class PlaylistThrottle(UserRateThrottle):
+    """Custom throttle for batch playlist signing."""
+    rate = '60/hour'
+
+
+def build_signed_media_url(request, name):
+    """
+    Build an absolute media gateway URL for the requesting user.
+    
+    Args:
+        request: Current request (authenticated)
+        name: Storage name of the file
+    
+    Returns:
+        Tuple (url, expires timestamp)
+    """
+    params = sign_media_path(name, request.user.id)
+    base_url = request.build_absolute_uri(reverse('catalog:media', args=[name]))
+    return f"{base_url}?{urlencode(params)}", params['expires']
+
+
+def bundle_response(request, bundle, manifest):
+    """
+    Describe an offline bundle: a signed download URL once built, else 202.
+    
+    Args:
+        request: Current request (authenticated)
+        bundle: OfflineBundle instance
+        manifest: Bundle manifest
+    
+    Returns:
+        Response
+    """
+    data = {
+        'status': bundle.status,
+        'content_key': bundle.content_key,
+        'manifest': manifest,
+    }
+    if bundle.status != IngestStatus.READY:
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+    
+    url, expires = build_signed_media_url(request, bundle.file.name)
+    data.update({'url': url, 'bytes': bundle.bytes, 'expires': expires})
+    return Response(data)
+
+
+class BookViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for books."""
     
     permission_classes = [permissions.AllowAny]
     lookup_field = 'slug'
     
+    # Set while building a cached page: serialize as (not) owned instead of per user
+    serialize_as_owned = None
+    
     def get_queryset(self):
         """Return published books or all for staff."""
         queryset = Book.objects.all()
@@ -40,7 +107,109 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         if not self.request.user.is_authenticated or not self.request.user.is_staff:
             queryset = queryset.filter(is_published=True)
         
-        return queryset.prefetch_related('units')
+        # Counts are columns and ownership is annotated, so serializers run no per-book queries
+        if self.serialize_as_owned is not None:
+            queryset = queryset.annotate(is_owned_by_user=Value(self.serialize_as_owned))
+        else:
+            queryset = queryset.with_ownership(self.request.user)
+        
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('units')
+        
+        return queryset
+    
+    def get_conditional_validators(self, request, *args, **kwargs):
+        """Build validators from the catalog version and the user's enrollments."""
+        version = CatalogCache.get_version()
+        owned_ids = sorted(EntitlementService.get_book_ids(request.user))
+        slug = kwargs.get(self.lookup_field)
+        
+        if self.action == 'list':
+            etag = self.build_etag(
+                'books', request.get_full_path(), version, request.user.is_staff, owned_ids
+            )
+            return etag, None
+        
+        if self.action == 'retrieve':
+            etag = self.build_etag('book', slug, version, request.user.is_staff, owned_ids)
+            return etag, None
+        
+        if self.action == 'units':
+            stats = Unit.objects.filter(book__slug=slug).aggregate(
+                book_id=Max('book_id'),
+                total=Count('id'),
+                last_modified=Max('updated_at'),
+            )
+            has_access = request.user.is_staff or stats['book_id'] in owned_ids
+            etag = self.build_etag(
+                'units', slug, version, stats['total'], stats['last_modified'], has_access
+            )
+            # No Last-Modified: purchases and deletions do not move it
+            return etag, None
+        
+        return None, None
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List books from the catalog cache.
+        
+        The page is serialized anonymously once per catalog version and
+        is_owned is filled in per user at response time. Staff responses
+        include drafts and are never cached.
+        """
+        if request.user.is_staff:
+            return super().list(request, *args, **kwargs)
+        
+        key = CatalogCache.make_key('books:list', request.build_absolute_uri())
+        data = CatalogCache.get_or_build(key, lambda: self._build_cached_list(request))
+        
+        owned_ids = EntitlementService.get_book_ids(request.user)
+        results = [
+            {**row, 'is_owned': row['id'] in owned_ids}
+            for row in data['results']
+        ]
+        return Response({**data, 'results': results})
+    
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Get book detail from the catalog cache.
+        
+        Two anonymous variants are cached per book: a preview (free units
+        only) and the full unit list served to enrolled users.
+        """
+        if request.user.is_staff:
+            return super().retrieve(request, *args, **kwargs)
+        
+        url = request.build_absolute_uri()
+        data = CatalogCache.get_or_build(
+            CatalogCache.make_key('books:detail', url, 'preview'),
+            lambda: self._build_cached_detail(owned=False)
+        )
+        
+        is_owned = EntitlementService.has_book_access(request.user, data['id'])
+        if is_owned:
+            data = CatalogCache.get_or_build(
+                CatalogCache.make_key('books:detail', url, 'full'),
+                lambda: self._build_cached_detail(owned=True)
+            )
+        
+        return Response({**data, 'is_owned': is_owned})
+    
+    def _build_cached_list(self, request):
+        """Serialize the current list page without user-specific data."""
+        self.serialize_as_owned = False
+        try:
+            return super().list(request).data
+        finally:
+            self.serialize_as_owned = None
+    
+    def _build_cached_detail(self, owned):
+        """Serialize the book detail as seen by an (un)enrolled user."""
+        self.serialize_as_owned = owned
+        try:
+            return self.get_serializer(self.get_object()).data
+        finally:
+            self.serialize_as_owned = None
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -54,11 +223,7 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         book = self.get_object()
         
         # Check if user has access
-        is_owned = Enrollment.objects.filter(
-            user=request.user,
-            book=book,
-            is_active=True
-        ).exists()
+        is_owned = EntitlementService.has_book_access(request.user, book)
         
         # Get units based on access
         if is_owned or request.user.is_staff:
@@ -69,8 +234,104 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = UnitListSerializer(units, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def bundle(self, request, slug=None):
+        """
+        Get the offline bundle of every accessible unit of a book.
+        
+        Returns 202 while the bundle is being built; poll until the
+        response is 200 and contains a signed, resumable download URL.
+        """
+        books = Book.objects.all() if request.user.is_staff else Book.objects.filter(is_published=True)
+        book = get_object_or_404(books.only('id', 'slug'), slug=slug)
+        
+        units = Unit.objects.filter(book=book)
+        if not (request.user.is_staff or EntitlementService.has_book_access(request.user, book)):
+            units = units.filter(is_free=True)
+        unit_ids = list(units.values_list('id', flat=True))
+        if not unit_ids:
+            raise NoAccessException()
+        
+        bundle, manifest = OfflineBundleService.get_or_schedule(book, unit_ids)
+        return bundle_response(request, bundle, manifest)
+
+    @action(
+        detail=True,
+        methods=['post'],
+        permission_classes=[permissions.IsAuthenticated],
+        throttle_classes=[PlaylistThrottle]
+    )
+    def playlist(self, request, slug=None):
+        """
+        Sign every accessible asset of a book in one request.
+        
+        Request body (all optional):
+        {
+            "asset_type": "audio",  # only sign this asset type
+            "from_order": 3,        # first unit order (inclusive)
+            "to_order": 8           # last unit order (inclusive)
+        }
+        
+        Returns:
+        {
+            "book": "slug",
+            "expires_in": 300,
+            "units": [
+                {"id": 1, "title": "...", "order": 0,
+                 "assets": [{"id", "type", "url", "bytes", "checksum", "expires"}]}
+            ]
+        }
+        """
+        serializer = PlaylistRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        books = Book.objects.all() if request.user.is_staff else Book.objects.filter(is_published=True)
+        book = get_object_or_404(books.only('id', 'slug'), slug=slug)
+        
+        # Access is resolved once for the whole book, not per asset
+        assets = Asset.objects.filter(unit__book=book).exclude(file='')
+        if not (request.user.is_staff or EntitlementService.has_book_access(request.user, book)):
+            assets = assets.filter(unit__is_free=True)
+        if 'asset_type' in params:
+            assets = assets.filter(type=params['asset_type'])
+        if 'from_order' in params:
+            assets = assets.filter(unit__order__gte=params['from_order'])
+        if 'to_order' in params:
+            assets = assets.filter(unit__order__lte=params['to_order'])
+        assets = assets.select_related('unit').only(
+            'id', 'type', 'file', 'bytes', 'checksum',
+            'unit__id', 'unit__title', 'unit__order',
+        ).order_by('unit__order', 'unit__id', 'type')
+        
+        units = {}
+        for asset in assets:
+            entry = units.get(asset.unit_id)
+            if entry is None:
+                entry = units[asset.unit_id] = {
+                    'id': asset.unit_id,
+                    'title': asset.unit.title,
+                    'order': asset.unit.order,
+                    'assets': [],
+                }
+            url, expires = build_signed_media_url(request, asset.file.name)
+            entry['assets'].append({
+                'id': asset.id,
+                'type': asset.type,
+                'url': url,
+                'bytes': asset.bytes,
+                'checksum': asset.checksum,
+                'expires': expires,
+            })
+        
+        return Response({
+            'book': book.slug,
+            'expires_in': settings.SIGNED_URL_EXPIRATION,
+            'units': list(units.values()),
+        })
+
 
-class UnitViewSet(viewsets.ReadOnlyModelViewSet):
+class UnitViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for units."""
     
     permission_classes = [permissions.IsAuthenticated]
@@ -78,6 +339,24 @@ class UnitViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         """Return units accessible to user."""
         return Unit.objects.select_related('book').prefetch_related('assets')
+    
+    def get_conditional_validators(self, request, *args, **kwargs):
+        """Transcripts are validated by their content digest."""
+        if self.action != 'transcript' or not str(kwargs.get('pk', '')).isdigit():
+            return None, None
+        
+        unit = self._get_transcript_unit(kwargs['pk'])
+        if unit is None or not EntitlementService.can_access_unit(request.user, unit):
+            return None, None
+        return self.build_etag('transcript', unit.transcript_digest, request.GET.urlencode()), None
+    
+    def _get_transcript_unit(self, pk):
+        """Load only the fields the transcript/cue endpoints need (memoized per request)."""
+        if not hasattr(self, '_transcript_unit'):
+            self._transcript_unit = Unit.objects.only(
+                'id', 'book_id', 'is_free', 'transcript_digest', 'transcript_sections'
+            ).filter(pk=pk).first()
+        return self._transcript_unit
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -90,19 +369,129 @@ class UnitViewSet(viewsets.ReadOnlyModelViewSet):
         unit = self.get_object()
         
         # Check access
-        if not unit.is_free:
-            has_access = Enrollment.objects.filter(
-                user=request.user,
-                book=unit.book,
-                is_active=True
-            ).exists()
-            
-            if not has_access and not request.user.is_staff:
-                raise NoAccessException()
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
         
         serializer = self.get_serializer(unit)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def transcript(self, request, pk=None):
+        """
+        Get the rendered transcript of a unit.
+        
+        Query params:
+            output: "sections" (default) or "html"
+            section: Only this section index
+            start, end: Only sections overlapping this audio range (seconds)
+        
+        Returns:
+        {
+            "unit": 1,
+            "digest": "sha256",
+            "sections_count": 4,
+            "sections": [{"index", "title", "level", "start_sec", "html"}]  # or "html": "..."
+        }
+        """
+        params = TranscriptQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        
+        unit = self._get_transcript_unit(pk) if str(pk).isdigit() else None
+        if unit is None:
+            raise Http404('Unit not found.')
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
+        
+        # Rendered on save; the markdown is only read if the cache was evicted
+        sections = TranscriptCache.get_sections(
+            unit.transcript_digest,
+            lambda: Unit.objects.values_list('transcript', flat=True).get(pk=unit.pk)
+        )
+        sections = select_sections(
+            sections,
+            section=params.get('section'),
+            start=params.get('start'),
+            end=params.get('end'),
+        )
+        
+        data = {
+            'unit': unit.pk,
+            'digest': unit.transcript_digest,
+            'sections_count': unit.transcript_sections,
+        }
+        if params['output'] == 'html':
+            data['html'] = ''.join(item['html'] for item in sections)
+        else:
+            data['sections'] = sections
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """
+        Get the offline bundle of a unit (assets, transcript, questions).
+        
+        Returns 202 while the bundle is being built; poll until the
+        response is 200 and contains a signed, resumable download URL.
+        """
+        unit = get_object_or_404(Unit.objects.select_related('book'), pk=pk)
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
+        
+        bundle, manifest = OfflineBundleService.get_or_schedule(unit.book, [unit.pk], unit=unit)
+        return bundle_response(request, bundle, manifest)
+
+    @action(detail=True, methods=['get'])
+    def cues(self, request, pk=None):
+        """
+        Get subtitle cues of a unit by time range or phrase.
+        
+        Query params:
+            from, to: Only cues overlapping this range (seconds)
+            q: Only cues containing this phrase (jump to phrase)
+            limit: Maximum cues returned (default 50, max 200)
+        
+        Returns:
+        {
+            "unit": 1,
+            "count": 120,
+            "cues": [{"index": 4, "start": 121.5, "end": 124.0, "text": "..."}]
+        }
+        """
+        query = {
+            name: request.query_params[param]
+            for param, name in (('from', 'start'), ('to', 'end'), ('q', 'q'), ('limit', 'limit'))
+            if param in request.query_params
+        }
+        params = CueQuerySerializer(data=query)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        
+        unit = self._get_transcript_unit(pk) if str(pk).isdigit() else None
+        if unit is None:
+            raise Http404('Unit not found.')
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
+        
+        index = CueIndex.objects.filter(unit_id=unit.pk).first()
+        if index is None:
+            raise Http404('Unit has no subtitles.')
+        
+        if params.get('q'):
+            cues = index.find(params['q'], limit=params['limit'])
+        else:
+            start, end = params.get('start'), params.get('end')
+            cues = index.window(
+                None if start is None else round(start * 1000),
+                None if end is None else round(end * 1000),
+            )[:params['limit']]
+        
+        return Response({
+            'unit': unit.pk,
+            'count': len(index.starts),
+            'cues': cues,
+        })
+
     @action(
         detail=True,
         methods=['post'],
@@ -128,15 +517,8 @@ class UnitViewSet(viewsets.ReadOnlyModelViewSet):
         asset_type = request.data.get('asset_type', 'audio')
         
         # Check access
-        if not unit.is_free:
-            has_access = Enrollment.objects.filter(
-                user=request.user,
-                book=unit.book,
-                is_active=True
-            ).exists()
-            
-            if not has_access and not request.user.is_staff:
-                raise NoAccessException()
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
         
         # Get asset
         try:
@@ -147,17 +529,108 @@ class UnitViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Generate signed URL
-        expiration = int(time.time()) + settings.SIGNED_URL_EXPIRATION
-        data = f"{asset.id}:{request.user.id}"
-        token = generate_secure_token(data, settings.SECRET_KEY, expiration)
+        if not asset.file:
+            return Response(
+                {'detail': f'Asset of type {asset_type} has no file.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        # Build signed URL
-        base_url = request.build_absolute_uri(asset.file.url)
-        signed_url = f"{base_url}?token={token}&expires={expiration}&user={request.user.id}"
+        # Signed URL for the media gateway (verified without DB access)
+        signed_url, _ = build_signed_media_url(request, asset.file.name)
         
         return Response({
             'url': signed_url,
             'expires_in': settings.SIGNED_URL_EXPIRATION
         })
 
+
+class SearchViewSet(viewsets.ViewSet):
+    """Full-text search over published books and units."""
+    
+    permission_classes = [permissions.AllowAny]
+    default_limit = 20
+    max_limit = 50
+    
+    def list(self, request):
+        """
+        Search books and unit transcripts.
+        
+        Query params:
+            q: Search text; diacritics are optional, "quoted text" is a phrase
+            limit: Maximum number of results (default 20, max 50)
+        """
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = max(1, min(limit, self.max_limit))
+        
+        documents = CatalogSearch.search(query, limit=limit) if query else []
+        serializer = SearchResultSerializer(documents, many=True, context={'request': request})
+        
+        return Response({
+            'query': query,
+            'results': serializer.data
+        })
+
+
+@require_http_methods(['GET', 'HEAD'])
+def media_gateway(request, name):
+    """
+    Serve a protected media file from a signed URL.
+    
+    Only the signature is checked, without database or session access.
+    With MEDIA_ACCEL_REDIRECT_PREFIX set, nginx performs the transfer
+    (including Range handling); otherwise the file is streamed from here,
+    honouring single byte ranges so audio players can seek.
+    """
+    if not verify_media_signature(name, request.GET):
+        return HttpResponseForbidden('Invalid or expired media signature.')
+    
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    max_age = max(0, int(request.GET['expires']) - int(time.time()))
+    cache_control = f'private, max-age={max_age}'
+    
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(name)
+        response['Cache-Control'] = cache_control
+        return response
+    
+    try:
+        media_file = open(default_storage.path(name), 'rb')
+    except (FileNotFoundError, IsADirectoryError, SuspiciousFileOperation):
+        raise Http404('File not found.')
+    size = os.fstat(media_file.fileno()).st_size
+    
+    try:
+        byte_range = parse_range_header(request.headers.get('Range', ''), size)
+    except ValueError:
+        media_file.close()
+        response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    response_status = status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+    
+    if request.method == 'HEAD':
+        media_file.close()
+        response = HttpResponse(status=response_status, content_type=content_type)
+    else:
+        # FileResponse hands fileno() to wsgi.file_wrapper (sendfile) when available
+        media_file.seek(start)
+        response = FileResponse(
+            BoundedFileReader(media_file, length),
+            status=response_status,
+            content_type=content_type
+        )
+    
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
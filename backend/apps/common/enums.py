@@ -16,6 +16,13 @@ class AssetType(models.TextChoices):
     SUBTITLE = 'subtitle', 'Subtitle'
 
 
+class IngestStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    PROCESSING = 'processing', 'Processing'
+    READY = 'ready', 'Ready'
+    FAILED = 'failed', 'Failed'
+
+
 class QuestionType(models.TextChoices):
     SINGLE = 'single', 'Single Choice'
     MULTI = 'multi', 'Multiple Choice'
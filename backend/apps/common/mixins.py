@@ -1,8 +1,12 @@
 """
 Common mixins for models and views.
 """
+import hashlib
+
 from django.db import models
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 
 
 class TimestampMixin(models.Model):
@@ -49,3 +53,78 @@ class OrderingMixin(models.Model):
         abstract = True
         ordering = ['order']
 
+
+class _ConditionalResponse(Exception):
+    """Carry a 304/412 response out of APIView.initial()."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    View mixin adding ETag and Last-Modified validators to safe requests.
+
+    Views override get_conditional_validators() to return cheap validators
+    for the current action. Matching If-None-Match / If-Modified-Since
+    requests are answered with 304 before the handler runs, so nothing is
+    queried or serialized.
+    """
+
+    def get_conditional_validators(self, request, *args, **kwargs):
+        """
+        Return validators for the current action.
+
+        Returns:
+            Tuple of (etag, last_modified); etag is an unquoted string and
+            last_modified a datetime. Either may be None.
+        """
+        return None, None
+
+    @staticmethod
+    def build_etag(*parts):
+        """Hash the given parts into a strong ETag value."""
+        return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+
+    def initial(self, request, *args, **kwargs):
+        """Run auth/permission checks, then short-circuit on fresh validators."""
+        super().initial(request, *args, **kwargs)
+
+        self._conditional_etag = self._conditional_last_modified = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        etag, last_modified = self.get_conditional_validators(request, *args, **kwargs)
+        self._conditional_etag = quote_etag(etag) if etag else None
+        self._conditional_last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request,
+            etag=self._conditional_etag,
+            last_modified=self._conditional_last_modified,
+        )
+        if response is not None:
+            raise _ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        """Return the prepared 304/412 response instead of an error."""
+        if isinstance(exc, _ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Attach validators to successful and not-modified responses."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        etag = getattr(self, '_conditional_etag', None)
+        last_modified = getattr(self, '_conditional_last_modified', None)
+        if response.status_code in (200, 304) and (etag or last_modified):
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+            # Responses vary per user, so shared caches must not store them
+            patch_cache_control(response, private=True, no_cache=True)
+
+        return response
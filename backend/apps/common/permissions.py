@@ -66,10 +66,6 @@ class HasBookAccess(permissions.BasePermission):
             return True
         
         # Check if user has enrollment for this book
-        from apps.users.models import Enrollment
-        book = getattr(obj, 'book', obj)
-        return Enrollment.objects.filter(
-            user=request.user,
-            book=book,
-            is_active=True
-        ).exists()
\ No newline at end of file
+        from apps.users.services import EntitlementService
+        book_id = getattr(obj, 'book_id', obj.pk)
+        return EntitlementService.has_book_access(request.user, book_id)
\ No newline at end of file
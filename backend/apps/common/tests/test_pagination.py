@@ -0,0 +1,66 @@
+"""
+Test cases for KeysetPagination
+"""
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit
+from apps.quiz.models import Attempt
+from apps.users.models import User
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='student@example.com', password='testpass123')
+
+
+@pytest.fixture
+def attempts(user):
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', is_free=True)
+    created = [Attempt.objects.create(user=user, unit=unit) for _ in range(5)]
+    # Identical timestamps exercise the id tie-breaker
+    Attempt.objects.filter(pk__in=[a.pk for a in created]).update(created_at=timezone.now())
+    return created
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cursor walking and legacy page mode"""
+
+    def test_cursor_walks_all_rows_once(self, user, attempts):
+        """Test following next links returns every row exactly once"""
+        client = APIClient()
+        client.force_authenticate(user)
+
+        seen = []
+        url = '/api/quiz/attempts/?page_size=2'
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.data
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+
+        assert seen == sorted((a.pk for a in attempts), reverse=True)
+
+    def test_invalid_cursor_returns_404(self, user, attempts):
+        """Test a tampered cursor is rejected"""
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/quiz/attempts/?cursor=not-a-cursor')
+
+        assert response.status_code == 404
+
+    def test_page_param_uses_legacy_format(self, user, attempts):
+        """Test ?page= keeps the page-number response shape"""
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get('/api/quiz/attempts/?page=1&page_size=2')
+
+        assert response.status_code == 200
+        assert response.data['count'] == 5
+        assert len(response.data['results']) == 2
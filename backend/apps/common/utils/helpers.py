@@ -126,13 +126,114 @@ def calculate_file_checksum(file_path: str, algorithm='md5') -> str:
     Returns:
         Hex string of checksum
     """
-    hash_func = hashlib.__dict__[algorithm]()
-    
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
+        checksum, _ = stream_file_digest(f, algorithm)
+    return checksum
+
+
+def stream_file_digest(fileobj, algorithm='sha256', buffer_size=1024 * 1024):
+    """
+    Hash a file in fixed-size buffers without loading it into memory.
+    
+    One buffer is allocated and reused via readinto(), so memory stays at
+    buffer_size regardless of file size.
+    
+    Args:
+        fileobj: Binary file object opened for reading
+        algorithm: Hash algorithm (default: sha256)
+        buffer_size: Read size in bytes (default: 1 MiB)
+    
+    Returns:
+        Tuple (hex digest, number of bytes read)
+    """
+    hash_func = hashlib.new(algorithm)
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    total = 0
+    
+    readinto = getattr(fileobj, 'readinto', None)
+    while True:
+        if readinto is not None:
+            read = readinto(buffer)
+            if not read:
+                break
+            hash_func.update(view[:read])
+        else:
+            chunk = fileobj.read(buffer_size)
+            if not chunk:
+                break
+            read = len(chunk)
             hash_func.update(chunk)
+        total += read
+    
+    return hash_func.hexdigest(), total
+
+
+def parse_range_header(header: str, size: int):
+    """
+    Parse a single-range HTTP Range header.
+    
+    Args:
+        header: Range header value (e.g. "bytes=0-1023", "bytes=-500")
+        size: Total size of the resource in bytes
+    
+    Returns:
+        Inclusive (start, end) tuple, or None when the header is absent,
+        malformed or asks for several ranges (serve the full body)
+    
+    Raises:
+        ValueError: If the range cannot be satisfied (respond 416)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    
+    start, sep, end = header[len('bytes='):].strip().partition('-')
+    if not sep or not (start or end):
+        return None
+    if (start and not start.isdigit()) or (end and not end.isdigit()):
+        return None
+    
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(0, size - length), size - 1
+    
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+class BoundedFileReader:
+    """
+    File wrapper that stops reading after a fixed number of bytes.
+    
+    The underlying file must already be positioned at the range start.
+    fileno() is exposed so WSGI servers can still use sendfile(); they
+    bound the transfer by the response Content-Length.
+    """
+    
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+    
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+    
+    def fileno(self):
+        return self.file.fileno()
     
-    return hash_func.hexdigest()
+    def close(self):
+        self.file.close()
 
 
 def format_currency(amount: int, currency: str = 'VND') -> str:
@@ -8,6 +8,7 @@ from django.dispatch import Signal
 from apps.common.enums import OrderStatus, PaymentProvider, TransactionStatus
 from ..models import Order, Transaction
 from apps.users.models import Enrollment
+from apps.users.services import EntitlementService
 
 
 # Custom signal for successful payment
@@ -32,13 +33,7 @@ class OrderService:
             Order instance
         """
         # Check if user already has enrollment
-        existing_enrollment = Enrollment.objects.filter(
-            user=user,
-            book=book,
-            is_active=True
-        ).exists()
-        
-        if existing_enrollment:
+        if EntitlementService.has_book_access(user, book):
             raise ValueError('User already has access to this book')
         
         # Create order
@@ -125,6 +120,9 @@ class OrderService:
             }
         )
         
+        # Drop cached entitlements so the purchase unlocks content right away
+        EntitlementService.invalidate(order.user_id)
+        
         # Send signal for post-payment processing
         payment_succeeded.send(sender=Order, order=order)
         
@@ -10,6 +10,7 @@ from django.utils.decorators import method_decorator
 
 from apps.catalog.models import Book
 from apps.common.enums import PaymentProvider
+from apps.common.pagination import KeysetPagination
 from .models import Order
 from .serializers import OrderSerializer, CreateOrderSerializer, TransactionSerializer
 from .services import VNPayService, MoMoService, OrderService
@@ -20,6 +21,7 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Return current user's orders."""
@@ -89,7 +89,7 @@ class UserProgressAdmin(admin.ModelAdmin):
         if not obj.id:
             return '-'
         
-        total_units = obj.book.units.count()
+        total_units = obj.book.unit_count
         completed = obj.completed_units
         remaining = total_units - completed
         
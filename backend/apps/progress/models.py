@@ -33,6 +33,7 @@ class UserProgress(TimestampMixin):
         unique_together = [['user', 'book']]
         indexes = [
             models.Index(fields=['user', 'book']),
+            models.Index(fields=['user', '-created_at']),
         ]
 
     def __str__(self):
@@ -41,7 +42,7 @@ class UserProgress(TimestampMixin):
     @property
     def completion_pct(self):
         """Calculate completion percentage."""
-        total_units = self.book.units.count()
+        total_units = self.book.unit_count
         if total_units == 0:
             return 0
         return round((self.completed_units / total_units) * 100, 2)
@@ -0,0 +1 @@
+# Progress tests
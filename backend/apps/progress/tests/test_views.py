@@ -0,0 +1,56 @@
+"""
+Test cases for progress API views
+"""
+import pytest
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit
+from apps.progress.models import ListeningSession
+from apps.users.models import User
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='student@example.com', password='testpass123')
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    return Unit.objects.create(book=book, title='Unit 1', order=1, is_free=True)
+
+
+@pytest.mark.django_db
+class TestListeningHistory:
+    """Test the listening history endpoint"""
+
+    def test_history_lists_own_sessions(self, client, user, unit):
+        """Test /sessions/ resolves to the history list, not a progress detail"""
+        ListeningSession.objects.create(user=user, unit=unit, duration_sec=30)
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        ListeningSession.objects.create(user=other, unit=unit, duration_sec=60)
+
+        response = client.get('/api/progress/sessions/')
+
+        assert response.status_code == 200
+        assert [session['duration_sec'] for session in response.data['results']] == [30]
+
+    def test_tick_then_history(self, client, unit):
+        """Test a recorded tick shows up in the unit's history"""
+        response = client.post(
+            f'/api/progress/sessions/units/{unit.pk}/tick/',
+            {'duration_sec': 45, 'completed': True},
+            format='json',
+        )
+        assert response.status_code == 201
+
+        response = client.get(f'/api/progress/sessions/?unit={unit.pk}')
+        assert response.status_code == 200
+        assert len(response.data['results']) == 1
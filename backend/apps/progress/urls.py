@@ -8,8 +8,9 @@ from .views import ProgressViewSet, ListeningSessionViewSet
 app_name = 'progress'
 
 router = DefaultRouter()
-router.register('', ProgressViewSet, basename='progress')
+# The empty prefix would otherwise capture /sessions/ as a progress detail
 router.register('sessions', ListeningSessionViewSet, basename='session')
+router.register('', ProgressViewSet, basename='progress')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,14 +1,15 @@
 """
 Views for progress tracking.
 """
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, mixins, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
 from apps.catalog.models import Unit
-from apps.users.models import Enrollment
+from apps.users.services import EntitlementService
 from apps.common.exceptions import NoAccessException
+from apps.common.pagination import KeysetPagination
 from .models import UserProgress, ListeningSession
 from .serializers import (
     UserProgressSerializer, ListeningSessionSerializer,
@@ -22,6 +23,7 @@ class ProgressViewSet(viewsets.ReadOnlyModelViewSet):
     
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserProgressSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Return current user's progress."""
@@ -49,10 +51,24 @@ class ProgressViewSet(viewsets.ReadOnlyModelViewSet):
         })
 
 
-class ListeningSessionViewSet(viewsets.ViewSet):
-    """ViewSet for listening sessions."""
+class ListeningSessionViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """ViewSet for listening sessions (history list and listen ticks)."""
     
     permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ListeningSessionSerializer
+    pagination_class = KeysetPagination
+    
+    def get_queryset(self):
+        """Return current user's listening history, optionally for one unit."""
+        queryset = ListeningSession.objects.filter(
+            user=self.request.user
+        ).select_related('unit')
+        
+        unit_id = self.request.query_params.get('unit')
+        if unit_id and unit_id.isdigit():
+            queryset = queryset.filter(unit_id=unit_id)
+        
+        return queryset
 
     @action(detail=False, methods=['post'], url_path='units/(?P<unit_id>[^/.]+)/tick')
     def listen_tick(self, request, unit_id=None):
@@ -68,15 +84,8 @@ class ListeningSessionViewSet(viewsets.ViewSet):
         unit = get_object_or_404(Unit, id=unit_id)
         
         # Check access
-        if not unit.is_free:
-            has_access = Enrollment.objects.filter(
-                user=request.user,
-                book=unit.book,
-                is_active=True
-            ).exists()
-            
-            if not has_access and not request.user.is_staff:
-                raise NoAccessException()
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
         
         # Validate request data
         serializer = ListenTickSerializer(data=request.data)
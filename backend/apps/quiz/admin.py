@@ -3,12 +3,14 @@ Enhanced admin configuration for quiz app.
 """
 from django.contrib import admin
 from django.core.exceptions import ValidationError
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.contrib import messages
 from django.db.models import Count, Q
 import random
 from .models import Question, Choice, Attempt, AttemptAnswer
+from .services import QuizRegradeService
 from apps.common.enums import QuestionType
+from apps.catalog.services import CatalogCloneService, CatalogCounterService
 
 
 class ChoiceInline(admin.TabularInline):
@@ -31,11 +33,14 @@ class ChoiceInline(admin.TabularInline):
 class QuestionAdmin(admin.ModelAdmin):
     """Enhanced admin for Question model."""
     
-    list_display = ['text_preview', 'unit', 'type_display', 'order', 'choices_count', 'validation_status', 'created_at']
+    list_display = [
+        'text_preview', 'unit', 'type_display', 'order', 'choices_count', 'validation_status',
+        'difficulty_display', 'discrimination_display', 'created_at'
+    ]
     list_filter = ['type', 'unit__book', 'unit', 'created_at']
     search_fields = ['text', 'unit__title', 'explanation']
     autocomplete_fields = ['unit']
-    readonly_fields = ['created_at', 'updated_at', 'correct_choices', 'validation_details']
+    readonly_fields = ['created_at', 'updated_at', 'correct_choices', 'validation_details', 'item_analysis']
     list_editable = ['order']
     
     fieldsets = (
@@ -49,6 +54,10 @@ class QuestionAdmin(admin.ModelAdmin):
             'fields': ('validation_details',),
             'classes': ('collapse',)
         }),
+        ('Item Analysis', {
+            'fields': ('item_analysis',),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('correct_choices', 'created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -67,12 +76,18 @@ class QuestionAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimize queryset."""
         qs = super().get_queryset(request)
-        qs = qs.select_related('unit', 'unit__book').annotate(
+        qs = qs.select_related('unit', 'unit__book', 'stats').annotate(
             _choices_count=Count('choices', distinct=True),
             _correct_count=Count('choices', filter=Q(choices__is_correct=True), distinct=True)
         )
         return qs
     
+    def delete_queryset(self, request, queryset):
+        """Delete questions in bulk and resync unit question counts."""
+        unit_ids = set(queryset.values_list('unit_id', flat=True))
+        super().delete_queryset(request, queryset)
+        CatalogCounterService.recount_question_counts(unit_ids)
+    
     def text_preview(self, obj):
         """Return truncated question text."""
         text = obj.text[:80] + '...' if len(obj.text) > 80 else obj.text
@@ -101,6 +116,62 @@ class QuestionAdmin(admin.ModelAdmin):
         )
     choices_count.short_description = 'Choices'
     
+    def difficulty_display(self, obj):
+        """Display the share of attempts answering correctly (p-value)."""
+        stats = getattr(obj, 'stats', None)
+        if stats is None or stats.p_value is None:
+            return '-'
+        
+        # Nearly everyone or nearly no one right: the question tells learners apart poorly
+        color = 'orange' if stats.p_value > 0.9 or stats.p_value < 0.2 else 'inherit'
+        return format_html(
+            '<span style="color: {};" title="{} attempts">{}%</span>',
+            color, stats.responses, round(stats.p_value * 100)
+        )
+    difficulty_display.short_description = 'Correct'
+    difficulty_display.admin_order_field = 'stats__p_value'
+    
+    def discrimination_display(self, obj):
+        """Display point-biserial discrimination, flagging weak or negative items."""
+        stats = getattr(obj, 'stats', None)
+        if stats is None or stats.discrimination is None:
+            return '-'
+        
+        color = 'red' if stats.discrimination < 0.1 else 'orange' if stats.discrimination < 0.2 else 'green'
+        return format_html('<span style="color: {};">{}</span>', color, f'{stats.discrimination:.2f}')
+    discrimination_display.short_description = 'Discrimination'
+    discrimination_display.admin_order_field = 'stats__discrimination'
+    
+    def item_analysis(self, obj):
+        """Show item statistics and how often each choice was selected."""
+        stats = getattr(obj, 'stats', None) if obj.pk else None
+        if stats is None:
+            return 'Not analysed yet (refreshed hourly from submitted attempts).'
+        
+        responses = stats.responses or 1
+        rows = format_html_join(
+            '',
+            '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}%</td></tr>',
+            (
+                (
+                    choice.order,
+                    choice.text[:60],
+                    '✓' if choice.is_correct else '',
+                    round(stats.choice_counts.get(str(choice.pk), 0) * 100 / responses),
+                )
+                for choice in obj.choices.all()
+            )
+        )
+        return format_html(
+            '<p>Attempts: {} · Correct: {} · Discrimination: {}</p>'
+            '<table><tr><th>#</th><th>Choice</th><th></th><th>Selected</th></tr>{}</table>',
+            stats.responses,
+            '-' if stats.p_value is None else f'{stats.p_value:.0%}',
+            '-' if stats.discrimination is None else f'{stats.discrimination:.2f}',
+            rows
+        )
+    item_analysis.short_description = 'Item Analysis'
+    
     def validation_status(self, obj):
         """Show validation status for the question."""
         choices_count = getattr(obj, '_choices_count', 0)
@@ -255,33 +326,8 @@ class QuestionAdmin(admin.ModelAdmin):
     convert_to_multi.short_description = '☑ Convert to MULTI choice'
     
     def duplicate_questions(self, request, queryset):
-        """Duplicate selected questions."""
-        duplicated = 0
-        for question in queryset:
-            # Get max order for the unit
-            max_order = Question.objects.filter(unit=question.unit).aggregate(
-                max_order=Count('order')
-            )['max_order'] or 0
-            
-            # Create duplicate
-            new_question = Question.objects.create(
-                unit=question.unit,
-                type=question.type,
-                text=f"{question.text} (Copy)",
-                explanation=question.explanation,
-                order=max_order + 1
-            )
-            
-            # Copy choices
-            for choice in question.choices.all():
-                Choice.objects.create(
-                    question=new_question,
-                    text=choice.text,
-                    is_correct=choice.is_correct,
-                    order=choice.order
-                )
-            
-            duplicated += 1
+        """Duplicate selected questions (with choices) at the end of their units."""
+        duplicated = CatalogCloneService.duplicate_questions(queryset.values_list('id', flat=True))
         
         self.message_user(
             request,
@@ -457,26 +503,21 @@ class AttemptAdmin(admin.ModelAdmin):
         return False
     
     def regrade_attempts(self, request, queryset):
-        """Regrade selected attempts."""
-        regraded = 0
-        for attempt in queryset:
-            # Regrade all answers
-            for answer in attempt.answers.all():
-                answer.grade()
-                answer.save()
-            
-            # Recalculate score
-            total = attempt.answers.count()
-            if total > 0:
-                correct = attempt.answers.filter(is_correct=True).count()
-                attempt.score_raw = correct
-                attempt.score_pct = (correct / total) * 100
-                attempt.save()
-                regraded += 1
+        """Regrade selected attempts against the current answer keys."""
+        attempts_by_unit = {}
+        for attempt_id, unit_id in queryset.values_list('id', 'unit_id'):
+            attempts_by_unit.setdefault(unit_id, []).append(attempt_id)
+        
+        scores_changed = flipped = 0
+        for unit_id, attempt_ids in attempts_by_unit.items():
+            result = QuizRegradeService.regrade_unit(unit_id, attempt_ids=attempt_ids)
+            scores_changed += result['scores_changed']
+            flipped += result['outcomes_flipped']
         
         self.message_user(
             request,
-            f'Regraded {regraded} attempts.',
+            f'Regraded {queryset.count()} attempts: {scores_changed} scores changed, '
+            f'{flipped} pass/fail outcomes flipped.',
             messages.SUCCESS
         )
     regrade_attempts.short_description = '🔄 Regrade selected attempts'
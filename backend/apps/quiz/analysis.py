@@ -0,0 +1,67 @@
+"""
+Item-analysis statistics for quiz app.
+"""
+import numpy as np
+
+
+def item_statistics(scores):
+    """
+    Compute classical test theory statistics of a scored response matrix.
+
+    Args:
+        scores: Array of shape (attempts, questions) holding 1 for a
+            correct answer and 0 otherwise (unanswered counts as wrong)
+
+    Returns:
+        Tuple (p_values, discrimination, kr20): per-question difficulty
+        (share correct) and point-biserial correlation with the rest
+        score (total minus the item), NaN where undefined, plus the
+        KR-20 reliability of the unit (None when undefined)
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    attempts, questions = scores.shape
+    if attempts == 0 or questions == 0:
+        nan = np.full(questions, np.nan)
+        return nan, nan.copy(), None
+
+    p_values = scores.mean(axis=0)
+    totals = scores.sum(axis=1)
+
+    # Correlate each item with the rest score so it is not correlated with itself
+    rest = totals[:, None] - scores
+    item_dev = scores - p_values
+    rest_dev = rest - rest.mean(axis=0)
+    denominator = np.sqrt((item_dev ** 2).sum(axis=0) * (rest_dev ** 2).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discrimination = np.where(
+            denominator > 0, (item_dev * rest_dev).sum(axis=0) / denominator, np.nan
+        )
+
+    kr20 = None
+    variance = totals.var()
+    if questions > 1 and variance > 0:
+        kr20 = float(questions / (questions - 1) * (1 - (p_values * (1 - p_values)).sum() / variance))
+
+    return p_values, discrimination, kr20
+
+
+def choice_counts(question_index, choice_ids):
+    """
+    Count how often each choice was selected, per question.
+
+    Args:
+        question_index: Array of question columns, one per selection
+        choice_ids: Array of selected choice IDs, aligned with question_index
+
+    Returns:
+        Dict of question column -> {choice ID: times selected}
+    """
+    counts = {}
+    if len(choice_ids) == 0:
+        return counts
+    pairs, totals = np.unique(
+        np.stack([np.asarray(question_index), np.asarray(choice_ids)], axis=1), axis=0, return_counts=True
+    )
+    for (column, choice_id), total in zip(pairs.tolist(), totals.tolist()):
+        counts.setdefault(column, {})[choice_id] = total
+    return counts
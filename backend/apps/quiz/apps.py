@@ -6,3 +6,6 @@ class QuizConfig(AppConfig):
     name = 'apps.quiz'
     verbose_name = 'Quiz'
 
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.quiz.signals
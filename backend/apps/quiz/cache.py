@@ -0,0 +1,146 @@
+"""
+Compiled answer-key cache for quiz app.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class AnswerKeyCache:
+    """
+    Cache each unit's answer key under a per-unit version.
+
+    The key maps question ID -> frozenset of correct choice IDs, so a
+    submission is graded (and its result shown) in memory without touching
+    questions or choices.
+    The answer-free question set served to learners is cached under the
+    same version. Question and choice signals bump the unit's version,
+    which orphans the old entries instead of deleting them.
+    """
+
+    VERSION_KEY = 'quiz:answer-key:version:{unit_id}'
+    KEY = 'quiz:answer-key:{unit_id}:v{version}'
+    QUESTIONS_KEY = 'quiz:questions:{unit_id}:v{version}'
+
+    @classmethod
+    def get_version(cls, unit_id):
+        """
+        Get the current answer-key version of a unit.
+
+        Args:
+            unit_id: Unit ID
+
+        Returns:
+            Integer version
+        """
+        version_key = cls.VERSION_KEY.format(unit_id=unit_id)
+        version = cache.get(version_key)
+        if version is None:
+            # Seed from the clock so a lost key never revives stale entries
+            cache.add(version_key, time.time_ns(), None)
+            version = cache.get(version_key)
+        return version
+
+    @classmethod
+    def bump(cls, *unit_ids):
+        """
+        Invalidate the answer keys of the given units.
+
+        Inside a transaction the versions are bumped again on commit: a
+        concurrent reader may compile the still-committed key in between
+        and cache it under the new version.
+        """
+        unit_ids = {unit_id for unit_id in unit_ids if unit_id is not None}
+        cls._incr(unit_ids)
+        if unit_ids and transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: cls._incr(unit_ids))
+
+    @classmethod
+    def _incr(cls, unit_ids):
+        """Move the given units to a new version."""
+        for unit_id in unit_ids:
+            version_key = cls.VERSION_KEY.format(unit_id=unit_id)
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.set(version_key, time.time_ns(), None)
+
+    @classmethod
+    def get(cls, unit_id):
+        """
+        Return the compiled answer key of a unit, building it on a miss.
+
+        Args:
+            unit_id: Unit ID
+
+        Returns:
+            Dict of question ID -> frozenset of correct choice IDs
+        """
+        return cls.load(unit_id)['correct']
+
+    @classmethod
+    def get_questions(cls, unit_id):
+        """
+        Return the answer-free question set of a unit, serializing it on a miss.
+
+        Args:
+            unit_id: Unit ID
+
+        Returns:
+            List of QuestionSerializer dicts in question order
+        """
+        from .models import Question
+        from .serializers import QuestionSerializer
+
+        key = cls.QUESTIONS_KEY.format(unit_id=unit_id, version=cls.get_version(unit_id))
+        questions = cache.get(key)
+        if questions is None:
+            queryset = Question.objects.filter(unit_id=unit_id).prefetch_related('choices')
+            questions = [dict(question) for question in QuestionSerializer(queryset, many=True).data]
+            cache.set(key, questions, settings.QUIZ_ANSWER_KEY_TIMEOUT)
+        return questions
+
+    @classmethod
+    def load(cls, unit_id):
+        """
+        Return the cached compilation of a unit, building it on a miss.
+
+        Callers that need both the key and the feedback take them from one
+        load() so a concurrent bump cannot mix two versions.
+        """
+        key = cls.KEY.format(unit_id=unit_id, version=cls.get_version(unit_id))
+        compiled = cache.get(key)
+        if compiled is None:
+            compiled = cls.compile(unit_id)
+            cache.set(key, compiled, settings.QUIZ_ANSWER_KEY_TIMEOUT)
+        return compiled
+
+    @staticmethod
+    def compile(unit_id):
+        """
+        Build the answer key and result feedback of a unit with one query.
+
+        Questions without a correct choice map to an empty set.
+
+        Returns:
+            Dict with ``correct`` (see get()) and ``questions`` mapping
+            question ID -> (text, explanation) for graded results
+        """
+        from .models import Question
+
+        correct = {}
+        questions = {}
+        rows = Question.objects.filter(unit_id=unit_id).values_list(
+            'id', 'text', 'explanation', 'choices__id', 'choices__is_correct'
+        )
+        for question_id, text, explanation, choice_id, is_correct in rows:
+            questions[question_id] = (text, explanation)
+            correct.setdefault(question_id, set())
+            if is_correct:
+                correct[question_id].add(choice_id)
+        return {
+            'correct': {question_id: frozenset(choice_ids) for question_id, choice_ids in correct.items()},
+            'questions': questions,
+        }
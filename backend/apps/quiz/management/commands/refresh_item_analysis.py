@@ -0,0 +1,26 @@
+"""
+Management command to refresh item-analysis statistics of quiz questions.
+"""
+from django.core.management.base import BaseCommand
+from apps.quiz.services import ItemAnalysisService
+
+
+class Command(BaseCommand):
+    help = 'Compute question difficulty, discrimination, distractor counts and unit KR-20'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--unit',
+            type=int,
+            action='append',
+            help='Only analyse this unit ID (repeatable)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-analyse units that are up to date'
+        )
+
+    def handle(self, *args, **options):
+        analysed = ItemAnalysisService.refresh(unit_ids=options['unit'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Analysed {analysed} units'))
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_book_counters'),
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitQuizStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Submitted attempts analysed')),
+                ('kr20', models.FloatField(blank=True, help_text='KR-20 reliability', null=True)),
+                ('last_attempt_id', models.PositiveBigIntegerField(default=0, help_text='Newest attempt included; 0 forces a refresh')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('unit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_stats', to='catalog.unit')),
+            ],
+            options={
+                'verbose_name': 'Unit Quiz Stats',
+                'verbose_name_plural': 'Unit Quiz Stats',
+                'db_table': 'quiz_unit_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0, help_text='Submitted attempts analysed')),
+                ('p_value', models.FloatField(blank=True, help_text='Share of attempts answering correctly', null=True)),
+                ('discrimination', models.FloatField(blank=True, help_text='Point-biserial correlation with the rest of the score', null=True)),
+                ('choice_counts', models.JSONField(default=dict, help_text='Choice ID -> times selected')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='quiz.question')),
+            ],
+            options={
+                'verbose_name': 'Question Stats',
+                'verbose_name_plural': 'Question Stats',
+                'db_table': 'quiz_question_stats',
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_unit_quiz_summaries(apps, schema_editor):
+    """Summarize existing submitted attempts per user and unit."""
+    Attempt = apps.get_model('quiz', 'Attempt')
+    UnitQuizSummary = apps.get_model('quiz', 'UnitQuizSummary')
+    pass_pct = 70
+
+    summaries = {}
+    rows = Attempt.objects.filter(submitted_at__isnull=False).order_by('submitted_at', 'id').values_list(
+        'id', 'user_id', 'unit_id', 'unit__book_id', 'score_pct', 'submitted_at'
+    )
+    for attempt_id, user_id, unit_id, book_id, score_pct, submitted_at in rows.iterator(chunk_size=2000):
+        summary = summaries.get((user_id, unit_id))
+        if summary is None:
+            summary = summaries[(user_id, unit_id)] = UnitQuizSummary(
+                user_id=user_id, unit_id=unit_id, book_id=book_id,
+                best_attempt_id=attempt_id, best_score_pct=score_pct, attempt_count=0,
+            )
+        if score_pct > summary.best_score_pct:
+            summary.best_attempt_id, summary.best_score_pct = attempt_id, score_pct
+        summary.attempt_count += 1
+        summary.last_score_pct = score_pct
+        summary.last_attempt_at = submitted_at
+        if summary.first_passed_at is None and score_pct >= pass_pct:
+            summary.first_passed_at = submitted_at
+
+    UnitQuizSummary.objects.bulk_create(summaries.values(), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('catalog', '0010_book_counters'),
+        ('quiz', '0002_item_analysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnitQuizSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('best_score_pct', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('last_score_pct', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('first_passed_at', models.DateTimeField(blank=True, help_text='Submission of the first passing attempt', null=True)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('best_attempt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quiz.attempt')),
+                ('book', models.ForeignKey(help_text='Book of the unit, for per-book overviews', on_delete=django.db.models.deletion.CASCADE, related_name='quiz_summaries', to='catalog.book')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_summaries', to='catalog.unit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Unit Quiz Summary',
+                'verbose_name_plural': 'Unit Quiz Summaries',
+                'db_table': 'quiz_unit_summary',
+                'indexes': [models.Index(fields=['user', 'book'], name='quiz_unit_s_user_id_be1cfe_idx')],
+                'unique_together': {('user', 'unit')},
+            },
+        ),
+        migrations.RunPython(backfill_unit_quiz_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quiz', '0003_unit_quiz_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='client_key',
+            field=models.CharField(blank=True, help_text='Idempotency key of an attempt synced from an offline client', max_length=64, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='attempt',
+            unique_together={('user', 'client_key')},
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:55
+
+from django.db import migrations, models
+
+
+def backfill_question_count(apps, schema_editor):
+    """Recover the denominator of scored attempts from score_raw / score_pct."""
+    Attempt = apps.get_model('quiz', 'Attempt')
+
+    attempts = []
+    rows = Attempt.objects.filter(score_pct__gt=0).values_list('id', 'score_raw', 'score_pct')
+    for attempt_id, score_raw, score_pct in rows.iterator(chunk_size=2000):
+        attempts.append(Attempt(id=attempt_id, question_count=round(score_raw * 100 / score_pct)))
+        if len(attempts) >= 2000:
+            Attempt.objects.bulk_update(attempts, ['question_count'])
+            attempts = []
+    Attempt.objects.bulk_update(attempts, ['question_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_attempt_client_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='question_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Questions in the unit when graded (denominator of score_pct)', null=True),
+        ),
+        migrations.RunPython(backfill_question_count, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@
 Models for quiz system.
 """
 from django.db import models
+from django.db.models import Prefetch
 from django.contrib.postgres.fields import JSONField as PostgresJSONField
 from django.core.exceptions import ValidationError
 from apps.common.enums import QuestionType
@@ -50,7 +51,9 @@ class Question(TimestampMixin, OrderingMixin):
 
     @property
     def correct_choices(self):
-        """Return list of correct choice IDs."""
+        """Return list of correct choice IDs (from a correct_choice_list prefetch when present)."""
+        if hasattr(self, 'correct_choice_list'):
+            return [choice.id for choice in self.correct_choice_list]
         return list(self.choices.filter(is_correct=True).values_list('id', flat=True))
 
 
@@ -72,6 +75,22 @@ class Choice(OrderingMixin):
         return f"{self.question.text[:30]} - {self.text[:30]}"
 
 
+class AttemptQuerySet(models.QuerySet):
+    """QuerySet helpers for quiz attempts."""
+
+    def with_results(self):
+        """Load answers, questions and correct choice IDs for result display in fixed queries."""
+        correct_choices = Prefetch(
+            'question__choices',
+            queryset=Choice.objects.filter(is_correct=True).only('id', 'question_id'),
+            to_attr='correct_choice_list',
+        )
+        answers = AttemptAnswer.objects.select_related('question').prefetch_related(correct_choices)
+        return self.select_related('unit').prefetch_related(
+            Prefetch('answers', queryset=answers.order_by('id'))
+        )
+
+
 class Attempt(TimestampMixin):
     """User's quiz attempt for a unit."""
     
@@ -86,6 +105,22 @@ class Attempt(TimestampMixin):
         default=0,
         help_text='Percentage score'
     )
+    question_count = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text='Questions in the unit when graded (denominator of score_pct)'
+    )
+    client_key = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text='Idempotency key of an attempt synced from an offline client'
+    )
+    
+    # Minimum score_pct that counts as passed
+    PASS_PCT = 70
+    
+    objects = AttemptQuerySet.as_manager()
     
     class Meta:
         db_table = 'quiz_attempt'
@@ -96,6 +131,8 @@ class Attempt(TimestampMixin):
             models.Index(fields=['user', 'unit']),
             models.Index(fields=['user', '-created_at']),
         ]
+        # NULL keys (online submissions) never collide
+        unique_together = [['user', 'client_key']]
 
     def __str__(self):
         return f"{self.user.email} - {self.unit.title} ({self.score_pct}%)"
@@ -107,8 +144,14 @@ class Attempt(TimestampMixin):
 
     @property
     def is_passed(self):
-        """Check if attempt passed (>= 70%)."""
-        return self.score_pct >= 70
+        """Check if attempt passed (>= PASS_PCT%)."""
+        return self.score_pct >= self.PASS_PCT
+
+    @property
+    def result_answers(self):
+        """Answers to show: the graded in-memory answers right after submission, else the stored ones."""
+        graded = getattr(self, '_graded_answers', None)
+        return graded if graded is not None else self.answers.all()
 
 
 class AttemptAnswer(models.Model):
@@ -128,12 +171,103 @@ class AttemptAnswer(models.Model):
     def __str__(self):
         return f"Answer to {self.question.text[:30]} - {'Correct' if self.is_correct else 'Wrong'}"
 
-    def grade(self):
-        """Grade this answer based on selected choices."""
-        correct_choice_ids = set(self.question.correct_choices)
-        selected_choice_ids = set(self.selected_choices)
+    def grade(self, correct_choice_ids=None):
+        """
+        Grade this answer based on selected choices.
+        
+        Args:
+            correct_choice_ids: Correct choice IDs from a compiled answer key
+                (default: read from the question)
+        """
+        if correct_choice_ids is None:
+            correct_choice_ids = self.question.correct_choices
         
         # Answer is correct only if selected choices exactly match correct choices
-        self.is_correct = correct_choice_ids == selected_choice_ids
+        self.is_correct = set(correct_choice_ids) == set(self.selected_choices)
         return self.is_correct
 
+
+class UnitQuizSummary(TimestampMixin):
+    """Per user and unit summary of quiz attempts (kept current by QuizSummaryService)."""
+    
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='quiz_summaries')
+    unit = models.ForeignKey('catalog.Unit', on_delete=models.CASCADE, related_name='quiz_summaries')
+    book = models.ForeignKey(
+        'catalog.Book',
+        on_delete=models.CASCADE,
+        related_name='quiz_summaries',
+        help_text='Book of the unit, for per-book overviews'
+    )
+    best_attempt = models.ForeignKey(
+        Attempt,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    best_score_pct = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    last_score_pct = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    attempt_count = models.PositiveIntegerField(default=0)
+    first_passed_at = models.DateTimeField(null=True, blank=True, help_text='Submission of the first passing attempt')
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'quiz_unit_summary'
+        verbose_name = 'Unit Quiz Summary'
+        verbose_name_plural = 'Unit Quiz Summaries'
+        unique_together = [['user', 'unit']]
+        indexes = [
+            models.Index(fields=['user', 'book']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - unit {self.unit_id}: best {self.best_score_pct}%"
+
+    @property
+    def is_passed(self):
+        """Check if any attempt passed."""
+        return self.first_passed_at is not None
+
+
+class QuestionStats(models.Model):
+    """Item-analysis statistics of a question (refreshed by ItemAnalysisService)."""
+    
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+    responses = models.PositiveIntegerField(default=0, help_text='Submitted attempts analysed')
+    p_value = models.FloatField(null=True, blank=True, help_text='Share of attempts answering correctly')
+    discrimination = models.FloatField(
+        null=True,
+        blank=True,
+        help_text='Point-biserial correlation with the rest of the score'
+    )
+    choice_counts = JSONField(default=dict, help_text='Choice ID -> times selected')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'quiz_question_stats'
+        verbose_name = 'Question Stats'
+        verbose_name_plural = 'Question Stats'
+
+    def __str__(self):
+        return f"Stats for question {self.question_id}"
+
+
+class UnitQuizStats(models.Model):
+    """Item-analysis summary of a unit's quiz (refreshed by ItemAnalysisService)."""
+    
+    unit = models.OneToOneField('catalog.Unit', on_delete=models.CASCADE, related_name='quiz_stats')
+    attempts = models.PositiveIntegerField(default=0, help_text='Submitted attempts analysed')
+    kr20 = models.FloatField(null=True, blank=True, help_text='KR-20 reliability')
+    last_attempt_id = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Newest attempt included; 0 forces a refresh'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'quiz_unit_stats'
+        verbose_name = 'Unit Quiz Stats'
+        verbose_name_plural = 'Unit Quiz Stats'
+
+    def __str__(self):
+        return f"Quiz stats for unit {self.unit_id}"
@@ -2,7 +2,7 @@
 Serializers for quiz app.
 """
 from rest_framework import serializers
-from .models import Question, Choice, Attempt, AttemptAnswer
+from .models import Question, Choice, Attempt, AttemptAnswer, UnitQuizSummary
 
 
 class ChoiceSerializer(serializers.ModelSerializer):
@@ -29,6 +29,13 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ['id', 'type', 'text', 'order', 'choices']
 
 
+class QuestionSetQuerySerializer(serializers.Serializer):
+    """Serializer for question set query parameters."""
+    
+    shuffle = serializers.BooleanField(default=False)
+    attempt = serializers.IntegerField(min_value=1, required=False)
+
+
 class AnswerSubmitSerializer(serializers.Serializer):
     """Serializer for submitting an answer."""
     
@@ -45,6 +52,27 @@ class QuizSubmitSerializer(serializers.Serializer):
     answers = AnswerSubmitSerializer(many=True)
 
 
+class SyncAttemptSerializer(serializers.Serializer):
+    """Serializer for one attempt taken offline."""
+    
+    client_key = serializers.CharField(max_length=64)
+    unit_id = serializers.IntegerField()
+    submitted_at = serializers.DateTimeField(required=False)
+    answers = AnswerSubmitSerializer(many=True)
+
+
+class QuizSyncSerializer(serializers.Serializer):
+    """Serializer for syncing a batch of offline attempts."""
+    
+    MAX_ATTEMPTS = 100
+    
+    attempts = serializers.ListField(
+        child=SyncAttemptSerializer(),
+        allow_empty=False,
+        max_length=MAX_ATTEMPTS
+    )
+
+
 class AttemptAnswerResultSerializer(serializers.ModelSerializer):
     """Serializer for attempt answer results (shown after submission)."""
     
@@ -66,7 +94,7 @@ class AttemptSerializer(serializers.ModelSerializer):
     unit_title = serializers.CharField(source='unit.title', read_only=True)
     is_submitted = serializers.ReadOnlyField()
     is_passed = serializers.ReadOnlyField()
-    answers = AttemptAnswerResultSerializer(many=True, read_only=True)
+    answers = AttemptAnswerResultSerializer(source='result_answers', many=True, read_only=True)
     
     class Meta:
         model = Attempt
@@ -92,3 +120,16 @@ class AttemptListSerializer(serializers.ModelSerializer):
             'score_raw', 'score_pct', 'is_submitted', 'is_passed', 'created_at'
         ]
 
+
+class UnitQuizSummarySerializer(serializers.ModelSerializer):
+    """Serializer for a user's quiz summary of one unit."""
+    
+    unit_title = serializers.CharField(source='unit.title', read_only=True)
+    is_passed = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = UnitQuizSummary
+        fields = [
+            'unit', 'unit_title', 'best_attempt', 'best_score_pct', 'last_score_pct',
+            'attempt_count', 'is_passed', 'first_passed_at', 'last_attempt_at'
+        ]
@@ -1,20 +1,37 @@
 """
 Business logic services for quiz app.
 """
+import hashlib
+import random
+from array import array
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db import transaction
-from .models import Question, Attempt, AttemptAnswer
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, DateTimeField, DecimalField, F, Max, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from .analysis import choice_counts, item_statistics
+from .cache import AnswerKeyCache
+from .models import Question, Choice, Attempt, AttemptAnswer, QuestionStats, UnitQuizStats, UnitQuizSummary
 
 
 class QuizGradingService:
     """Service for grading quiz attempts."""
     
-    @staticmethod
+    @classmethod
     @transaction.atomic
-    def submit_quiz(user, unit, answers_data):
+    def submit_quiz(cls, user, unit, answers_data):
         """
         Submit and grade a quiz attempt.
         
+        Answers are graded in memory against the unit's compiled answer key
+        and written with one bulk insert, so the query count does not grow
+        with the number of questions. The returned attempt carries its graded
+        answers, so serializing the result needs no further queries.
+        
         Args:
             user: User submitting the quiz
             unit: Unit being quizzed
@@ -23,50 +40,179 @@ class QuizGradingService:
         Returns:
             Attempt object with graded results
         """
-        # Create attempt
+        # Key and feedback must come from the same compilation of the unit
+        compiled = AnswerKeyCache.load(unit.pk)
+        answer_key, feedback = compiled['correct'], compiled['questions']
+        
+        answers = cls._grade_answers(answers_data, answer_key)
+        for question_id, answer in answers.items():
+            answer.question = cls._result_question(unit, question_id, feedback[question_id], answer_key[question_id])
+        
+        # Calculate score
+        correct_count = sum(answer.is_correct for answer in answers.values())
+        total_questions = len(answer_key)
+        now = timezone.now()
         attempt = Attempt.objects.create(
             user=user,
             unit=unit,
-            started_at=timezone.now()
+            started_at=now,
+            submitted_at=now,
+            score_raw=correct_count,
+            score_pct=cls.score_pct(correct_count, total_questions),
+            question_count=total_questions,
         )
         
-        # Get all questions for this unit
-        questions = Question.objects.filter(unit=unit).prefetch_related('choices')
-        question_dict = {q.id: q for q in questions}
+        for answer in answers.values():
+            answer.attempt = attempt
+        AttemptAnswer.objects.bulk_create(answers.values())
+        QuizSummaryService.record(attempt)
+        attempt._graded_answers = list(answers.values())
         
-        correct_count = 0
-        total_questions = len(questions)
+        return attempt
+    
+    @classmethod
+    def sync_attempts(cls, user, items, retry=True):
+        """
+        Grade and store a batch of attempts taken offline.
         
-        # Process each answer
-        for answer_data in answers_data:
-            question_id = answer_data['question_id']
-            selected_choice_ids = answer_data['choice_ids']
-            
-            # Get question
-            question = question_dict.get(question_id)
-            if not question:
-                continue  # Skip invalid question IDs
-            
-            # Create attempt answer
-            attempt_answer = AttemptAnswer.objects.create(
-                attempt=attempt,
-                question=question,
-                selected_choices=selected_choice_ids
+        Attempts are keyed by client-generated idempotency keys: keys
+        already stored for the user (or repeated in the batch) are reported
+        as duplicates and not graded again. Entitlements are loaded once for
+        the batch, answers are graded against cached answer keys, and all
+        new attempts and answers are written with two bulk inserts.
+        
+        Args:
+            user: User syncing the attempts
+            items: List of dicts with client_key, unit_id, answers and an
+                optional submitted_at (offline submission time)
+            retry: Retry once if a concurrent replay stored a key first
+        
+        Returns:
+            List of result dicts, in the order of items
+        """
+        from apps.catalog.models import Unit
+        from apps.users.services import EntitlementService
+        
+        keys = {item['client_key'] for item in items}
+        stored = {
+            attempt.client_key: attempt
+            for attempt in Attempt.objects.filter(user=user, client_key__in=keys).only(
+                'id', 'unit_id', 'client_key', 'score_raw', 'score_pct'
             )
+        }
+        units = Unit.objects.only('id', 'book_id', 'is_free').in_bulk({item['unit_id'] for item in items})
+        now = timezone.now()
+        
+        created = {}
+        answers = []
+        outcomes = []
+        for item in items:
+            key = item['client_key']
+            if key in stored or key in created:
+                outcomes.append((key, item['unit_id'], 'duplicate'))
+                continue
             
-            # Grade the answer
-            if attempt_answer.grade():
-                correct_count += 1
+            unit = units.get(item['unit_id'])
+            if unit is None:
+                outcomes.append((key, item['unit_id'], 'not_found'))
+                continue
+            if not EntitlementService.can_access_unit(user, unit):
+                outcomes.append((key, item['unit_id'], 'forbidden'))
+                continue
             
-            attempt_answer.save()
+            answer_key = AnswerKeyCache.get(unit.pk)
+            graded = cls._grade_answers(item['answers'], answer_key)
+            correct_count = sum(answer.is_correct for answer in graded.values())
+            created[key] = Attempt(
+                user=user,
+                unit=unit,
+                client_key=key,
+                submitted_at=min(item.get('submitted_at') or now, now),
+                score_raw=correct_count,
+                score_pct=cls.score_pct(correct_count, len(answer_key)),
+                question_count=len(answer_key),
+            )
+            answers.extend((key, answer) for answer in graded.values())
+            outcomes.append((key, unit.pk, 'created'))
         
-        # Calculate score
-        attempt.score_raw = correct_count
-        attempt.score_pct = (correct_count / total_questions * 100) if total_questions > 0 else 0
-        attempt.submitted_at = timezone.now()
-        attempt.save()
+        if created:
+            try:
+                with transaction.atomic():
+                    Attempt.objects.bulk_create(created.values())
+                    if any(attempt.pk is None for attempt in created.values()):
+                        # Backends that do not return IDs from bulk inserts
+                        ids = dict(
+                            Attempt.objects.filter(user=user, client_key__in=created).values_list('client_key', 'id')
+                        )
+                        for key, attempt in created.items():
+                            attempt.pk = ids[key]
+                    # started_at is auto_now_add; the attempt started offline, not at sync time
+                    Attempt.objects.filter(pk__in=[attempt.pk for attempt in created.values()]).update(
+                        started_at=F('submitted_at')
+                    )
+                    for key, answer in answers:
+                        answer.attempt_id = created[key].pk
+                    AttemptAnswer.objects.bulk_create([answer for _, answer in answers], batch_size=1000)
+                    for unit_id in {attempt.unit_id for attempt in created.values()}:
+                        QuizSummaryService.rebuild(unit_id, user_ids=[user.pk])
+            except IntegrityError:
+                if not retry:
+                    raise
+                # A concurrent replay stored some keys first; they are duplicates now
+                return cls.sync_attempts(user, items, retry=False)
         
-        return attempt
+        results = []
+        for key, unit_id, status in outcomes:
+            result = {'client_key': key, 'unit': unit_id, 'status': status}
+            attempt = created.get(key) or stored.get(key)
+            if status in ('created', 'duplicate') and attempt is not None:
+                result.update({
+                    'attempt': attempt.pk,
+                    'score_raw': attempt.score_raw,
+                    'score_pct': str(attempt.score_pct),
+                    'is_passed': attempt.is_passed,
+                })
+            results.append(result)
+        return results
+    
+    @staticmethod
+    def _grade_answers(answers_data, answer_key):
+        """
+        Grade answers in memory against a compiled answer key.
+        
+        Unknown question IDs are skipped and the first answer to a question
+        wins.
+        
+        Returns:
+            Dict of question ID -> unsaved AttemptAnswer (without attempt)
+        """
+        answers = {}
+        for answer_data in answers_data:
+            question_id = answer_data['question_id']
+            if question_id not in answer_key or question_id in answers:
+                continue
+            
+            answer = AttemptAnswer(question_id=question_id, selected_choices=answer_data['choice_ids'])
+            answer.grade(answer_key[question_id])
+            answers[question_id] = answer
+        return answers
+    
+    @staticmethod
+    def score_pct(correct_count, total_questions):
+        """Percentage score as stored (two decimal places)."""
+        if not total_questions:
+            return Decimal('0.00')
+        return (Decimal(correct_count * 100) / total_questions).quantize(Decimal('0.01'))
+    
+    @staticmethod
+    def _result_question(unit, question_id, feedback, correct_choice_ids):
+        """Build an in-memory Question carrying what the result shows, from the compiled answer key."""
+        text, explanation = feedback
+        question = Question(id=question_id, unit=unit, text=text, explanation=explanation)
+        question.correct_choice_list = [
+            Choice(id=choice_id, question_id=question_id) for choice_id in sorted(correct_choice_ids)
+        ]
+        return question
     
     @staticmethod
     def get_user_attempts(user, unit=None):
@@ -99,9 +245,448 @@ class QuizGradingService:
         Returns:
             Attempt with highest score or None
         """
-        return Attempt.objects.filter(
+        best_attempt_id = UnitQuizSummary.objects.filter(
             user=user,
-            unit=unit,
-            submitted_at__isnull=False
-        ).order_by('-score_pct').first()
+            unit=unit
+        ).values_list('best_attempt_id', flat=True).first()
+        if best_attempt_id is None:
+            return None
+        return Attempt.objects.with_results().filter(pk=best_attempt_id).first()
+
+
+class QuizSummaryService:
+    """
+    Service for per user and unit attempt summaries (UnitQuizSummary).
+    
+    Submissions fold into the summary with one conditional UPDATE;
+    regrades and deletions rebuild the affected summaries from attempts.
+    """
+    
+    SUMMARY_FIELDS = [
+        'book', 'best_attempt', 'best_score_pct', 'last_score_pct', 'attempt_count',
+        'first_passed_at', 'last_attempt_at', 'updated_at',
+    ]
+    
+    @classmethod
+    def record(cls, attempt):
+        """
+        Fold a newly submitted attempt into its user's summary for the unit.
+        
+        Args:
+            attempt: Submitted Attempt (with unit loaded)
+        """
+        score_pct = Value(attempt.score_pct, output_field=DecimalField(max_digits=5, decimal_places=2))
+        passed_at = attempt.submitted_at if attempt.score_pct >= Attempt.PASS_PCT else None
+        
+        # best_attempt is set before best_score_pct: MySQL applies SET clauses in order
+        updated = UnitQuizSummary.objects.filter(user_id=attempt.user_id, unit_id=attempt.unit_id).update(
+            best_attempt=Case(
+                When(Q(best_score_pct__lt=attempt.score_pct) | Q(best_attempt__isnull=True), then=Value(attempt.pk)),
+                default=F('best_attempt'),
+                output_field=BigIntegerField(),
+            ),
+            best_score_pct=Greatest(F('best_score_pct'), score_pct),
+            last_score_pct=score_pct,
+            attempt_count=F('attempt_count') + 1,
+            first_passed_at=Coalesce(F('first_passed_at'), Value(passed_at, output_field=DateTimeField())),
+            last_attempt_at=attempt.submitted_at,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            return
+        
+        try:
+            with transaction.atomic():
+                UnitQuizSummary.objects.create(
+                    user_id=attempt.user_id,
+                    unit_id=attempt.unit_id,
+                    book_id=attempt.unit.book_id,
+                    best_attempt=attempt,
+                    best_score_pct=attempt.score_pct,
+                    last_score_pct=attempt.score_pct,
+                    attempt_count=1,
+                    first_passed_at=passed_at,
+                    last_attempt_at=attempt.submitted_at,
+                )
+        except IntegrityError:
+            # A concurrent first submission created the row
+            cls.record(attempt)
+    
+    @classmethod
+    def rebuild(cls, unit_id, user_ids=None, chunk_size=2000):
+        """
+        Recompute summaries of a unit from its submitted attempts.
+        
+        Args:
+            unit_id: Unit ID
+            user_ids: Limit to these users (optional)
+            chunk_size: Rows streamed and written per batch
+        
+        Returns:
+            Number of summaries written
+        """
+        from apps.catalog.models import Unit
+        
+        book_id = Unit.objects.filter(pk=unit_id).values_list('book_id', flat=True).first()
+        if book_id is None:
+            return 0
+        
+        attempts = Attempt.objects.filter(unit_id=unit_id, submitted_at__isnull=False)
+        existing = UnitQuizSummary.objects.filter(unit_id=unit_id)
+        if user_ids is not None:
+            user_ids = list(user_ids)
+            attempts = attempts.filter(user_id__in=user_ids)
+            existing = existing.filter(user_id__in=user_ids)
+        
+        summaries = {}
+        rows = attempts.order_by('submitted_at', 'id').values_list('id', 'user_id', 'score_pct', 'submitted_at')
+        for attempt_id, user_id, score_pct, submitted_at in rows.iterator(chunk_size=chunk_size):
+            summary = summaries.get(user_id)
+            if summary is None:
+                summary = summaries[user_id] = UnitQuizSummary(
+                    user_id=user_id, unit_id=unit_id, book_id=book_id,
+                    best_attempt_id=attempt_id, best_score_pct=score_pct,
+                )
+            if score_pct > summary.best_score_pct:
+                summary.best_attempt_id, summary.best_score_pct = attempt_id, score_pct
+            summary.attempt_count += 1
+            summary.last_score_pct = score_pct
+            summary.last_attempt_at = submitted_at
+            if summary.first_passed_at is None and score_pct >= Attempt.PASS_PCT:
+                summary.first_passed_at = submitted_at
+        
+        # Split into updates and inserts: MySQL has no conflict target for bulk_create()
+        existing = dict(existing.values_list('user_id', 'pk').iterator(chunk_size=chunk_size))
+        now = timezone.now()
+        updated, created = [], []
+        for user_id, summary in summaries.items():
+            summary.pk = existing.pop(user_id, None)
+            summary.updated_at = now
+            (updated if summary.pk else created).append(summary)
+        # Whatever is left belongs to users whose attempts are all gone
+        stale = list(existing.values())
+        
+        try:
+            with transaction.atomic():
+                UnitQuizSummary.objects.bulk_update(updated, cls.SUMMARY_FIELDS, batch_size=chunk_size)
+                UnitQuizSummary.objects.bulk_create(created, batch_size=chunk_size)
+                for start in range(0, len(stale), chunk_size):
+                    UnitQuizSummary.objects.filter(pk__in=stale[start:start + chunk_size]).delete()
+        except IntegrityError:
+            # A concurrent first submission created one of the rows
+            return cls.rebuild(unit_id, user_ids=user_ids, chunk_size=chunk_size)
+        return len(summaries)
+
+
+class QuizRegradeService:
+    """
+    Service for regrading past attempts after an answer-key correction.
+    
+    Answers are streamed per unit and compared with the compiled answer key
+    in memory; only rows whose grade or score moved are written back, with
+    chunked bulk_update().
+    """
+    
+    PENDING_KEY = 'quiz:regrade:pending:{unit_id}'
+    
+    @classmethod
+    def schedule(cls, unit_id):
+        """
+        Queue a regrade of a unit after the transaction commits.
+        
+        Editing several choices of a question queues one job: the job is
+        delayed by QUIZ_REGRADE_DELAY and further requests are dropped
+        until it starts.
+        
+        Args:
+            unit_id: ID of the unit whose answer key changed
+        """
+        from .tasks import regrade_unit_attempts
+        
+        pending_key = cls.PENDING_KEY.format(unit_id=unit_id)
+        
+        def queue():
+            # Marked only once committed, so a rolled-back edit blocks nothing
+            if not cache.add(pending_key, True, settings.QUIZ_REGRADE_DELAY + 600):
+                return
+            try:
+                regrade_unit_attempts.apply_async((unit_id,), countdown=settings.QUIZ_REGRADE_DELAY)
+            except Exception:
+                cache.delete(pending_key)
+                raise
+        
+        transaction.on_commit(queue)
+    
+    @classmethod
+    @transaction.atomic
+    def regrade_unit(cls, unit_id, attempt_ids=None, chunk_size=2000):
+        """
+        Regrade attempts of a unit against its current answer key.
+        
+        Scores are recomputed the way submit_quiz() computes them: correct
+        answers over the number of questions the unit had when the attempt
+        was graded, so questions added later never lower old scores.
+        Attempts from before that count was stored fall back to the unit's
+        current number of questions. All writes happen in one transaction,
+        so a failed run leaves grades untouched.
+        
+        Args:
+            unit_id: Unit ID
+            attempt_ids: Limit to these attempts (optional)
+            chunk_size: Rows streamed and written per batch
+        
+        Returns:
+            Dict with answers and scores changed and pass/fail outcomes flipped
+        """
+        if attempt_ids is None:
+            # Edits from now on need another run
+            cache.delete(cls.PENDING_KEY.format(unit_id=unit_id))
+        answer_key = AnswerKeyCache.get(unit_id)
+        total_questions = len(answer_key)
+        
+        attempts = Attempt.objects.filter(unit_id=unit_id)
+        if attempt_ids is not None:
+            attempts = attempts.filter(pk__in=list(attempt_ids))
+        
+        # Pass 1: regrade answers, counting correct ones per attempt
+        correct_counts = {}
+        changed_answers = []
+        answers_changed = 0
+        rows = AttemptAnswer.objects.filter(attempt__in=attempts).values_list(
+            'id', 'attempt_id', 'question_id', 'selected_choices', 'is_correct'
+        ).order_by('id')
+        for answer_id, attempt_id, question_id, selected, was_correct in rows.iterator(chunk_size=chunk_size):
+            is_correct = set(answer_key.get(question_id, ())) == set(selected)
+            if is_correct:
+                correct_counts[attempt_id] = correct_counts.get(attempt_id, 0) + 1
+            if is_correct != was_correct:
+                changed_answers.append(AttemptAnswer(id=answer_id, is_correct=is_correct))
+                if len(changed_answers) >= chunk_size:
+                    answers_changed += cls._flush(AttemptAnswer, changed_answers, ['is_correct'])
+        answers_changed += cls._flush(AttemptAnswer, changed_answers, ['is_correct'])
+        
+        # Pass 2: rescore attempts
+        changed_attempts = []
+        changed_users = set()
+        scores_changed = flipped = 0
+        rows = attempts.values_list('id', 'user_id', 'score_raw', 'score_pct', 'question_count').order_by('id')
+        for attempt_id, user_id, score_raw, score_pct, question_count in rows.iterator(chunk_size=chunk_size):
+            new_raw = correct_counts.get(attempt_id, 0)
+            new_pct = QuizGradingService.score_pct(
+                new_raw, total_questions if question_count is None else question_count
+            )
+            if (new_raw, new_pct) == (score_raw, score_pct):
+                continue
+            flipped += (score_pct >= Attempt.PASS_PCT) != (new_pct >= Attempt.PASS_PCT)
+            changed_users.add(user_id)
+            changed_attempts.append(Attempt(id=attempt_id, score_raw=new_raw, score_pct=new_pct))
+            if len(changed_attempts) >= chunk_size:
+                scores_changed += cls._flush(Attempt, changed_attempts, ['score_raw', 'score_pct'])
+        scores_changed += cls._flush(Attempt, changed_attempts, ['score_raw', 'score_pct'])
+        
+        if changed_users:
+            # Rebuilding the whole unit beats a huge IN list
+            QuizSummaryService.rebuild(unit_id, user_ids=changed_users if len(changed_users) <= chunk_size else None)
+        if answers_changed:
+            # Item statistics were computed from the old grades
+            ItemAnalysisService.mark_stale(unit_id)
+        
+        return {
+            'answers_changed': answers_changed,
+            'scores_changed': scores_changed,
+            'outcomes_flipped': flipped,
+        }
+    
+    @staticmethod
+    def _flush(model, objects, fields):
+        """bulk_update() buffered objects, empty the buffer and return how many were written."""
+        count = len(objects)
+        if count:
+            model.objects.bulk_update(objects, fields)
+            objects.clear()
+        return count
 
+
+class QuestionSetService:
+    """Service for delivering a unit's question set to learners."""
+    
+    @classmethod
+    def get(cls, unit_id, seed=None):
+        """
+        Get the answer-free question set of a unit.
+        
+        Args:
+            unit_id: Unit ID
+            seed: Shuffle seed from attempt_seed() (optional)
+        
+        Returns:
+            List of question dicts; shuffled when a seed is given
+        """
+        questions = AnswerKeyCache.get_questions(unit_id)
+        if seed is None:
+            return questions
+        return cls.shuffle(questions, seed)
+    
+    @staticmethod
+    def attempt_seed(user, unit_id, attempt=None):
+        """
+        Derive the shuffle seed of one attempt.
+        
+        The same user, unit and attempt number always give the same order,
+        so a reload mid-quiz does not reshuffle.
+        
+        Args:
+            user: User taking the quiz
+            unit_id: Unit ID
+            attempt: Attempt number (default: the user's next attempt)
+        
+        Returns:
+            Seed string
+        """
+        if attempt is None:
+            attempt = Attempt.objects.filter(user=user, unit_id=unit_id).count() + 1
+        return hashlib.sha256(f'{user.pk}:{unit_id}:{attempt}'.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def shuffle(questions, seed):
+        """
+        Shuffle question and choice order without touching the cached structure.
+        
+        IDs are unchanged, so answers are graded exactly as in order;
+        ``order`` is renumbered so clients sorting by it keep the shuffle.
+        """
+        rng = random.Random(seed)
+        shuffled = []
+        for question in questions:
+            choices = list(question['choices'])
+            rng.shuffle(choices)
+            choices = [{**choice, 'order': order} for order, choice in enumerate(choices, 1)]
+            shuffled.append({**question, 'choices': choices})
+        rng.shuffle(shuffled)
+        return [{**question, 'order': order} for order, question in enumerate(shuffled, 1)]
+
+
+class ItemAnalysisService:
+    """
+    Service for item-analysis statistics of quiz questions.
+    
+    A unit's submitted attempts are streamed into a NumPy response matrix
+    (attempts x questions) and analysed in one vectorized pass, instead of
+    per-question ORM aggregates. Units are refreshed only when they have
+    attempts newer than their last analysis or were marked stale.
+    """
+    
+    @classmethod
+    def refresh(cls, unit_ids=None, force=False, chunk_size=5000):
+        """
+        Analyse units with attempts submitted since their last analysis.
+        
+        Args:
+            unit_ids: Limit to these units (optional)
+            force: Analyse even units that are up to date
+            chunk_size: Rows streamed per database round trip
+        
+        Returns:
+            Number of units analysed
+        """
+        latest = Attempt.objects.filter(submitted_at__isnull=False)
+        if unit_ids is not None:
+            latest = latest.filter(unit_id__in=list(unit_ids))
+        latest = dict(
+            latest.order_by().values('unit_id').annotate(last=Max('id')).values_list('unit_id', 'last')
+        )
+        if not force:
+            analysed = dict(
+                UnitQuizStats.objects.filter(unit_id__in=latest).values_list('unit_id', 'last_attempt_id')
+            )
+            latest = {unit_id: last for unit_id, last in latest.items() if analysed.get(unit_id) != last}
+        
+        for unit_id in latest:
+            cls.analyze_unit(unit_id, chunk_size=chunk_size)
+        return len(latest)
+    
+    @staticmethod
+    def mark_stale(unit_id):
+        """Make the next refresh re-analyse a unit."""
+        UnitQuizStats.objects.filter(unit_id=unit_id).update(last_attempt_id=0)
+    
+    @staticmethod
+    def analyze_unit(unit_id, chunk_size=5000):
+        """
+        Compute and store item statistics of one unit.
+        
+        Every submitted attempt is one row; unanswered questions count as
+        wrong, as they do in the score.
+        
+        Args:
+            unit_id: Unit ID
+            chunk_size: Rows streamed per database round trip
+        
+        Returns:
+            UnitQuizStats instance
+        """
+        columns = {question_id: column for column, question_id in enumerate(sorted(AnswerKeyCache.get(unit_id)))}
+        choice_columns = dict(
+            Choice.objects.filter(question__unit_id=unit_id).values_list('id', 'question_id')
+        )
+        
+        attempt_rows = {}
+        attempt_ids = Attempt.objects.filter(unit_id=unit_id, submitted_at__isnull=False).order_by('id')
+        for attempt_id in attempt_ids.values_list('id', flat=True).iterator(chunk_size=chunk_size):
+            attempt_rows[attempt_id] = len(attempt_rows)
+        last_attempt_id = max(attempt_rows, default=0)
+        
+        # Flat typed buffers: correct (row, column) cells and selected (column, choice) pairs
+        correct_rows, correct_columns = array('q'), array('q')
+        selected_columns, selected_choices = array('q'), array('q')
+        answers = AttemptAnswer.objects.filter(
+            attempt__unit_id=unit_id,
+            attempt__submitted_at__isnull=False,
+            attempt_id__lte=last_attempt_id,
+        ).order_by().values_list('attempt_id', 'question_id', 'is_correct', 'selected_choices')
+        for attempt_id, question_id, is_correct, selected in answers.iterator(chunk_size=chunk_size):
+            column = columns.get(question_id)
+            # Attempts committed after the snapshot above can still have lower IDs
+            row = attempt_rows.get(attempt_id)
+            if column is None or row is None:
+                continue
+            if is_correct:
+                correct_rows.append(row)
+                correct_columns.append(column)
+            for choice_id in selected:
+                if choice_columns.get(choice_id) == question_id:
+                    selected_columns.append(column)
+                    selected_choices.append(choice_id)
+        
+        scores = np.zeros((len(attempt_rows), len(columns)), dtype=np.int8)
+        scores[np.frombuffer(correct_rows, dtype=np.int64), np.frombuffer(correct_columns, dtype=np.int64)] = 1
+        p_values, discrimination, kr20 = item_statistics(scores)
+        counts = choice_counts(
+            np.frombuffer(selected_columns, dtype=np.int64), np.frombuffer(selected_choices, dtype=np.int64)
+        )
+        
+        def rounded(value):
+            return None if np.isnan(value) else round(float(value), 4)
+        
+        # Replaced rather than upserted: MySQL has no conflict target for bulk_create()
+        with transaction.atomic():
+            QuestionStats.objects.filter(question_id__in=list(columns)).delete()
+            QuestionStats.objects.bulk_create([
+                QuestionStats(
+                    question_id=question_id,
+                    responses=len(attempt_rows),
+                    p_value=rounded(p_values[column]),
+                    discrimination=rounded(discrimination[column]),
+                    choice_counts={str(choice_id): total for choice_id, total in counts.get(column, {}).items()},
+                )
+                for question_id, column in columns.items()
+            ])
+            stats, _ = UnitQuizStats.objects.update_or_create(
+                unit_id=unit_id,
+                defaults={
+                    'attempts': len(attempt_rows),
+                    'kr20': None if kr20 is None else round(kr20, 4),
+                    'last_attempt_id': last_attempt_id,
+                },
+            )
+        return stats
@@ -0,0 +1,102 @@
+"""
+Signals for quiz app.
+"""
+from django.db.models import F, QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.catalog.models import Unit
+from apps.catalog.services import CatalogCounterService
+from .cache import AnswerKeyCache
+from .models import Question, Choice, Attempt, UnitQuizSummary
+from .services import QuizRegradeService, QuizSummaryService
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_unit(sender, instance, **kwargs):
+    """Remember the stored unit so a move between units can be detected."""
+    if instance.pk:
+        instance._previous_unit_id = (
+            Question.objects.filter(pk=instance.pk).values_list('unit_id', flat=True).first()
+        )
+
+
+def unit_book_id(unit_id):
+    """Return the book of a unit (None if the unit is gone)."""
+    return Unit.objects.filter(pk=unit_id).values_list('book_id', flat=True).first()
+
+
+@receiver(post_save, sender=Question)
+def increment_question_count(sender, instance, created, **kwargs):
+    """Keep Unit.question_count and Book.units_with_quiz current when questions are added or moved."""
+    if created:
+        # The conditional update detects the unit's first question atomically
+        if Unit.objects.filter(pk=instance.unit_id, question_count=0).update(question_count=1):
+            CatalogCounterService.adjust_book(unit_book_id(instance.unit_id), units_with_quiz=1)
+        else:
+            Unit.objects.filter(pk=instance.unit_id).update(question_count=F('question_count') + 1)
+        return
+    
+    previous_unit_id = getattr(instance, '_previous_unit_id', None)
+    if previous_unit_id and previous_unit_id != instance.unit_id:
+        CatalogCounterService.recount_question_counts([previous_unit_id, instance.unit_id])
+
+
+@receiver(post_delete, sender=Question)
+def decrement_question_count(sender, instance, **kwargs):
+    """Keep Unit.question_count and Book.units_with_quiz current when questions are removed."""
+    if Unit.objects.filter(pk=instance.unit_id, question_count=1).update(question_count=0):
+        CatalogCounterService.adjust_book(unit_book_id(instance.unit_id), units_with_quiz=-1)
+    else:
+        Unit.objects.filter(pk=instance.unit_id, question_count__gt=1).update(
+            question_count=F('question_count') - 1
+        )
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question_answer_key(sender, instance, **kwargs):
+    """Recompile the answer key of a unit whose questions changed."""
+    AnswerKeyCache.bump(instance.unit_id, getattr(instance, '_previous_unit_id', None))
+
+
+@receiver(pre_save, sender=Choice)
+def remember_choice_correctness(sender, instance, **kwargs):
+    """Remember the stored is_correct so answer-key changes can be detected."""
+    if instance.pk:
+        instance._previous_is_correct = (
+            Choice.objects.filter(pk=instance.pk).values_list('is_correct', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def invalidate_choice_answer_key(sender, instance, created=False, **kwargs):
+    """Recompile the answer key of a unit whose choices changed and regrade its attempts."""
+    unit_id = Question.objects.filter(pk=instance.question_id).values_list('unit_id', flat=True).first()
+    AnswerKeyCache.bump(unit_id)
+    
+    # Adding or removing a correct choice changes the key as much as a flipped flag
+    if created or kwargs['signal'] is post_delete:
+        key_changed = instance.is_correct
+    else:
+        key_changed = getattr(instance, '_previous_is_correct', instance.is_correct) != instance.is_correct
+    if unit_id and key_changed and Attempt.objects.filter(unit_id=unit_id).exists():
+        QuizRegradeService.schedule(unit_id)
+
+
+@receiver(post_delete, sender=Attempt)
+def rebuild_quiz_summary(sender, instance, origin=None, **kwargs):
+    """Rebuild the user's unit summary when attempts are deleted directly."""
+    # Cascades from a user or unit delete remove the summary as well
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is Attempt:
+        QuizSummaryService.rebuild(instance.unit_id, user_ids=[instance.user_id])
+
+
+@receiver(post_save, sender=Unit)
+def move_quiz_summaries(sender, instance, created, **kwargs):
+    """Keep UnitQuizSummary.book current when a unit moves to another book."""
+    previous = getattr(instance, '_previous_counters', None)
+    if not created and previous and previous[0] != instance.book_id:
+        UnitQuizSummary.objects.filter(unit_id=instance.pk).update(book_id=instance.book_id)
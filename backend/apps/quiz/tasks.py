@@ -0,0 +1,29 @@
+"""
+Celery tasks for quiz app.
+"""
+from celery import shared_task
+
+
+@shared_task
+def regrade_unit_attempts(unit_id):
+    """
+    Regrade past attempts of a unit after its answer key changed.
+    
+    Args:
+        unit_id: Unit ID
+    """
+    from .services import QuizRegradeService
+    
+    result = QuizRegradeService.regrade_unit(unit_id)
+    return (
+        f"Unit {unit_id}: {result['answers_changed']} answers and {result['scores_changed']} scores changed, "
+        f"{result['outcomes_flipped']} pass/fail outcomes flipped"
+    )
+
+
+@shared_task
+def refresh_item_analysis():
+    """Refresh item statistics of units with new or regraded attempts."""
+    from .services import ItemAnalysisService
+    
+    return f'Analysed {ItemAnalysisService.refresh()} units'
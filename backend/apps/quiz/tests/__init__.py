@@ -0,0 +1 @@
+# Quiz tests
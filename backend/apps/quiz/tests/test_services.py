@@ -0,0 +1,273 @@
+"""
+Test cases for quiz grading services
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from apps.catalog.models import Book, Unit
+from apps.common.enums import QuestionType
+from apps.quiz.cache import AnswerKeyCache
+from apps.quiz.models import Question, Choice, Attempt, AttemptAnswer, QuestionStats, UnitQuizStats, UnitQuizSummary
+from apps.quiz import tasks
+from apps.quiz.analysis import item_statistics
+from apps.quiz.services import QuizGradingService, QuizRegradeService, ItemAnalysisService
+from apps.users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def no_conflict_target(monkeypatch):
+    """Upsert like MySQL, which cannot name the conflicting columns."""
+    monkeypatch.setattr(connection.features, 'supports_update_conflicts_with_target', False)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='student@example.com', password='testpass123')
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', order=1, is_free=True)
+    for order in range(1, 41):
+        question = Question.objects.create(
+            unit=unit,
+            type=QuestionType.MULTI if order % 2 else QuestionType.SINGLE,
+            text=f'Q{order}',
+            order=order,
+        )
+        for position in range(1, 4):
+            Choice.objects.create(
+                question=question, text=f'C{position}', is_correct=position <= 1 + order % 2, order=position
+            )
+    return unit
+
+
+def correct_answers(unit):
+    """Build a fully correct submission from the database."""
+    return [
+        {
+            'question_id': question.pk,
+            'choice_ids': [choice.pk for choice in question.choices.all() if choice.is_correct],
+        }
+        for question in unit.questions.prefetch_related('choices')
+    ]
+
+
+@pytest.mark.django_db
+class TestQuizGrading:
+    """Test in-memory grading against compiled answer keys"""
+
+    def test_submission_uses_fixed_queries(self, user, unit, django_assert_max_num_queries):
+        """Test a 40-question submission is graded and stored in a few queries"""
+        answers = correct_answers(unit)
+        answers[0]['choice_ids'] = answers[0]['choice_ids'][:1]
+        # Warms the answer key and creates the user's unit summary
+        QuizGradingService.submit_quiz(user, unit, answers)
+
+        # Attempt insert, answer bulk insert and summary update, plus the savepoint
+        with django_assert_max_num_queries(5):
+            attempt = QuizGradingService.submit_quiz(user, unit, answers)
+
+        assert (attempt.score_raw, float(attempt.score_pct)) == (39, 97.5)
+        assert AttemptAnswer.objects.filter(attempt=attempt, is_correct=True).count() == 39
+
+    def test_invalid_and_repeated_answers_are_skipped(self, user, unit):
+        """Test unknown questions are ignored and only the first answer counts"""
+        first = correct_answers(unit)[0]
+        answers = [
+            {'question_id': -1, 'choice_ids': [1]},
+            first,
+            {'question_id': first['question_id'], 'choice_ids': [0]},
+        ]
+
+        attempt = QuizGradingService.submit_quiz(user, unit, answers)
+
+        assert attempt.answers.count() == 1
+        assert attempt.score_raw == 1
+
+    def test_choice_edit_invalidates_answer_key(self, unit):
+        """Test saving a choice recompiles the unit's answer key"""
+        question = unit.questions.get(order=2)
+        before = AnswerKeyCache.get(unit.pk)[question.pk]
+
+        choice = question.choices.get(order=3)
+        choice.is_correct = True
+        choice.save()
+
+        assert AnswerKeyCache.get(unit.pk)[question.pk] == before | {choice.pk}
+
+    def test_answer_key_is_invalidated_again_on_commit(self, unit, django_capture_on_commit_callbacks):
+        """Test a key compiled before the edit committed is not served afterwards"""
+        question = unit.questions.get(order=2)
+        stale = AnswerKeyCache.compile(unit.pk)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            choice = question.choices.get(order=3)
+            choice.is_correct = True
+            choice.save()
+            # A concurrent reader still sees the committed key and caches it
+            version = AnswerKeyCache.get_version(unit.pk)
+            cache.set(AnswerKeyCache.KEY.format(unit_id=unit.pk, version=version), stale)
+
+        assert choice.pk in AnswerKeyCache.get(unit.pk)[question.pk]
+
+
+@pytest.mark.django_db
+class TestQuizRegrade:
+    """Test bulk regrading after answer-key corrections"""
+
+    @pytest.fixture
+    def queued(self, monkeypatch):
+        queued = []
+        monkeypatch.setattr(tasks.regrade_unit_attempts, 'apply_async', lambda args, **kwargs: queued.append(args))
+        return queued
+
+    def test_key_correction_regrades_past_attempts(self, user, unit, queued, django_capture_on_commit_callbacks):
+        """Test fixing a wrong flag queues one regrade that rescores attempts"""
+        question = unit.questions.get(order=2)
+        wrong = question.choices.get(order=3)
+        answers = correct_answers(unit)
+        answers[1]['choice_ids'] = [wrong.pk]
+        attempt = QuizGradingService.submit_quiz(user, unit, answers)
+        assert (attempt.score_raw, attempt.is_passed) == (39, True)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            for choice in question.choices.all():
+                choice.is_correct = choice == wrong
+                choice.save()
+
+        assert queued == [(unit.pk,)]
+        result = QuizRegradeService.regrade_unit(unit.pk, chunk_size=7)
+
+        attempt.refresh_from_db()
+        assert (attempt.score_raw, float(attempt.score_pct)) == (40, 100.0)
+        assert result == {'answers_changed': 1, 'scores_changed': 1, 'outcomes_flipped': 0}
+
+    def test_regrade_reports_flipped_outcomes(self, user, unit, queued):
+        """Test attempts crossing the pass mark are counted"""
+        attempt = QuizGradingService.submit_quiz(user, unit, correct_answers(unit)[:28])
+        assert float(attempt.score_pct) == 70.0
+
+        Choice.objects.filter(question__unit=unit, question__order=1).update(is_correct=False)
+        AnswerKeyCache.bump(unit.pk)
+
+        assert QuizRegradeService.regrade_unit(unit.pk)['outcomes_flipped'] == 1
+        attempt.refresh_from_db()
+        assert not attempt.is_passed
+
+    def test_regrade_keeps_original_denominator(self, user, unit, queued):
+        """Test questions added after an attempt do not lower its score"""
+        attempt = QuizGradingService.submit_quiz(user, unit, correct_answers(unit)[:28])
+        question = Question.objects.create(unit=unit, text='Q41', order=41)
+        Choice.objects.create(question=question, text='C1', is_correct=True, order=1)
+
+        result = QuizRegradeService.regrade_unit(unit.pk)
+
+        attempt.refresh_from_db()
+        assert (attempt.question_count, float(attempt.score_pct)) == (40, 70.0)
+        assert result == {'answers_changed': 0, 'scores_changed': 0, 'outcomes_flipped': 0}
+
+    def test_rolled_back_edit_does_not_block_regrades(self, unit, queued, django_capture_on_commit_callbacks):
+        """Test the pending marker is only set once the edit commits"""
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(ValueError):
+                with transaction.atomic():
+                    QuizRegradeService.schedule(unit.pk)
+                    raise ValueError
+            QuizRegradeService.schedule(unit.pk)
+
+        assert queued == [(unit.pk,)]
+
+
+class TestItemStatistics:
+    """Test the vectorized item statistics"""
+
+    def test_known_matrix(self):
+        """Test p-values, discrimination signs and KR-20 on a small matrix"""
+        scores = [
+            [1, 1, 1, 0],
+            [1, 1, 0, 0],
+            [1, 0, 0, 1],
+            [0, 0, 0, 1],
+        ]
+
+        p_values, discrimination, kr20 = item_statistics(scores)
+
+        assert list(p_values) == [0.75, 0.5, 0.25, 0.5]
+        assert discrimination[0] > 0 and discrimination[2] > 0
+        assert discrimination[3] < 0
+        # k/(k-1) * (1 - sum(pq) / var(total)) with var(total) = 0.5
+        assert kr20 == pytest.approx(4 / 3 * (1 - 0.875 / 0.5))
+
+
+@pytest.mark.django_db
+class TestItemAnalysis:
+    """Test incremental item-analysis refreshes"""
+
+    def test_refresh_stores_stats_incrementally(self, unit, no_conflict_target):
+        """Test only units with new or regraded attempts are analysed"""
+        answers = correct_answers(unit)
+        for index in range(4):
+            learner = User.objects.create_user(email=f'learner{index}@example.com', password='testpass123')
+            QuizGradingService.submit_quiz(learner, unit, answers[:10 * (index + 1)])
+
+        assert ItemAnalysisService.refresh() == 1
+        assert ItemAnalysisService.refresh() == 0
+
+        first = QuestionStats.objects.get(question_id=answers[0]['question_id'])
+        last = QuestionStats.objects.get(question_id=answers[-1]['question_id'])
+        assert (first.responses, first.p_value, last.p_value) == (4, 1.0, 0.25)
+        assert first.discrimination is None and last.discrimination > 0
+        assert first.choice_counts == {str(answers[0]['choice_ids'][0]): 4, str(answers[0]['choice_ids'][1]): 4}
+        assert UnitQuizStats.objects.get(unit=unit).kr20 > 0.9
+
+        Choice.objects.filter(question_id=answers[-1]['question_id']).update(is_correct=False)
+        AnswerKeyCache.bump(unit.pk)
+        QuizRegradeService.regrade_unit(unit.pk)
+        assert ItemAnalysisService.refresh() == 1
+        assert QuestionStats.objects.get(question_id=answers[-1]['question_id']).p_value == 0
+
+
+@pytest.mark.django_db
+class TestQuizSummary:
+    """Test the per user and unit attempt summary"""
+
+    def test_submissions_fold_into_summary(self, user, unit, no_conflict_target):
+        """Test best, last, count and first pass follow submissions"""
+        answers = correct_answers(unit)
+        failed = QuizGradingService.submit_quiz(user, unit, answers[:20])
+        passed = QuizGradingService.submit_quiz(user, unit, answers[:30])
+        QuizGradingService.submit_quiz(user, unit, answers[:10])
+
+        summary = UnitQuizSummary.objects.get(user=user, unit=unit)
+        assert (summary.attempt_count, float(summary.best_score_pct), float(summary.last_score_pct)) == (3, 75, 25)
+        assert summary.best_attempt_id == passed.pk
+        assert summary.first_passed_at == passed.submitted_at
+        assert summary.book_id == unit.book_id
+        assert QuizGradingService.get_best_attempt(user, unit).pk == passed.pk
+
+        Attempt.objects.get(pk=passed.pk).delete()
+        summary.refresh_from_db()
+        assert (summary.attempt_count, summary.best_attempt_id, summary.first_passed_at) == (2, failed.pk, None)
+
+    def test_regrade_rebuilds_summary(self, user, unit, no_conflict_target, monkeypatch):
+        """Test a regrade that changes scores refreshes the summary"""
+        monkeypatch.setattr(tasks.regrade_unit_attempts, 'apply_async', lambda *args, **kwargs: None)
+        answers = correct_answers(unit)
+        QuizGradingService.submit_quiz(user, unit, answers[:29])
+
+        Choice.objects.filter(question__unit=unit, question__order=1).update(is_correct=False)
+        AnswerKeyCache.bump(unit.pk)
+        QuizRegradeService.regrade_unit(unit.pk)
+
+        summary = UnitQuizSummary.objects.get(user=user, unit=unit)
+        assert (float(summary.best_score_pct), summary.is_passed) == (70, True)
@@ -0,0 +1,186 @@
+"""
+Test cases for quiz API views
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.catalog.models import Book, Unit
+from apps.quiz.models import Question, Choice, Attempt, AttemptAnswer, UnitQuizSummary
+from apps.users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    client.force_authenticate(User.objects.create_user(email='student@example.com', password='testpass123'))
+    return client
+
+
+@pytest.fixture
+def unit():
+    book = Book.objects.create(title='Listening Basics', price=0, is_published=True)
+    unit = Unit.objects.create(book=book, title='Unit 1', order=1, is_free=True)
+    for order in range(1, 21):
+        question = Question.objects.create(unit=unit, text=f'Q{order}', explanation=f'Because {order}', order=order)
+        Choice.objects.create(question=question, text='Right', is_correct=True, order=1)
+        Choice.objects.create(question=question, text='Wrong', order=2)
+    return unit
+
+
+def submission(unit):
+    """Answer every question of a unit with its first (correct) choice."""
+    return {
+        'answers': [
+            {'question_id': question.pk, 'choice_ids': [question.choices.get(order=1).pk]}
+            for question in unit.questions.all()
+        ]
+    }
+
+
+@pytest.mark.django_db
+class TestAttemptResults:
+    """Test graded results are serialized without per-answer queries"""
+
+    def test_submit_returns_in_memory_results(self, client, unit, django_assert_max_num_queries):
+        """Test the submit response comes from the grading state"""
+        data = submission(unit)
+        # Warms the answer key and creates the user's unit summary
+        client.post(f'/api/quiz/units/{unit.pk}/submit/', data, format='json')
+
+        # Unit lookup, savepoint, attempt insert, answers insert, summary update, release
+        with django_assert_max_num_queries(6):
+            response = client.post(f'/api/quiz/units/{unit.pk}/submit/', data, format='json')
+
+        assert response.status_code == 201
+        assert response.data['score_raw'] == 20
+        first = response.data['answers'][0]
+        assert first['explanation'] == 'Because 1'
+        assert first['correct_choice_ids'] == first['selected_choices']
+
+    def test_retrieve_prefetches_correct_choices(self, client, unit, django_assert_max_num_queries):
+        """Test the attempt detail loads correct choices in one prefetch"""
+        attempt_id = client.post(f'/api/quiz/units/{unit.pk}/submit/', submission(unit), format='json').data['id']
+
+        # Attempt with unit, answers with questions, correct choices
+        with django_assert_max_num_queries(3):
+            response = client.get(f'/api/quiz/attempts/{attempt_id}/')
+
+        assert response.status_code == 200
+        assert len(response.data['answers']) == 20
+        assert all(answer['correct_choice_ids'] == answer['selected_choices'] for answer in response.data['answers'])
+        assert response.data['answers'][-1]['question_text'] == 'Q20'
+
+
+@pytest.mark.django_db
+class TestQuestionSet:
+    """Test cached, optionally shuffled question delivery"""
+
+    def test_question_set_is_cached_until_edited(self, client, unit, django_assert_max_num_queries):
+        """Test reopening a quiz serves the cached set and edits show up"""
+        url = f'/api/quiz/units/{unit.pk}/questions/'
+        client.get(url)
+
+        # Unit lookups for the validators and the handler only
+        with django_assert_max_num_queries(2):
+            response = client.get(url)
+        assert [question['order'] for question in response.data] == list(range(1, 21))
+        assert 'is_correct' not in response.data[0]['choices'][0]
+
+        question = unit.questions.get(order=1)
+        question.text = 'Edited'
+        question.save()
+        assert client.get(url).data[0]['text'] == 'Edited'
+
+    def test_shuffle_is_stable_per_attempt(self, client, unit):
+        """Test the same attempt gets the same order and a new attempt a new one"""
+        url = f'/api/quiz/units/{unit.pk}/questions/?shuffle=true'
+
+        first = client.get(url)
+        again = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert again.status_code == 304
+
+        client.post(f'/api/quiz/units/{unit.pk}/submit/', submission(unit), format='json')
+        second = client.get(url)
+
+        ids = [question['id'] for question in first.data]
+        assert sorted(ids) == sorted(question.pk for question in unit.questions.all())
+        assert ids != [question['id'] for question in second.data]
+        assert [question['order'] for question in first.data] == list(range(1, len(ids) + 1))
+        assert all(
+            [choice['order'] for choice in question['choices']] == list(range(1, len(question['choices']) + 1))
+            for question in first.data
+        )
+        assert client.get(f'{url}&attempt=1').data == first.data
+
+
+@pytest.mark.django_db
+class TestQuizOverview:
+    """Test summary-backed best attempt and book overview"""
+
+    def test_best_attempt_and_book_overview(self, client, unit, django_assert_max_num_queries):
+        """Test both endpoints read the per-unit summary"""
+        answers = submission(unit)['answers']
+        best = client.post(f'/api/quiz/units/{unit.pk}/submit/', {'answers': answers}, format='json').data
+        client.post(f'/api/quiz/units/{unit.pk}/submit/', {'answers': answers[:5]}, format='json')
+
+        response = client.get(f'/api/quiz/attempts/units/{unit.pk}/best/')
+        assert response.data['id'] == best['id']
+
+        with django_assert_max_num_queries(2):
+            response = client.get(f'/api/quiz/attempts/books/{unit.book.slug}/overview/')
+
+        assert response.status_code == 200
+        assert (response.data['units_with_quiz'], response.data['passed_units']) == (1, 1)
+        summary = response.data['units'][0]
+        assert (summary['best_score_pct'], summary['last_score_pct']) == ('100.00', '25.00')
+        assert summary['attempt_count'] == 2
+        assert summary['best_attempt'] == best['id']
+
+
+@pytest.mark.django_db
+class TestQuizSync:
+    """Test batched offline attempt sync"""
+
+    def test_sync_creates_once_and_reports_each_item(self, client, unit, monkeypatch, django_assert_max_num_queries):
+        """Test a batch is stored in bulk and a replay is a no-op"""
+        # Upsert like MySQL, which cannot name the conflicting columns
+        monkeypatch.setattr(connection.features, 'supports_update_conflicts_with_target', False)
+        paid = Unit.objects.create(book=unit.book, title='Unit 2', order=2)
+        answers = submission(unit)['answers']
+        payload = {'attempts': [
+            {'client_key': 'a1', 'unit_id': unit.pk, 'answers': answers},
+            {'client_key': 'a2', 'unit_id': unit.pk, 'answers': answers[:10], 'submitted_at': '2024-01-20T14:30:00Z'},
+            {'client_key': 'a1', 'unit_id': unit.pk, 'answers': answers[:1]},
+            {'client_key': 'b1', 'unit_id': paid.pk, 'answers': answers},
+            {'client_key': 'c1', 'unit_id': 999999, 'answers': answers},
+        ]}
+
+        # Lookups, answer key, entitlements, two bulk inserts, started_at and one summary rebuild
+        with django_assert_max_num_queries(15):
+            response = client.post('/api/quiz/sync/', payload, format='json')
+
+        assert response.status_code == 200
+        results = response.data['results']
+        assert [result['status'] for result in results] == ['created', 'created', 'duplicate', 'forbidden', 'not_found']
+        assert (results[0]['score_pct'], results[1]['score_pct']) == ('100.00', '50.00')
+        assert results[2]['attempt'] == results[0]['attempt']
+        assert AttemptAnswer.objects.count() == 30
+        offline = Attempt.objects.get(pk=results[1]['attempt'])
+        assert offline.started_at == offline.submitted_at
+        assert offline.submitted_at.isoformat() == '2024-01-20T14:30:00+00:00'
+        summary = UnitQuizSummary.objects.get(unit=unit)
+        assert (summary.attempt_count, summary.best_attempt_id) == (2, results[0]['attempt'])
+
+        replay = client.post('/api/quiz/sync/', payload, format='json').data['results']
+        assert [result['status'] for result in replay[:3]] == ['duplicate'] * 3
+        assert [result['attempt'] for result in replay[:2]] == [results[0]['attempt'], results[1]['attempt']]
+        assert Attempt.objects.count() == 2
@@ -3,49 +3,80 @@ Views for quiz app.
 """
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
-from apps.catalog.models import Unit
-from apps.users.models import Enrollment
+from apps.catalog.models import Book, Unit
+from apps.common.mixins import ConditionalGetMixin
+from apps.common.pagination import KeysetPagination
+from apps.users.services import EntitlementService
 from apps.common.exceptions import NoAccessException
-from .models import Question, Attempt
+from .cache import AnswerKeyCache
+from .models import Attempt, UnitQuizSummary
 from .serializers import (
-    QuestionSerializer, QuizSubmitSerializer,
-    AttemptSerializer, AttemptListSerializer
+    QuestionSetQuerySerializer, QuizSubmitSerializer, QuizSyncSerializer,
+    AttemptSerializer, AttemptListSerializer, UnitQuizSummarySerializer
 )
-from .services import QuizGradingService
+from .services import QuizGradingService, QuestionSetService
 
 
-class QuizViewSet(viewsets.ViewSet):
+class QuizViewSet(ConditionalGetMixin, viewsets.ViewSet):
     """ViewSet for quiz operations."""
     
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_conditional_validators(self, request, *args, **kwargs):
+        """Validate question sets against the unit's question version and shuffle seed."""
+        unit_id = str(kwargs.get('unit_id', ''))
+        if self.action != 'unit_questions' or not unit_id.isdigit():
+            return None, None
+        
+        unit = Unit.objects.filter(pk=unit_id).only('id', 'book_id', 'is_free').first()
+        if unit is None or not EntitlementService.can_access_unit(request.user, unit):
+            # Let the handler answer with 404/403
+            return None, None
+        
+        try:
+            seed = self._question_seed(request, unit.pk)
+        except ValidationError:
+            # Let the handler answer with 400
+            return None, None
+        
+        return self.build_etag('questions', unit.pk, AnswerKeyCache.get_version(unit.pk), seed), None
+    
+    def _question_seed(self, request, unit_id):
+        """Return the shuffle seed requested by the query string (None for question order)."""
+        if not hasattr(self, '_seed'):
+            params = QuestionSetQuerySerializer(data=request.query_params)
+            params.is_valid(raise_exception=True)
+            params = params.validated_data
+            self._seed = None
+            if params['shuffle']:
+                self._seed = QuestionSetService.attempt_seed(request.user, unit_id, params.get('attempt'))
+        return self._seed
+
     @action(detail=False, methods=['get'], url_path='units/(?P<unit_id>[^/.]+)/questions')
     def unit_questions(self, request, unit_id=None):
         """
         Get questions for a unit.
         Does NOT expose correct answers.
+        
+        Query params:
+            shuffle: Shuffle question and choice order (default false)
+            attempt: Attempt number the order is derived from
+                (default: the user's next attempt)
         """
         unit = get_object_or_404(Unit, id=unit_id)
         
         # Check access
-        if not unit.is_free:
-            has_access = Enrollment.objects.filter(
-                user=request.user,
-                book=unit.book,
-                is_active=True
-            ).exists()
-            
-            if not has_access and not request.user.is_staff:
-                raise NoAccessException()
-        
-        # Get questions (without correct answers)
-        questions = Question.objects.filter(unit=unit).prefetch_related('choices')
-        serializer = QuestionSerializer(questions, many=True)
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
         
-        return Response(serializer.data)
+        # Cached per unit and question version (without correct answers)
+        questions = QuestionSetService.get(unit.pk, seed=self._question_seed(request, unit.pk))
+        
+        return Response(questions)
 
     @action(detail=False, methods=['post'], url_path='units/(?P<unit_id>[^/.]+)/submit')
     def submit_quiz(self, request, unit_id=None):
@@ -65,15 +96,8 @@ class QuizViewSet(viewsets.ViewSet):
         unit = get_object_or_404(Unit, id=unit_id)
         
         # Check access
-        if not unit.is_free:
-            has_access = Enrollment.objects.filter(
-                user=request.user,
-                book=unit.book,
-                is_active=True
-            ).exists()
-            
-            if not has_access and not request.user.is_staff:
-                raise NoAccessException()
+        if not EntitlementService.can_access_unit(request.user, unit):
+            raise NoAccessException()
         
         # Validate request data
         serializer = QuizSubmitSerializer(data=request.data)
@@ -90,17 +114,46 @@ class QuizViewSet(viewsets.ViewSet):
         result_serializer = AttemptSerializer(attempt)
         return Response(result_serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='sync')
+    def sync_attempts(self, request):
+        """
+        Store quizzes taken offline, in one request.
+        
+        Request body:
+        {
+            "attempts": [
+                {
+                    "client_key": "8f14e45f-...",
+                    "unit_id": 1,
+                    "submitted_at": "2024-01-20T14:30:00Z",
+                    "answers": [{"question_id": 1, "choice_ids": [1]}]
+                }
+            ]
+        }
+        
+        Each attempt gets a result with status created, duplicate (key
+        already synced; nothing is stored again), not_found or forbidden.
+        """
+        serializer = QuizSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        results = QuizGradingService.sync_attempts(request.user, serializer.validated_data['attempts'])
+        
+        return Response({'results': results})
+
 
 class AttemptViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing quiz attempts."""
     
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Return current user's attempts."""
-        return Attempt.objects.filter(
-            user=self.request.user
-        ).select_related('unit').prefetch_related('answers__question')
+        attempts = Attempt.objects.filter(user=self.request.user)
+        if self.action == 'retrieve':
+            return attempts.with_results()
+        return attempts.select_related('unit')
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -124,3 +177,30 @@ class AttemptViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = AttemptSerializer(attempt)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='books/(?P<book_slug>[^/.]+)/overview')
+    def book_overview(self, request, book_slug=None):
+        """
+        Get the user's quiz summary for every attempted unit of a book.
+        
+        Returns:
+        {
+            "book": 1,
+            "units_with_quiz": 10,
+            "passed_units": 4,
+            "units": [{"unit": 3, "best_score_pct": "90.00", "attempt_count": 2, ...}]
+        }
+        """
+        book = get_object_or_404(Book.objects.only('id', 'units_with_quiz'), slug=book_slug)
+        
+        summaries = UnitQuizSummary.objects.filter(
+            user=request.user,
+            book=book
+        ).select_related('unit').order_by('unit__order', 'unit_id')
+        units = UnitQuizSummarySerializer(summaries, many=True).data
+        
+        return Response({
+            'book': book.pk,
+            'units_with_quiz': book.units_with_quiz,
+            'passed_units': sum(1 for unit in units if unit['is_passed']),
+            'units': units,
+        })
@@ -5,6 +5,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from .models import User, Profile, Enrollment
+from .services import EntitlementService
 
 
 @admin.register(User)
@@ -69,12 +70,16 @@ class EnrollmentAdmin(admin.ModelAdmin):
     
     def activate_enrollments(self, request, queryset):
         """Activate selected enrollments."""
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(is_active=True)
+        EntitlementService.invalidate(*user_ids)
         self.message_user(request, f'{updated} enrollments activated.')
     activate_enrollments.short_description = 'Activate selected enrollments'
     
     def deactivate_enrollments(self, request, queryset):
         """Deactivate selected enrollments."""
+        user_ids = set(queryset.values_list('user_id', flat=True))
         updated = queryset.update(is_active=False)
+        EntitlementService.invalidate(*user_ids)
         self.message_user(request, f'{updated} enrollments deactivated.')
     deactivate_enrollments.short_description = 'Deactivate selected enrollments'
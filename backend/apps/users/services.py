@@ -0,0 +1,143 @@
+"""
+Business logic for user entitlements.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Enrollment
+
+
+class EntitlementService:
+    """
+    Resolve which books a user may access.
+
+    A user's active, unexpired book IDs are loaded once, stored in the Django
+    cache and memoized on the user instance, so every access check within a
+    request is a set lookup.
+    """
+
+    CACHE_KEY = 'entitlements:user:{user_id}'
+    MEMO_ATTR = '_entitled_book_ids'
+
+    @staticmethod
+    def active_enrollment_filter(now=None):
+        """
+        Return a Q object matching enrollments that currently grant access.
+
+        Args:
+            now: Reference time (optional, defaults to current time)
+
+        Returns:
+            Q object for Enrollment querysets
+        """
+        now = now or timezone.now()
+        return (
+            Q(is_active=True, active_from__lte=now) &
+            (Q(active_until__isnull=True) | Q(active_until__gt=now))
+        )
+
+    @classmethod
+    def get_book_ids(cls, user):
+        """
+        Get IDs of books the user is currently enrolled in.
+
+        Args:
+            user: User instance
+
+        Returns:
+            frozenset of book IDs
+        """
+        if user is None or not user.is_authenticated:
+            return frozenset()
+
+        memo = getattr(user, cls.MEMO_ATTR, None)
+        if memo is not None:
+            return memo
+
+        key = cls.CACHE_KEY.format(user_id=user.pk)
+        book_ids = cache.get(key)
+        if book_ids is None:
+            book_ids, timeout = cls._load(user.pk)
+            cache.set(key, book_ids, timeout)
+
+        setattr(user, cls.MEMO_ATTR, book_ids)
+        return book_ids
+
+    @classmethod
+    def has_book_access(cls, user, book):
+        """
+        Check if user is enrolled in a book.
+
+        Args:
+            user: User instance
+            book: Book instance or book ID
+
+        Returns:
+            True if the user has an active enrollment
+        """
+        book_id = getattr(book, 'pk', book)
+        return book_id in cls.get_book_ids(user)
+
+    @classmethod
+    def can_access_unit(cls, user, unit):
+        """
+        Check if user may open a unit (free, staff or enrolled).
+
+        Args:
+            user: User instance
+            unit: Unit instance
+
+        Returns:
+            True if access is allowed
+        """
+        if unit.is_free or user.is_staff:
+            return True
+        return cls.has_book_access(user, unit.book_id)
+
+    @classmethod
+    def invalidate(cls, *user_ids):
+        """
+        Drop cached entitlements for the given users.
+
+        Args:
+            *user_ids: User IDs whose enrollments changed
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if user_ids:
+            cache.delete_many([cls.CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+    @classmethod
+    def invalidate_user(cls, user):
+        """Drop cached and memoized entitlements for a user instance."""
+        cls.invalidate(user.pk)
+        if hasattr(user, cls.MEMO_ATTR):
+            delattr(user, cls.MEMO_ATTR)
+
+    @classmethod
+    def _load(cls, user_id):
+        """
+        Load book IDs from the database.
+
+        The cache timeout is capped at the earliest upcoming ``active_until``
+        or ``active_from`` so entries never outlive an enrollment window.
+        """
+        now = timezone.now()
+        timeout = settings.ENTITLEMENT_CACHE_TIMEOUT
+        book_ids = set()
+
+        rows = Enrollment.objects.filter(user_id=user_id, is_active=True).values_list(
+            'book_id', 'active_from', 'active_until'
+        )
+        for book_id, active_from, active_until in rows:
+            if active_from > now:
+                timeout = min(timeout, (active_from - now).total_seconds())
+                continue
+            if active_until is not None:
+                if active_until <= now:
+                    continue
+                timeout = min(timeout, (active_until - now).total_seconds())
+            book_ids.add(book_id)
+
+        return frozenset(book_ids), max(int(timeout), 1)
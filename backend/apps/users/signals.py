@@ -1,9 +1,10 @@
 """
 Signals for users app.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver, Signal
-from .models import User, Profile
+from .models import User, Profile, Enrollment
+from .services import EntitlementService
 
 # Custom signals
 user_registered = Signal()
@@ -15,3 +16,10 @@ def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.get_or_create(user=instance)
         user_registered.send(sender=sender, user=instance)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_entitlements(sender, instance, **kwargs):
+    """Drop cached entitlements when an enrollment changes."""
+    EntitlementService.invalidate(instance.user_id)
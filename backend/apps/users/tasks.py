@@ -54,12 +54,18 @@ def cleanup_expired_enrollments():
     This should be run periodically (e.g., daily).
     """
     from .models import Enrollment
+    from .services import EntitlementService
     from django.utils import timezone
     
-    expired_count = Enrollment.objects.filter(
+    expired = Enrollment.objects.filter(
         is_active=True,
         active_until__lt=timezone.now()
-    ).update(is_active=False)
+    )
+    user_ids = set(expired.values_list('user_id', flat=True))
+    expired_count = expired.update(is_active=False)
+    
+    # Bulk update bypasses signals, so drop cached entitlements explicitly
+    EntitlementService.invalidate(*user_ids)
     
     return f'Deactivated {expired_count} expired enrollments'
 
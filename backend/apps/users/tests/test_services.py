@@ -0,0 +1,88 @@
+"""
+Test cases for EntitlementService
+"""
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.catalog.models import Book
+from apps.users.models import User, Enrollment
+from apps.users.services import EntitlementService
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='student@example.com', password='testpass123')
+
+
+@pytest.fixture
+def book():
+    return Book.objects.create(title='Listening Basics', price=100000, is_published=True)
+
+
+def fresh(user):
+    """Reload user so the per-request memo is empty."""
+    return User.objects.get(pk=user.pk)
+
+
+@pytest.mark.django_db
+class TestEntitlementService:
+    """Test entitlement lookups and invalidation"""
+
+    def test_enrolled_book_is_accessible(self, user, book):
+        """Test active enrollment grants access"""
+        Enrollment.objects.create(user=user, book=book)
+
+        assert EntitlementService.has_book_access(fresh(user), book)
+
+    def test_expired_enrollment_is_ignored(self, user, book):
+        """Test enrollment past active_until does not grant access"""
+        Enrollment.objects.filter(pk=Enrollment.objects.create(user=user, book=book).pk).update(
+            active_until=timezone.now() - timedelta(minutes=1)
+        )
+
+        assert not EntitlementService.has_book_access(fresh(user), book)
+
+    def test_lookups_are_memoized_and_cached(self, user, book, django_assert_num_queries):
+        """Test repeated checks hit the database once"""
+        Enrollment.objects.create(user=user, book=book)
+        user = fresh(user)
+
+        with django_assert_num_queries(1):
+            for _ in range(5):
+                EntitlementService.has_book_access(user, book)
+
+        reloaded = fresh(user)
+        with django_assert_num_queries(0):
+            EntitlementService.has_book_access(reloaded, book)
+
+    def test_enrollment_save_invalidates_cache(self, user, book):
+        """Test saving an enrollment drops the cached book IDs"""
+        assert not EntitlementService.has_book_access(fresh(user), book)
+
+        Enrollment.objects.create(user=user, book=book)
+
+        assert EntitlementService.has_book_access(fresh(user), book)
+
+    def test_cleanup_task_invalidates_cache(self, user, book):
+        """Test expiring enrollments in bulk drops the cached book IDs"""
+        from apps.users.tasks import cleanup_expired_enrollments
+
+        enrollment = Enrollment.objects.create(user=user, book=book)
+        assert EntitlementService.has_book_access(fresh(user), book)
+
+        Enrollment.objects.filter(pk=enrollment.pk).update(
+            active_until=timezone.now() - timedelta(minutes=1)
+        )
+        cleanup_expired_enrollments()
+
+        assert not EntitlementService.has_book_access(fresh(user), book)
@@ -13,6 +13,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.progress.tasks.generate_daily_statistics',
         'schedule': crontab(hour=1, minute=0),  # Daily at 1 AM
     },
+    'refresh-item-analysis-hourly': {
+        'task': 'apps.quiz.tasks.refresh_item_analysis',
+        'schedule': crontab(minute=30),  # Hourly; only units with new attempts
+    },
     # Add more scheduled tasks as needed
 }
 
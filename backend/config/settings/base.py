@@ -220,9 +220,27 @@ MOMO_NOTIFY_URL = os.environ.get('MOMO_NOTIFY_URL', 'http://localhost:8000/api/p
 # Signed URL expiration (seconds)
 SIGNED_URL_EXPIRATION = 300  # 5 minutes
 
+# Internal nginx location for protected media (e.g. '/protected-media/').
+# When set, the media gateway only verifies the signature and hands the
+# transfer to nginx via X-Accel-Redirect; empty streams from Django.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+
 # Content protection
 MAX_CONCURRENT_SESSIONS = 2
 
+# Cached enrollment lookups (seconds)
+ENTITLEMENT_CACHE_TIMEOUT = 60 * 15  # 15 minutes
+
+# Cached public catalog pages (seconds), invalidated by version bumps
+CATALOG_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# Compiled quiz answer keys (seconds), invalidated by per-unit version bumps
+QUIZ_ANSWER_KEY_TIMEOUT = 24 * 60 * 60  # 1 day
+
+# Delay before regrading a unit after its answer key changed (seconds),
+# so one editing session queues one regrade
+QUIZ_REGRADE_DELAY = 60
+
 # DRF Spectacular
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Education Platform API',
@@ -30,6 +30,16 @@ export default function UnitPage({ params }) {
     },
   });
 
+  // Fetch transcript only when it is shown
+  const { data: transcript } = useQuery({
+    queryKey: ['transcript', unitId, unit?.transcript_digest],
+    queryFn: async () => {
+      const response = await catalogAPI.getUnitTranscript(unitId, { output: 'html' });
+      return response.data;
+    },
+    enabled: showTranscript && unit?.transcript_sections > 0,
+  });
+
   // Fetch questions
   const { data: questions, isLoading: questionsLoading } = useQuery({
     queryKey: ['questions', unitId],
@@ -180,10 +190,14 @@ export default function UnitPage({ params }) {
           />
 
           {/* Transcript */}
-          {showTranscript && unit?.transcript && (
+          {showTranscript && transcript?.html && (
             <div className="mt-6 p-4 bg-gray-50 rounded-lg">
               <h3 className="font-semibold text-gray-900 mb-2">Transcript:</h3>
-              <p className="text-gray-700 whitespace-pre-wrap">{unit.transcript}</p>
+              {/* HTML is rendered and escaped server-side */}
+              <div
+                className="text-gray-700 prose max-w-none"
+                dangerouslySetInnerHTML={{ __html: transcript.html }}
+              />
             </div>
           )}
         </div>
@@ -6,6 +6,9 @@ import { useTranslation } from '@/hooks/useTranslation';
 import Link from 'next/link';
 import Image from 'next/image';
 
+// Card width per breakpoint of the catalog grid (1/2/3 columns)
+const COVER_SIZES = '(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw';
+
 export default function CourseCard({ course, userProgress }) {
   const { t } = useTranslation();
   const [isClient, setIsClient] = useState(false);
@@ -16,6 +19,7 @@ export default function CourseCard({ course, userProgress }) {
     title,
     description,
     cover,
+    cover_srcset,
     level,
     unit_count,
     price,
@@ -35,7 +39,21 @@ export default function CourseCard({ course, userProgress }) {
     <Card className="overflow-hidden h-full flex flex-col" suppressHydrationWarning>
       {/* Cover Image */}
       <div className="relative h-48 bg-gradient-to-br from-primary-100 to-accent-100 dark:from-primary-900 dark:to-accent-900" suppressHydrationWarning>
-        {cover ? (
+        {cover_srcset?.jpeg ? (
+          <picture>
+            {cover_srcset.webp && (
+              <source type="image/webp" srcSet={cover_srcset.webp} sizes={COVER_SIZES} />
+            )}
+            <img
+              srcSet={cover_srcset.jpeg}
+              sizes={COVER_SIZES}
+              alt={title}
+              loading="lazy"
+              decoding="async"
+              className="absolute inset-0 w-full h-full object-cover"
+            />
+          </picture>
+        ) : cover ? (
           <Image
             src={cover}
             alt={title}
@@ -27,6 +27,7 @@ export const catalogAPI = {
   
   // Units
   getUnit: (unitId) => axios.get(`/catalog/units/${unitId}/`),
+  getUnitTranscript: (unitId, params) => axios.get(`/catalog/units/${unitId}/transcript/`, { params }),
   getUnitAssetUrl: (unitId, assetType) => axios.post(`/catalog/units/${unitId}/asset_url/`, {
     asset_type: assetType
   }),